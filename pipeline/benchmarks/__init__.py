@@ -0,0 +1,24 @@
+"""Offline benchmarks for the embedding and retrieval path."""
+
+from .corpus import archived_documents, subtopic_queries, synthetic_documents
+from .dimensionality import run_dimensionality_benchmark
+from .hnsw import run_hnsw_benchmark
+from .metrics import dir_size_mb, exact_top_k, latency_summary, recall_at_k
+from .quantization import run_quantization_benchmark
+from .stores import run_store_benchmark
+from .throughput import run_throughput_benchmark
+
+__all__ = [
+    "archived_documents",
+    "dir_size_mb",
+    "exact_top_k",
+    "latency_summary",
+    "recall_at_k",
+    "run_dimensionality_benchmark",
+    "run_hnsw_benchmark",
+    "run_quantization_benchmark",
+    "run_store_benchmark",
+    "run_throughput_benchmark",
+    "subtopic_queries",
+    "synthetic_documents",
+]
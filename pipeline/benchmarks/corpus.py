@@ -0,0 +1,124 @@
+"""Corpora for offline benchmarks."""
+
+import hashlib
+import json
+import random
+from pathlib import Path
+
+from ..generation.prompts import SENIOR_IOS_TOPICS
+
+# Identifiers that show up in real iOS documentation
+_SWIFT_IDENTIFIERS = [
+    "@Observable", "@MainActor", "@State", "@Binding", "@Published", "Sendable",
+    "AsyncStream", "AsyncSequence", "TaskGroup", "withCheckedContinuation",
+    "NSPersistentContainer", "NSManagedObjectContext", "ModelContainer",
+    "URLSession", "URLRequest", "Codable", "JSONDecoder", "ObservableObject",
+    "UICollectionViewDiffableDataSource", "UIViewController", "UIHostingController",
+    "AnyPublisher", "PassthroughSubject", "CurrentValueSubject", "ViewModifier",
+    "PreferenceKey", "GeometryReader", "LAContext", "SecItemAdd", "XCTestCase",
+]
+
+_FILLER = (
+    "the a an of to in for with when while because so that this it is are can "
+    "should must will may use uses using call calls returns value values type "
+    "types instance method property protocol actor task view state data memory "
+    "thread queue object reference copy update render cache request response "
+    "error handling performance safety lifecycle pattern example developer app"
+).split()
+
+
+def synthetic_documents(n_docs: int, seed: int = 42) -> list[dict]:
+    """Generate deterministic documents shaped like scraped documentation.
+
+    Each document is built from the words of one subtopic in
+    ``SENIOR_IOS_TOPICS`` mixed with Swift identifiers and filler words, so
+    retrieval by subtopic query behaves like it does on the real corpus.
+
+    Args:
+        n_docs: Number of documents to generate
+        seed: Random seed
+
+    Returns:
+        List of dicts with the same keys as ``data/scraped/documents.json``
+    """
+    rng = random.Random(seed)
+    pairs = [
+        (topic, subtopic)
+        for topic, subtopics in SENIOR_IOS_TOPICS.items()
+        for subtopic in subtopics
+    ]
+
+    docs = []
+    for i in range(n_docs):
+        topic, subtopic = pairs[rng.randrange(len(pairs))]
+        keywords = subtopic.replace("(", " ").replace(")", " ").split()
+        identifiers = rng.sample(_SWIFT_IDENTIFIERS, 3)
+
+        sentences = []
+        for _ in range(rng.randint(8, 30)):
+            words = rng.choices(_FILLER, k=rng.randint(8, 16))
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+            if rng.random() < 0.3:
+                words.append(rng.choice(identifiers))
+            sentences.append(" ".join(words).capitalize() + ".")
+
+        doc_id = hashlib.md5(f"synthetic_{seed}_{i}".encode()).hexdigest()[:12]
+        docs.append(
+            {
+                "id": doc_id,
+                "title": f"{subtopic} ({i})",
+                "content": " ".join(sentences),
+                "url": f"https://example.com/{topic}/{doc_id}",
+                "source": "synthetic",
+                "topic": topic,
+            }
+        )
+
+    return docs
+
+
+def archived_documents(path: str | Path, limit: int | None = None) -> list[dict]:
+    """Load a saved scrape (``documents.json``) as benchmark documents.
+
+    Documents are chunked like the embed stage does, and each chunk becomes
+    one benchmark document, so vector counts match a real index.
+
+    Args:
+        path: Path to a ``documents.json`` written by the scrape stage
+        limit: Optional maximum number of chunks
+
+    Returns:
+        List of dicts with id, content and topic keys (plus title/url/source)
+    """
+    # Imported lazily: the chunker loads a tokenizer, synthetic corpora don't need it
+    from ..embeddings.chunker import DocumentChunker
+
+    with open(path) as f:
+        raw = json.load(f)
+
+    chunker = DocumentChunker()
+    docs = []
+    for doc in raw:
+        for chunk in chunker.chunk(doc["id"], doc["content"], doc["url"], doc["topic"]):
+            docs.append(
+                {
+                    "id": chunk.id,
+                    "title": doc.get("title", ""),
+                    "content": chunk.content,
+                    "url": doc["url"],
+                    "source": doc.get("source", ""),
+                    "topic": doc["topic"],
+                }
+            )
+            if limit is not None and len(docs) >= limit:
+                return docs
+    return docs
+
+
+def subtopic_queries() -> list[tuple[str, str]]:
+    """Get (topic, query) pairs matching the generator's retrieval queries."""
+    return [
+        (topic, f"{topic} {subtopic} iOS interview")
+        for topic, subtopics in SENIOR_IOS_TOPICS.items()
+        for subtopic in subtopics
+    ]
@@ -0,0 +1,75 @@
+"""Recall benchmark for reduced-dimensionality embeddings."""
+
+import time
+
+import numpy as np
+
+from ..embeddings.backends import get_embedding_backend
+from ..embeddings.projection import PCAProjection
+from ..utils.logging import get_logger
+from .corpus import synthetic_documents
+from .metrics import exact_top_k, latency_summary, recall_at_k
+from .quantization import benchmark_queries
+
+logger = get_logger(__name__)
+
+
+def run_dimensionality_benchmark(
+    n_docs: int = 20_000,
+    k: int = 5,
+    n_queries: int = 200,
+    dimensions: tuple[int, ...] = (64, 128, 256),
+    model_id: str = "local/hashing-768",
+) -> list[dict]:
+    """Measure how much recall PCA-reduced vectors keep.
+
+    Ground truth is exact cosine top-k over the full-width vectors; each
+    reduced size is fitted on the corpus the same way ``run_embed`` does.
+
+    Args:
+        n_docs: Number of synthetic documents (one vector each)
+        k: Results per query
+        n_queries: Number of queries
+        dimensions: Reduced sizes to evaluate
+        model_id: Full-width embedding model ID (should be a ``local/`` backend)
+
+    Returns:
+        One row per vector size, full width first
+    """
+    backend = get_embedding_backend(model_id)
+    docs = synthetic_documents(n_docs)
+
+    matrix = np.asarray(backend.embed([d["content"] for d in docs]), dtype=np.float32)
+    queries = np.asarray(
+        backend.embed(benchmark_queries(docs, n_queries)), dtype=np.float32
+    )
+    truth = exact_top_k(matrix, queries, k).tolist()
+
+    def measure(name: str, docs_m: np.ndarray, queries_m: np.ndarray, extra: dict) -> dict:
+        latencies, retrieved = [], []
+        for q in queries_m:
+            start = time.perf_counter()
+            retrieved.append(exact_top_k(docs_m, q[None, :], k)[0].tolist())
+            latencies.append((time.perf_counter() - start) * 1000)
+        return {
+            "dims": name,
+            f"recall@{k}": recall_at_k(retrieved, truth),
+            **latency_summary(latencies),
+            "memory_mb": round(docs_m.nbytes / 1024**2, 2),
+            **extra,
+        }
+
+    rows = [measure(str(matrix.shape[1]), matrix, queries, {"variance": 1.0})]
+    for dims in dimensions:
+        projection = PCAProjection().fit(matrix, dims)
+        rows.append(
+            measure(
+                f"{dims} (pca)",
+                projection.transform(matrix),
+                projection.transform(queries),
+                {"variance": round(projection.explained_variance, 3)},
+            )
+        )
+
+    logger.info(f"Dimensionality benchmark: {n_docs} vectors, {len(queries)} queries")
+    return rows
@@ -0,0 +1,140 @@
+"""HNSW parameter sweep: build cost, disk size, latency and recall."""
+
+import itertools
+import json
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from ..embeddings.backends import get_embedding_backend
+from ..stores import ChromaVectorStore
+from ..utils.logging import get_logger
+from .corpus import archived_documents, synthetic_documents
+from .metrics import dir_size_mb, exact_top_k, latency_summary, recall_at_k
+from .quantization import benchmark_queries
+
+logger = get_logger(__name__)
+
+# ChromaDB keeps a loaded index with the parameters it was opened with, so
+# each search_ef is measured in a fresh interpreter that sets it before the
+# first query
+_QUERY_SCRIPT = """
+import json, sys, time
+import numpy as np
+from pipeline.stores import ChromaVectorStore
+store = ChromaVectorStore("bench", sys.argv[1], hnsw=json.loads(sys.argv[2]))
+queries = np.load(sys.argv[3])
+k = int(sys.argv[4])
+ids, latencies = [], []
+for q in queries:
+    start = time.perf_counter()
+    ids.append(store.query_batch([q.tolist()], n_results=k)["ids"][0])
+    latencies.append((time.perf_counter() - start) * 1000)
+print(json.dumps({"ids": ids, "latencies": latencies}))
+"""
+
+
+def _query_in_subprocess(persist_dir: str, hnsw: dict, queries_path: str, k: int) -> dict:
+    """Run all queries against a built collection with the given HNSW parameters."""
+    output = subprocess.run(
+        [sys.executable, "-c", _QUERY_SCRIPT, persist_dir, json.dumps(hnsw), queries_path, str(k)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+# Parameter grid swept by default: (M, construction_ef) builds x search_ef values
+DEFAULT_M = (8, 16, 32)
+DEFAULT_CONSTRUCTION_EF = (100, 200)
+DEFAULT_SEARCH_EF = (10, 50, 100, 200)
+
+
+def run_hnsw_benchmark(
+    n_docs: int = 20_000,
+    k: int = 5,
+    n_queries: int = 200,
+    model_id: str = "local/hashing-384",
+    corpus_path: str | None = None,
+    m_values: tuple[int, ...] = DEFAULT_M,
+    construction_ef_values: tuple[int, ...] = DEFAULT_CONSTRUCTION_EF,
+    search_ef_values: tuple[int, ...] = DEFAULT_SEARCH_EF,
+) -> list[dict]:
+    """Sweep Chroma HNSW parameters against exact search.
+
+    One index is built per (M, construction_ef) pair and reused for every
+    search_ef, since search_ef doesn't require a rebuild. Queries run in a
+    subprocess per search_ef; latency is per query, excluding process start.
+
+    Args:
+        n_docs: Number of documents (synthetic) or maximum chunks (archived)
+        k: Results per query
+        n_queries: Number of queries
+        model_id: Embedding model ID
+        corpus_path: Optional archived ``documents.json`` to use instead of
+            the synthetic corpus
+        m_values: M values to build with
+        construction_ef_values: construction_ef values to build with
+        search_ef_values: search_ef values to query with
+
+    Returns:
+        One row per parameter combination
+    """
+    backend = get_embedding_backend(model_id)
+    if corpus_path:
+        docs = archived_documents(corpus_path, limit=n_docs)
+    else:
+        docs = synthetic_documents(n_docs)
+    ids = [d["id"] for d in docs]
+    metadatas = [{"topic": d["topic"]} for d in docs]
+
+    matrix = np.asarray(backend.embed([d["content"] for d in docs]), dtype=np.float32)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    queries = np.asarray(backend.embed(benchmark_queries(docs, n_queries)), dtype=np.float32)
+    queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+    truth = [[ids[i] for i in row] for row in exact_top_k(matrix, queries, k)]
+
+    rows = []
+    for m, construction_ef in itertools.product(m_values, construction_ef_values):
+        with tempfile.TemporaryDirectory(prefix="bench_hnsw_") as tmp:
+            hnsw = {"m": m, "construction_ef": construction_ef}
+            store = ChromaVectorStore("bench", tmp, hnsw=hnsw)
+
+            start = time.perf_counter()
+            for i in range(0, len(ids), 5000):
+                store.upsert(
+                    ids[i : i + 5000],
+                    matrix[i : i + 5000].tolist(),
+                    ["" for _ in ids[i : i + 5000]],
+                    metadatas[i : i + 5000],
+                )
+            build_s = time.perf_counter() - start
+            disk_mb = dir_size_mb(tmp)
+
+            queries_path = f"{tmp}/queries.npy"
+            np.save(queries_path, queries)
+            for search_ef in search_ef_values:
+                found = _query_in_subprocess(
+                    tmp, {**hnsw, "search_ef": search_ef}, queries_path, k
+                )
+                retrieved = found["ids"]
+                summary = latency_summary(found["latencies"])
+                rows.append(
+                    {
+                        "M": m,
+                        "construction_ef": construction_ef,
+                        "search_ef": search_ef,
+                        "build_s": round(build_s, 2),
+                        "disk_mb": disk_mb,
+                        f"recall@{k}": recall_at_k(retrieved, truth),
+                        "p50_ms": summary["p50_ms"],
+                        "p99_ms": summary["p99_ms"],
+                    }
+                )
+
+    logger.info(f"HNSW benchmark: {len(ids)} vectors, {len(queries)} queries")
+    return rows
@@ -0,0 +1,75 @@
+"""Measurement helpers shared by benchmarks."""
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+def latency_summary(samples_ms: list[float]) -> dict:
+    """Summarize latency samples.
+
+    Args:
+        samples_ms: Latencies in milliseconds
+
+    Returns:
+        Dict with p50, p99 and mean in milliseconds
+    """
+    if not samples_ms:
+        return {"p50_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+
+    arr = np.asarray(samples_ms)
+    return {
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+        "mean_ms": round(float(arr.mean()), 3),
+    }
+
+
+def recall_at_k(retrieved: list[list[str]], expected: list[list[str]]) -> float:
+    """Average fraction of the expected top-k IDs that were retrieved.
+
+    Args:
+        retrieved: Retrieved IDs per query
+        expected: Ground-truth IDs per query (e.g. from exact search)
+
+    Returns:
+        Mean recall in [0, 1]
+    """
+    scores = [
+        len(set(got) & set(want)) / len(want)
+        for got, want in zip(retrieved, expected)
+        if want
+    ]
+    return round(float(np.mean(scores)), 4) if scores else 0.0
+
+
+def exact_top_k(
+    matrix: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+) -> np.ndarray:
+    """Exact cosine top-k row indices for each query.
+
+    Args:
+        matrix: Normalized document vectors (n, dim)
+        queries: Normalized query vectors (q, dim)
+        k: Number of neighbours
+
+    Returns:
+        Array of shape (q, k) with row indices, best first
+    """
+    scores = queries @ matrix.T
+    k = min(k, matrix.shape[0])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def dir_size_mb(path: str | Path) -> float:
+    """Total size of files under a directory in megabytes."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return round(total / (1024 * 1024), 2)
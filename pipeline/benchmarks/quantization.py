@@ -0,0 +1,132 @@
+"""Recall@k vs latency/memory benchmark for quantized vector storage."""
+
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from ..clients.chroma_client import ChromaClient
+from ..embeddings.backends import get_embedding_backend
+from ..embeddings.quantization import QuantizedIndex
+from ..utils.logging import get_logger
+from .corpus import subtopic_queries, synthetic_documents
+from .metrics import dir_size_mb, exact_top_k, latency_summary, recall_at_k
+
+logger = get_logger(__name__)
+
+
+def benchmark_queries(docs: list[dict], n_queries: int, seed: int = 7) -> list[str]:
+    """Subtopic queries topped up with snippets of random documents."""
+    rng = random.Random(seed)
+    queries = [q for _, q in subtopic_queries()]
+    while len(queries) < n_queries:
+        words = rng.choice(docs)["content"].split()
+        start = rng.randrange(max(1, len(words) - 20))
+        queries.append(" ".join(words[start : start + 20]))
+    return queries[:n_queries]
+
+
+def _timed(search, queries: np.ndarray) -> tuple[list[list[str]], list[float]]:
+    """Run a search function per query, collecting IDs and latencies."""
+    results, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(search(q))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, latencies
+
+
+def run_quantization_benchmark(
+    n_docs: int = 20_000,
+    k: int = 5,
+    n_queries: int = 200,
+    model_id: str = "local/hashing-384",
+) -> list[dict]:
+    """Compare Chroma HNSW, exact float32 and quantized search.
+
+    Recall is measured against exact cosine top-k over the full-precision
+    vectors. Memory is the size of what each method keeps for search: the
+    Chroma directory on disk, the float32 matrix, or the quantized codes.
+
+    Args:
+        n_docs: Number of synthetic documents (one vector each)
+        k: Results per query
+        n_queries: Number of queries
+        model_id: Embedding model ID (should be a ``local/`` backend)
+
+    Returns:
+        One row per method
+    """
+    backend = get_embedding_backend(model_id)
+    docs = synthetic_documents(n_docs)
+    ids = [d["id"] for d in docs]
+
+    matrix = np.asarray(backend.embed([d["content"] for d in docs]), dtype=np.float32)
+    queries = np.asarray(
+        backend.embed(benchmark_queries(docs, n_queries)), dtype=np.float32
+    )
+    truth = [[ids[i] for i in row] for row in exact_top_k(matrix, queries, k)]
+    rows = []
+
+    def exact_search(q: np.ndarray) -> list[str]:
+        return [ids[i] for i in exact_top_k(matrix, q[None, :], k)[0]]
+
+    retrieved, latencies = _timed(exact_search, queries)
+    rows.append(
+        {
+            "method": "exact-f32",
+            f"recall@{k}": recall_at_k(retrieved, truth),
+            **latency_summary(latencies),
+            "memory_mb": round(matrix.nbytes / 1024**2, 2),
+        }
+    )
+
+    with tempfile.TemporaryDirectory(prefix="bench_quant_") as tmp:
+        chroma = ChromaClient("bench", persist_dir=f"{tmp}/chroma")
+        for i in range(0, n_docs, 5000):
+            chroma.add(
+                ids=ids[i : i + 5000],
+                embeddings=matrix[i : i + 5000].tolist(),
+                documents=["" for _ in ids[i : i + 5000]],
+                metadatas=[{"topic": d["topic"]} for d in docs[i : i + 5000]],
+            )
+
+        def hnsw_search(q: np.ndarray) -> list[str]:
+            return chroma.query(q.tolist(), n_results=k)["ids"][0]
+
+        retrieved, latencies = _timed(hnsw_search, queries)
+        rows.append(
+            {
+                "method": "chroma-hnsw",
+                f"recall@{k}": recall_at_k(retrieved, truth),
+                **latency_summary(latencies),
+                "memory_mb": dir_size_mb(f"{tmp}/chroma"),
+            }
+        )
+
+        # Rescoring reads full-precision rows, as the Indexer reads them from its store
+        row_of = {doc_id: row for row, doc_id in enumerate(ids)}
+
+        def fetch(wanted: list[str]) -> np.ndarray:
+            return matrix[[row_of[doc_id] for doc_id in wanted]]
+
+        for mode in ("int8", "binary"):
+            index = QuantizedIndex(f"{tmp}/{mode}", mode=mode, fetch=fetch)
+            index.add(ids, matrix, ["" for _ in ids])
+
+            def quantized_search(q: np.ndarray) -> list[str]:
+                return index.search(q, n_results=k)[0]
+
+            retrieved, latencies = _timed(quantized_search, queries)
+            rows.append(
+                {
+                    "method": f"{mode}+rescore",
+                    f"recall@{k}": recall_at_k(retrieved, truth),
+                    **latency_summary(latencies),
+                    "memory_mb": round(index.memory_bytes / 1024**2, 2),
+                }
+            )
+
+    logger.info(f"Quantization benchmark: {n_docs} vectors, {len(queries)} queries")
+    return rows
@@ -0,0 +1,126 @@
+"""Open time, query latency and recall benchmark for vector store backends."""
+
+import json
+import math
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from ..embeddings.backends import get_embedding_backend
+from ..stores import ChromaVectorStore, NumpyVectorStore
+from ..utils.logging import get_logger
+from .corpus import synthetic_documents
+from .metrics import dir_size_mb, exact_top_k, latency_summary, recall_at_k
+from .quantization import benchmark_queries
+
+logger = get_logger(__name__)
+
+# Run in a fresh interpreter so open time includes imports and cold caches
+_OPEN_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from pipeline.stores import get_vector_store
+imported = time.perf_counter()
+store = get_vector_store(sys.argv[1], sys.argv[2], backend=sys.argv[3])
+opened = time.perf_counter()
+store.query_batch([json.loads(sys.argv[4])], n_results=5)
+queried = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "open_ms": (opened - imported) * 1000,
+    "first_query_ms": (queried - opened) * 1000,
+}))
+"""
+
+
+def _measure_open(persist_dir: str, backend: str, query: list[float]) -> dict:
+    """Time import, open and first query of a store in a subprocess."""
+    output = subprocess.run(
+        [sys.executable, "-c", _OPEN_SCRIPT, "bench", persist_dir, backend, json.dumps(query)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    return {key: round(value, 1) for key, value in timings.items()}
+
+
+def run_store_benchmark(
+    n_docs: int = 20_000,
+    k: int = 5,
+    n_queries: int = 200,
+    model_id: str = "local/hashing-384",
+) -> list[dict]:
+    """Compare the Chroma and NumPy (exact and IVF) vector stores.
+
+    Args:
+        n_docs: Number of synthetic documents (one vector each)
+        k: Results per query
+        n_queries: Number of queries
+        model_id: Embedding model ID (should be a ``local/`` backend)
+
+    Returns:
+        One row per store configuration
+    """
+    backend = get_embedding_backend(model_id)
+    docs = synthetic_documents(n_docs)
+    ids = [d["id"] for d in docs]
+    metadatas = [{"topic": d["topic"], "source_id": d["id"]} for d in docs]
+
+    matrix = np.asarray(backend.embed([d["content"] for d in docs]), dtype=np.float32)
+    queries = np.asarray(
+        backend.embed(benchmark_queries(docs, n_queries)), dtype=np.float32
+    )
+    truth = [[ids[i] for i in row] for row in exact_top_k(matrix, queries, k)]
+
+    ivf_lists = max(1, int(math.sqrt(n_docs)))
+    configs = [
+        ("chroma", "chroma", lambda path: ChromaVectorStore("bench", path)),
+        ("numpy-exact", "numpy", lambda path: NumpyVectorStore("bench", path, ivf_lists=0)),
+        (
+            f"numpy-ivf{ivf_lists}",
+            "numpy",
+            lambda path: NumpyVectorStore("bench", path, ivf_lists=ivf_lists, ivf_probes=8),
+        ),
+    ]
+
+    rows = []
+    for label, backend_name, make_store in configs:
+        with tempfile.TemporaryDirectory(prefix="bench_store_") as tmp:
+            store = make_store(tmp)
+
+            start = time.perf_counter()
+            for i in range(0, n_docs, 5000):
+                store.upsert(
+                    ids[i : i + 5000],
+                    matrix[i : i + 5000].tolist(),
+                    ["" for _ in ids[i : i + 5000]],
+                    metadatas[i : i + 5000],
+                )
+            store.flush()
+            build_s = time.perf_counter() - start
+
+            retrieved, latencies = [], []
+            for q in queries:
+                start = time.perf_counter()
+                retrieved.append(store.query_batch([q.tolist()], n_results=k)["ids"][0])
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            open_timings = _measure_open(tmp, backend_name, queries[0].tolist())
+
+            rows.append(
+                {
+                    "store": label,
+                    "build_s": round(build_s, 2),
+                    "disk_mb": dir_size_mb(tmp),
+                    **open_timings,
+                    f"recall@{k}": recall_at_k(retrieved, truth),
+                    **latency_summary(latencies),
+                }
+            )
+
+    logger.info(f"Store benchmark: {n_docs} vectors, {len(queries)} queries")
+    return rows
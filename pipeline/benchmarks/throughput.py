@@ -0,0 +1,86 @@
+"""End-to-end chunk -> embed -> index -> retrieve throughput benchmark."""
+
+import tempfile
+import time
+
+from ..embeddings.backends import get_embedding_backend
+from ..embeddings.chunker import DocumentChunker
+from ..embeddings.embedder import Embedder
+from ..embeddings.indexer import Indexer
+from ..utils.logging import get_logger
+from .corpus import subtopic_queries, synthetic_documents
+from .metrics import dir_size_mb, latency_summary
+
+logger = get_logger(__name__)
+
+
+async def run_throughput_benchmark(
+    n_docs: int = 10_000,
+    model_id: str = "local/hashing-384",
+    n_results: int = 5,
+) -> list[dict]:
+    """Run the embed/index/retrieve path over a synthetic corpus.
+
+    Uses an offline embedding backend and a throwaway index directory, so it
+    needs no network access and never touches the real collection.
+
+    Args:
+        n_docs: Number of synthetic documents
+        model_id: Embedding model ID (should be a ``local/`` backend)
+        n_results: Results per retrieval query
+
+    Returns:
+        One row of stage timings and rates
+    """
+    docs = synthetic_documents(n_docs)
+
+    start = time.perf_counter()
+    chunker = DocumentChunker()
+    chunks = []
+    for doc in docs:
+        chunks.extend(
+            chunker.chunk(
+                doc_id=doc["id"],
+                content=doc["content"],
+                url=doc["url"],
+                topic=doc["topic"],
+                metadata={"source": doc["source"], "title": doc["title"]},
+            )
+        )
+    chunk_s = time.perf_counter() - start
+
+    embedder = Embedder(batch_size=1000, backend=get_embedding_backend(model_id))
+    start = time.perf_counter()
+    chunks_with_embeddings = await embedder.embed_chunks(chunks)
+    embed_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory(prefix="bench_index_") as tmp:
+        indexer = Indexer(collection_name="bench", persist_dir=tmp)
+
+        start = time.perf_counter()
+        indexer.index(chunks_with_embeddings)
+        index_s = time.perf_counter() - start
+        disk_mb = dir_size_mb(tmp)
+
+        latencies = []
+        for topic, query in subtopic_queries():
+            query_embedding = await embedder.embed_query(query)
+            start = time.perf_counter()
+            indexer.query(query_embedding, topic=topic, n_results=n_results)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    n_chunks = len(chunks)
+    logger.info(f"Throughput benchmark: {n_docs} docs, {n_chunks} chunks")
+
+    return [
+        {
+            "docs": n_docs,
+            "chunks": n_chunks,
+            "chunk_per_s": round(n_chunks / chunk_s, 1),
+            "embed_per_s": round(n_chunks / embed_s, 1),
+            "index_per_s": round(n_chunks / index_s, 1),
+            "disk_mb": disk_mb,
+            **latency_summary(latencies),
+        }
+    ]
+
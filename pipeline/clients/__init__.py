@@ -3,5 +3,29 @@
 from .claude_client import ClaudeClient
 from .gemini_client import GeminiClient
 from .chroma_client import ChromaClient
+from .context_cache import GeminiContextCache, TokenUsage
+from .router import LLMRouter, StubProvider
+from .response_cache import ReplayMiss, ResponseCache, response_key
+from .structured import conforms, json_schema, parse_structured
+from .transports import StubAnthropicTransport, StubGeminiTransport
+from .usage_ledger import QuotaExhausted, UsageLedger
 
-__all__ = ["ClaudeClient", "GeminiClient", "ChromaClient"]
+__all__ = [
+    "ClaudeClient",
+    "GeminiClient",
+    "ChromaClient",
+    "GeminiContextCache",
+    "ReplayMiss",
+    "LLMRouter",
+    "QuotaExhausted",
+    "ResponseCache",
+    "StubAnthropicTransport",
+    "StubGeminiTransport",
+    "StubProvider",
+    "TokenUsage",
+    "UsageLedger",
+    "conforms",
+    "json_schema",
+    "parse_structured",
+    "response_key",
+]
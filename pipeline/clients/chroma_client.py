@@ -1,5 +1,7 @@
 """ChromaDB client wrapper."""
 
+import json
+
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 
@@ -12,18 +14,83 @@ logger = get_logger(__name__)
 class ChromaClient:
     """Wrapper for ChromaDB with persistent storage."""
 
-    def __init__(self, collection_name: str | None = None):
+    def __init__(
+        self,
+        collection_name: str | None = None,
+        persist_dir: str | None = None,
+        hnsw: dict | None = None,
+    ):
+        """Initialize client.
+
+        Args:
+            collection_name: Optional custom collection name
+            persist_dir: Optional custom storage directory
+            hnsw: Optional HNSW parameter overrides ("m", "construction_ef",
+                "search_ef"); defaults come from settings
+        """
         settings = get_settings()
+        self.hnsw = {
+            "m": settings.hnsw_m,
+            "construction_ef": settings.hnsw_construction_ef,
+            "search_ef": settings.hnsw_search_ef,
+            **(hnsw or {}),
+        }
         self.client = chromadb.PersistentClient(
-            path=settings.chroma_persist_dir,
+            path=persist_dir or settings.chroma_persist_dir,
             settings=ChromaSettings(anonymized_telemetry=False),
         )
         self.collection = self.client.get_or_create_collection(
             name=collection_name or settings.chroma_collection,
-            metadata={"hnsw:space": "cosine"},
+            metadata=self._collection_metadata(),
         )
+        self._sync_hnsw()
         logger.info(f"ChromaDB collection: {self.collection.name}")
 
+    def _collection_metadata(self) -> dict:
+        """Collection metadata with distance space and HNSW parameters."""
+        return {
+            "hnsw:space": "cosine",
+            "hnsw:M": self.hnsw["m"],
+            "hnsw:construction_ef": self.hnsw["construction_ef"],
+            "hnsw:search_ef": self.hnsw["search_ef"],
+        }
+
+    def _sync_hnsw(self) -> None:
+        """Apply search_ef to an existing collection before it is first queried.
+
+        search_ef can change at any time; M and construction_ef are fixed when
+        the graph is built, so a mismatch only logs a warning.
+        """
+        hnsw = (self.collection.configuration or {}).get("hnsw") or {}
+        if not hnsw:
+            return
+
+        if hnsw.get("ef_search") != self.hnsw["search_ef"]:
+            self.set_search_ef(self.hnsw["search_ef"])
+
+        built = (hnsw.get("max_neighbors"), hnsw.get("ef_construction"))
+        if built != (self.hnsw["m"], self.hnsw["construction_ef"]):
+            logger.warning(
+                f"Collection {self.collection.name} was built with M={built[0]}, "
+                f"construction_ef={built[1]}; run embed --full to apply "
+                f"M={self.hnsw['m']}, construction_ef={self.hnsw['construction_ef']}"
+            )
+
+    def set_search_ef(self, search_ef: int) -> None:
+        """Change the HNSW search breadth (recall vs latency).
+
+        The value is persisted in the collection configuration. ChromaDB keeps
+        a loaded index in memory with its original parameters, so queries see
+        the new value only if the collection hasn't been queried yet in this
+        process; otherwise it applies from the next process.
+
+        Args:
+            search_ef: Candidate list size used at query time
+        """
+        self.collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+        self.hnsw["search_ef"] = search_ef
+        logger.debug(f"Set search_ef={search_ef} on {self.collection.name}")
+
     def add(
         self,
         ids: list[str],
@@ -47,6 +114,54 @@ class ChromaClient:
             metadatas=metadatas or [{} for _ in ids],
         )
 
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: list[list[float]],
+        documents: list[str],
+        metadatas: list[dict] | None = None,
+    ) -> None:
+        """Insert new documents or overwrite existing ones with the same IDs.
+
+        Args:
+            ids: Unique document IDs
+            embeddings: Document embedding vectors
+            documents: Document texts
+            metadatas: Optional metadata for each document
+        """
+        logger.debug(f"Upserting {len(ids)} documents to ChromaDB")
+        self.collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadatas or [{} for _ in ids],
+        )
+
+    def get(
+        self,
+        ids: list[str] | None = None,
+        where: dict | None = None,
+        include: list[str] | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        """Fetch stored documents without a similarity search.
+
+        Args:
+            ids: Optional IDs to fetch (default: all)
+            where: Optional metadata filter
+            include: Fields to return (e.g. ["metadatas", "documents"])
+            limit: Optional maximum number of results
+
+        Returns:
+            Results with ids plus the requested fields
+        """
+        return self.collection.get(
+            ids=ids,
+            where=where,
+            include=include if include is not None else ["metadatas"],
+            limit=limit,
+        )
+
     def query(
         self,
         query_embedding: list[float],
@@ -70,6 +185,50 @@ class ChromaClient:
             where=where,
         )
 
+    def query_batch(
+        self,
+        query_embeddings: list[list[float]],
+        n_results: int = 10,
+        wheres: list[dict | None] | None = None,
+    ) -> dict:
+        """Query similar documents for many embeddings at once.
+
+        ChromaDB applies one filter per call, so queries are grouped by
+        filter and each group is sent as a single multi-embedding query.
+
+        Args:
+            query_embeddings: Query embedding vectors
+            n_results: Number of results per query
+            wheres: Optional metadata filter per query (aligned with embeddings)
+
+        Returns:
+            Results with ids, documents, distances, metadatas; each a list
+            with one entry per query, in input order
+        """
+        wheres = wheres or [None] * len(query_embeddings)
+        groups: dict[str, list[int]] = {}
+        for i, where in enumerate(wheres):
+            groups.setdefault(json.dumps(where, sort_keys=True), []).append(i)
+
+        keys = ("ids", "documents", "metadatas", "distances")
+        merged: dict = {key: [[] for _ in query_embeddings] for key in keys}
+
+        logger.debug(
+            f"Querying ChromaDB for {len(query_embeddings)} queries "
+            f"in {len(groups)} filter groups"
+        )
+        for positions in groups.values():
+            result = self.collection.query(
+                query_embeddings=[query_embeddings[i] for i in positions],
+                n_results=n_results,
+                where=wheres[positions[0]],
+            )
+            for key in keys:
+                for i, values in zip(positions, result.get(key) or []):
+                    merged[key][i] = values
+
+        return merged
+
     def count(self) -> int:
         """Get document count in collection."""
         return self.collection.count()
@@ -84,6 +243,6 @@ class ChromaClient:
         self.client.delete_collection(name)
         self.collection = self.client.get_or_create_collection(
             name=name,
-            metadata={"hnsw:space": "cosine"},
+            metadata=self._collection_metadata(),
         )
         logger.info(f"Reset ChromaDB collection: {name}")
@@ -1,9 +1,22 @@
 """Claude API client wrapper."""
 
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
 from anthropic import AsyncAnthropic
 
 from ..config import get_settings
 from ..utils.logging import get_logger
+from .context_cache import TokenUsage, cache_control
+from .response_cache import ReplayMiss, ResponseCache, response_key
+from .structured import conforms, json_schema, schema_fingerprint
+from .transports import AnthropicTransport, TransportResponse
+from .usage_ledger import UsageLedger
+
+# Tool Claude is forced to call to return structured output
+_OUTPUT_TOOL = "record_output"
 
 logger = get_logger(__name__)
 
@@ -11,38 +24,98 @@ logger = get_logger(__name__)
 class ClaudeClient:
     """Async wrapper for Claude API."""
 
-    def __init__(self):
+    def __init__(self, transport=None):
+        """Initialize client.
+
+        Args:
+            transport: Transport for message calls (default: the anthropic
+                SDK; see ``transports.StubAnthropicTransport``)
+        """
         settings = get_settings()
         self.client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+        self.transport = transport or AnthropicTransport(self.client)
         self.model = settings.claude_model
         self.max_tokens = settings.max_tokens
+        self.cache = ResponseCache.from_settings()
+        self.usage = TokenUsage()
+        self.ledger = UsageLedger.from_settings()
+        self.daily_requests = settings.claude_daily_requests
+        self.daily_tokens = settings.claude_daily_tokens
+        self.prompt_caching = settings.context_cache
+        self.cache_ttl = settings.context_cache_ttl_s
 
     async def generate(
         self,
         prompt: str,
         system: str = "",
         max_tokens: int | None = None,
+        shared: str = "",
     ) -> str:
         """Generate text completion from Claude.
 
+        The system prompt and shared contents are marked as prompt cache
+        breakpoints, so repeated prefixes are read from Claude's cache.
+
         Args:
             prompt: User message
             system: System prompt
             max_tokens: Override default max tokens
+            shared: Contents shared by a group of requests (e.g. per-topic
+                context), sent as a second system block
 
         Returns:
             Generated text response
+
+        Raises:
+            ReplayMiss: In replay mode, if the response isn't cached
+            QuotaExhausted: If today's CLAUDE_DAILY_REQUESTS/TOKENS are used up
         """
+        max_tokens = max_tokens or self.max_tokens
+        if self.cache is None:
+            return await self._generate(prompt, system, max_tokens, shared)
+        key = self._cache_key(prompt, system, shared, max_tokens)
+        return await self.cache.get_or_call(
+            key, lambda: self._generate(prompt, system, max_tokens, shared), model=self.model
+        )
+
+    async def _send(self, **request) -> TransportResponse:
+        """One provider call, held against today's quota and recorded in the ledger."""
+        with self.ledger.reserve(self.model, self.daily_requests, self.daily_tokens):
+            try:
+                response = await self.transport.create_message(**request)
+            except asyncio.CancelledError:
+                # Hedge loser or cancelled run: the prompt is billed all the same
+                self._record(TokenUsage.estimated(_request_text(request)))
+                raise
+            self._record(response.usage)
+        return response
+
+    def _record(self, usage: TokenUsage) -> None:
+        """Count a provider call's tokens for this run and in the daily ledger."""
+        self.usage.add(usage)
+        self.ledger.record(self.model, usage)
+
+    def _request(self, prompt: str, system: str, shared: str, max_tokens: int) -> dict:
+        """Messages API request with the stable prefix marked for prompt caching."""
+        request: dict = {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        blocks = [{"type": "text", "text": text} for text in (system, shared) if text]
+        if self.prompt_caching:
+            for block in blocks:
+                block["cache_control"] = cache_control(self.cache_ttl)
+        if blocks:
+            request["system"] = blocks
+        return request
+
+    async def _generate(self, prompt: str, system: str, max_tokens: int, shared: str = "") -> str:
         logger.debug(f"Generating with Claude: {prompt[:100]}...")
 
-        response = await self.client.messages.create(
-            model=self.model,
-            max_tokens=max_tokens or self.max_tokens,
-            system=system,
-            messages=[{"role": "user", "content": prompt}],
-        )
+        response = await self._send(**self._request(prompt, system, shared, max_tokens))
 
-        text = response.content[0].text
+        text = response.text
         logger.debug(f"Claude response: {len(text)} chars")
         return text
 
@@ -50,15 +123,184 @@ class ClaudeClient:
         self,
         prompt: str,
         system: str = "",
+        schema: Any = None,
+        max_tokens: int | None = None,
+        shared: str = "",
     ) -> str:
         """Generate JSON response from Claude.
 
+        With a schema, Claude must answer by calling a tool whose input
+        schema is the response schema, so the output is always JSON of that
+        shape. Without one, it is asked for JSON in the system prompt.
+
         Args:
             prompt: User message requesting JSON output
             system: System prompt
+            schema: Pydantic model or type (e.g. ``list[Model]``) of the response
+            max_tokens: Override default max tokens
+            shared: Contents shared by a group of requests (see ``generate()``)
 
         Returns:
             JSON string response
+
+        Raises:
+            ReplayMiss: In replay mode, if the response isn't cached
+            QuotaExhausted: If today's CLAUDE_DAILY_REQUESTS/TOKENS are used up
+        """
+        if schema is None:
+            json_system = f"{system}\n\nRespond with valid JSON only, no markdown."
+            return await self.generate(prompt, json_system, max_tokens, shared)
+
+        max_tokens = max_tokens or self.max_tokens
+        if self.cache is None:
+            return await self._generate_structured(prompt, system, max_tokens, schema, shared)
+        key = self._cache_key(prompt, system, shared, max_tokens, schema)
+        return await self.cache.get_or_call(
+            key,
+            lambda: self._generate_structured(prompt, system, max_tokens, schema, shared),
+            model=self.model,
+        )
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        system: str = "",
+        max_tokens: int | None = None,
+        schema: Any = None,
+        shared: str = "",
+    ) -> AsyncIterator[str]:
+        """Stream a completion from Claude as text deltas.
+
+        With an object schema, the deltas are the output tool's JSON input
+        as Claude writes it. Schemas Claude can't stream directly (arrays,
+        which are wrapped in an object) and cached responses arrive as a
+        single delta. A stream read to the end is cached if it validates
+        against the schema (when one is given); one that doesn't, or that
+        the caller abandons early, isn't, so a retry after bad output asks
+        the model again. An abandoned stream is still billed, so its
+        estimated usage goes into the ledger.
+
+        Args:
+            prompt: User message
+            system: System prompt
+            max_tokens: Override default max tokens
+            schema: Pydantic model or type of a JSON response
+            shared: Contents shared by a group of requests (see ``generate()``)
+
+        Yields:
+            Text deltas in order
+
+        Raises:
+            ReplayMiss: In replay mode, if the response isn't cached
+            QuotaExhausted: If today's CLAUDE_DAILY_REQUESTS/TOKENS are used up
         """
-        json_system = f"{system}\n\nRespond with valid JSON only, no markdown."
-        return await self.generate(prompt, json_system)
+        max_tokens = max_tokens or self.max_tokens
+        tool, wrapped = self._output_tool(schema) if schema is not None else (None, False)
+        if wrapped:
+            yield await self.generate_json(prompt, system, schema, max_tokens, shared)
+            return
+
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(prompt, system, shared, max_tokens, schema)
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+            if self.cache.replay:
+                raise ReplayMiss(f"No cached LLM response for {key[:12]} (replay mode)")
+
+        request = self._request(prompt, system, shared, max_tokens)
+        if tool is not None:
+            request["tools"] = [tool]
+            request["tool_choice"] = {"type": "tool", "name": _OUTPUT_TOOL}
+
+        logger.debug(f"Streaming with Claude: {prompt[:100]}...")
+        parts: list[str] = []
+        reported = rejected = False
+        with self.ledger.reserve(self.model, self.daily_requests, self.daily_tokens):
+            try:
+                async for response in self.transport.stream_message(**request):
+                    if response.text:
+                        parts.append(response.text)
+                        yield response.text
+                    else:
+                        self._record(response.usage)
+                        reported = True
+            except Exception:
+                # Refused before any output (e.g. 429): not billed
+                rejected = not parts
+                raise
+            finally:
+                if not reported and not rejected:
+                    # Abandoned or cut off: billed without a usage report
+                    self._record(TokenUsage.estimated(_request_text(request), "".join(parts)))
+
+        text = "".join(parts)
+        if key is not None and (schema is None or conforms(schema, text)):
+            self.cache.put(key, text, model=self.model)
+
+    def _cache_key(
+        self, prompt: str, system: str, shared: str, max_tokens: int, schema: Any = None
+    ) -> str:
+        # Claude runs at its default temperature
+        return response_key(
+            self.model,
+            None,
+            max_tokens,
+            prompt,
+            f"{system}\0{shared}" if shared else system,
+            schema=schema_fingerprint(schema) if schema is not None else "",
+        )
+
+    def _output_tool(self, schema: Any) -> tuple[dict, bool]:
+        """Tool Claude is forced to call with the response, and whether it's wrapped."""
+        # Tool inputs must be objects, so other shapes (arrays) are wrapped
+        schema_json = json_schema(schema)
+        wrapped = schema_json.get("type") != "object"
+        if wrapped:
+            defs = schema_json.pop("$defs", None)
+            schema_json = {
+                "type": "object",
+                "properties": {"result": schema_json},
+                "required": ["result"],
+            }
+            if defs:
+                schema_json["$defs"] = defs
+
+        tool = {
+            "name": _OUTPUT_TOOL,
+            "description": "Record the response.",
+            "input_schema": schema_json,
+        }
+        if self.prompt_caching:
+            # Tools come first in the prompt, so the schema is cached on its own too
+            tool["cache_control"] = cache_control(self.cache_ttl)
+        return tool, wrapped
+
+    async def _generate_structured(
+        self,
+        prompt: str,
+        system: str,
+        max_tokens: int,
+        schema: Any,
+        shared: str = "",
+    ) -> str:
+        tool, wrapped = self._output_tool(schema)
+        logger.debug(f"Generating structured output with Claude: {prompt[:100]}...")
+        response = await self._send(
+            **self._request(prompt, system, shared, max_tokens),
+            tools=[tool],
+            tool_choice={"type": "tool", "name": _OUTPUT_TOOL},
+        )
+
+        data = response.data or {}
+        return json.dumps(data["result"] if wrapped else data)
+
+
+def _request_text(request: dict) -> str:
+    """Prompt text of a request, for estimating usage the provider didn't report."""
+    system = request.get("system") or []
+    blocks = system if isinstance(system, list) else [{"text": system}]
+    messages = [m["content"] for m in request["messages"] if isinstance(m["content"], str)]
+    return "".join([*(b["text"] for b in blocks), *messages])
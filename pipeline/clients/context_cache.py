@@ -0,0 +1,186 @@
+"""Provider-side caching of stable prompt prefixes (system prompt, schema, shared context)."""
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+
+from ..utils.logging import get_logger
+from ..utils.rate_limiter import estimate_tokens
+
+logger = get_logger(__name__)
+
+# Refresh a cache this many seconds before it expires, so no request races the expiry
+_REFRESH_MARGIN_S = 60
+
+
+@dataclass
+class TokenUsage:
+    """Input/output tokens reported by the provider, split by how input was billed."""
+
+    input_tokens: int = 0  # billed at the full input rate
+    cached_tokens: int = 0  # served from a provider cache at the reduced rate
+    cache_write_tokens: int = 0  # written to a cache (Claude bills these at a premium)
+    output_tokens: int = 0
+    requests: int = 0
+
+    @classmethod
+    def estimated(cls, prompt: str, output: str = "") -> "TokenUsage":
+        """Usage of one request the provider never reported (e.g. abandoned mid-way)."""
+        return cls(
+            input_tokens=estimate_tokens(prompt),
+            output_tokens=estimate_tokens(output) if output else 0,
+            requests=1,
+        )
+
+    def add(self, other: "TokenUsage") -> None:
+        self.input_tokens += other.input_tokens
+        self.cached_tokens += other.cached_tokens
+        self.cache_write_tokens += other.cache_write_tokens
+        self.output_tokens += other.output_tokens
+        self.requests += other.requests
+
+    @property
+    def prompt_tokens(self) -> int:
+        return self.input_tokens + self.cached_tokens + self.cache_write_tokens
+
+    @property
+    def cached_share(self) -> float:
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "input_tokens": self.input_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_share": round(self.cached_share, 3),
+        }
+
+
+@dataclass
+class CachedPrefix:
+    """Handle of a provider cache holding one prompt prefix."""
+
+    name: str
+    key: str
+    tokens: int
+    expires_at: float
+
+    def expires_within(self, seconds: float) -> bool:
+        return self.expires_at - time.time() <= seconds
+
+
+def prefix_key(model: str, system: str, shared: str = "") -> str:
+    """Identify a cacheable prefix (caches are per model)."""
+    return hashlib.sha256(f"{model}\0{system}\0{shared}".encode()).hexdigest()
+
+
+class GeminiContextCache:
+    """Explicit Gemini context caches for stable prompt prefixes.
+
+    A prefix (system instruction plus optional shared contents) is uploaded
+    once and referenced by name in later requests, which bills its tokens
+    at the cached rate. Handles are refreshed shortly before they expire,
+    recreated if the provider dropped them, and deleted by ``close()``.
+    Prefixes shorter than ``min_tokens`` (the provider's minimum cache size)
+    are not cached; they still benefit from Gemini's implicit caching since
+    requests send them first, unchanged.
+    """
+
+    def __init__(self, transport, ttl: int = 3600, min_tokens: int = 4096):
+        """Initialize cache.
+
+        Args:
+            transport: Gemini transport (see ``transports.GenAITransport``)
+            ttl: Seconds a cache lives without being refreshed
+            min_tokens: Smallest prefix worth caching
+        """
+        self.transport = transport
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.created = 0
+        self.refreshed = 0
+        self._handles: dict[str, CachedPrefix] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._uncacheable: set[str] = set()
+
+    async def get(self, model: str, system: str, shared: str = "") -> str | None:
+        """Name of a live cache holding the prefix, creating it if needed.
+
+        Args:
+            model: Model the cache is for
+            system: System instruction
+            shared: Contents shared by the requests, placed after the system
+                instruction (e.g. per-topic context)
+
+        Returns:
+            Cache name to pass as ``cached_content``, or None when the prefix
+            is too small or the provider refused to cache it
+        """
+        key = prefix_key(model, system, shared)
+        if key in self._uncacheable:
+            return None
+        handle = self._handles.get(key)
+        if handle is not None and not handle.expires_within(_REFRESH_MARGIN_S):
+            return handle.name
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            handle = self._handles.get(key)
+            if handle is not None and not handle.expires_within(_REFRESH_MARGIN_S):
+                return handle.name
+            if handle is not None and not handle.expires_within(0):
+                try:
+                    await self.transport.update_cache(handle.name, self.ttl)
+                    handle.expires_at = time.time() + self.ttl
+                    self.refreshed += 1
+                    return handle.name
+                except Exception as e:
+                    logger.debug(f"Refreshing context cache {handle.name} failed: {e}")
+            self._handles.pop(key, None)
+
+            if estimate_tokens(system + shared) < self.min_tokens:
+                self._uncacheable.add(key)
+                return None
+            try:
+                name, tokens = await self.transport.create_cache(
+                    model, system, [shared] if shared else [], self.ttl
+                )
+            except Exception as e:
+                logger.warning(f"Context caching unavailable, sending prefix uncached: {e}")
+                self._uncacheable.add(key)
+                return None
+
+            self._handles[key] = CachedPrefix(name, key, tokens, time.time() + self.ttl)
+            self.created += 1
+            logger.debug(f"Created context cache {name} ({tokens} tokens)")
+            return name
+
+    def invalidate(self, name: str) -> None:
+        """Forget a handle the provider no longer recognises (e.g. expired early)."""
+        for key, handle in list(self._handles.items()):
+            if handle.name == name:
+                del self._handles[key]
+
+    async def close(self) -> None:
+        """Delete every cache this process created (they'd expire on their own)."""
+        handles, self._handles = list(self._handles.values()), {}
+        for handle in handles:
+            if handle.expires_within(0):
+                continue
+            try:
+                await self.transport.delete_cache(handle.name)
+            except Exception as e:
+                logger.debug(f"Deleting context cache {handle.name} failed: {e}")
+
+
+def cache_control(ttl: int) -> dict:
+    """Anthropic ``cache_control`` marker for a prompt cache breakpoint.
+
+    Claude offers 5-minute and 1-hour prompt caches; longer TTLs get the
+    1-hour cache.
+    """
+    if ttl > 300:
+        return {"type": "ephemeral", "ttl": "1h"}
+    return {"type": "ephemeral"}
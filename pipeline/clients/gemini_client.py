@@ -1,9 +1,19 @@
 """Gemini API client wrapper using google-genai SDK."""
 
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
 from google import genai
 
 from ..config import get_settings
 from ..utils.logging import get_logger
+from .context_cache import GeminiContextCache, TokenUsage
+from .response_cache import ReplayMiss, ResponseCache, response_key
+from .structured import conforms, schema_fingerprint
+from .transports import CacheNotFound, GenAITransport, TransportResponse
+from .usage_ledger import UsageLedger
 
 logger = get_logger(__name__)
 
@@ -11,41 +21,257 @@ logger = get_logger(__name__)
 class GeminiClient:
     """Wrapper for Gemini API with generation and embedding support."""
 
-    def __init__(self):
+    def __init__(self, transport=None):
+        """Initialize client.
+
+        Args:
+            transport: Transport for generation calls (default: the
+                google-genai SDK; see ``transports.StubGeminiTransport``)
+        """
         settings = get_settings()
         self.client = genai.Client(api_key=settings.google_api_key)
+        self.transport = transport or GenAITransport(self.client)
         self.model = settings.gemini_model
         self.embedding_model = settings.embedding_model
+        self.temperature = 0.7
+        self.cache = ResponseCache.from_settings()
+        self.usage = TokenUsage()
+        self.ledger = UsageLedger.from_settings()
+        self.daily_requests = settings.llm_daily_requests
+        self.daily_tokens = settings.llm_daily_tokens
+        self.context_cache = None
+        if settings.context_cache:
+            self.context_cache = GeminiContextCache(
+                self.transport,
+                ttl=settings.context_cache_ttl_s,
+                min_tokens=settings.context_cache_min_tokens,
+            )
 
-    async def generate(self, prompt: str, max_tokens: int = 4096) -> str:
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 4096,
+        schema: Any = None,
+        system: str = "",
+        shared: str = "",
+    ) -> str:
         """Generate text completion from Gemini.
 
+        Identical calls (model, temperature, max_tokens, schema, prompts) are
+        served from the response cache when it's enabled. The stable prefix
+        (``system`` then ``shared``) goes first in the request and, when
+        it's large enough, into a provider context cache, so repeated
+        prefixes are billed at the cached rate.
+
         Args:
-            prompt: Input prompt
+            prompt: Input prompt (the part that changes between requests)
             max_tokens: Maximum output tokens (default 2048 for longer answers)
+            schema: Pydantic model or type (e.g. ``list[Model]``); constrains
+                the response to JSON matching it (native response schema)
+            system: System instruction shared by many requests
+            shared: Contents shared by a group of requests (e.g. per-topic
+                context), sent after the system instruction
 
         Returns:
-            Generated text response
-        """
-        logger.debug(f"Generating with Gemini: {prompt[:100]}...")
+            Generated text response (JSON text when a schema is given)
 
-        response = await self.client.aio.models.generate_content(
+        Raises:
+            ReplayMiss: In replay mode, if the response isn't cached
+            QuotaExhausted: If today's LLM_DAILY_REQUESTS/TOKENS are used up
+            json.JSONDecodeError: If a schema was given and the response
+                isn't JSON (e.g. cut off by the output limit)
+        """
+        if self.cache is None:
+            return await self._generate(prompt, max_tokens, schema, system, shared)
+        key = self._cache_key(prompt, max_tokens, schema, system, shared)
+        return await self.cache.get_or_call(
+            key,
+            lambda: self._generate(prompt, max_tokens, schema, system, shared),
             model=self.model,
-            contents=prompt,
-            config={
-                "max_output_tokens": max_tokens,
-                "temperature": 0.7,
-            },
         )
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 4096,
+        schema: Any = None,
+        system: str = "",
+        shared: str = "",
+    ) -> AsyncIterator[str]:
+        """Stream a completion from Gemini as text deltas.
+
+        Takes the same arguments as ``generate()``. A cached response
+        arrives as a single delta. A stream read to the end is cached if
+        it validates against the schema (when one is given); one that
+        doesn't, or that the caller abandons early, isn't, so a retry after
+        bad output asks the model again. An abandoned stream is still
+        billed, so its estimated usage goes into the ledger.
+
+        Yields:
+            Text deltas in order
+
+        Raises:
+            ReplayMiss: In replay mode, if the response isn't cached
+            QuotaExhausted: If today's LLM_DAILY_REQUESTS/TOKENS are used up
+        """
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(prompt, max_tokens, schema, system, shared)
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+            if self.cache.replay:
+                raise ReplayMiss(f"No cached LLM response for {key[:12]} (replay mode)")
+
+        logger.debug(f"Streaming with Gemini: {prompt[:100]}...")
+        parts: list[str] = []
+        use_context_cache = True
+        while True:
+            contents, config, cache_name = await self._request(
+                prompt, max_tokens, schema, system, shared, use_context_cache
+            )
+            start = len(parts)
+            reported = rejected = False
+            try:
+                with self.ledger.reserve(self.model, self.daily_requests, self.daily_tokens):
+                    try:
+                        async for response in self.transport.generate_stream(
+                            self.model, contents, config
+                        ):
+                            if response.text:
+                                parts.append(response.text)
+                                yield response.text
+                            else:
+                                self._record(response.usage)
+                                reported = True
+                    except Exception:
+                        # Refused before any output (e.g. 429, stale cache): not billed
+                        rejected = len(parts) == start
+                        raise
+                    finally:
+                        if not reported and not rejected:
+                            # Abandoned or cut off: billed without a usage report
+                            self._record(
+                                TokenUsage.estimated(
+                                    _request_text(contents, config), "".join(parts[start:])
+                                )
+                            )
+                break
+            except CacheNotFound:
+                if parts:
+                    raise
+                logger.debug(f"Context cache {cache_name} is gone; sending the prefix uncached")
+                self.context_cache.invalidate(cache_name)
+                use_context_cache = False
+
+        text = "".join(parts)
+        if key is not None and (schema is None or conforms(schema, text)):
+            self.cache.put(key, text, model=self.model)
+
+    def _cache_key(
+        self, prompt: str, max_tokens: int, schema: Any, system: str, shared: str
+    ) -> str:
+        return response_key(
+            self.model,
+            self.temperature,
+            max_tokens,
+            prompt,
+            system=f"{system}\0{shared}" if shared else system,
+            schema=schema_fingerprint(schema) if schema is not None else "",
+        )
+
+    async def _request(
+        self,
+        prompt: str,
+        max_tokens: int,
+        schema: Any,
+        system: str,
+        shared: str,
+        use_context_cache: bool,
+    ) -> tuple[str | list[str], dict, str | None]:
+        """Contents, config and context cache name of a generate request."""
+        config: dict = {
+            "max_output_tokens": max_tokens,
+            "temperature": self.temperature,
+        }
+        if schema is not None:
+            config["response_mime_type"] = "application/json"
+            config["response_schema"] = schema
+
+        cache_name = None
+        if (system or shared) and use_context_cache and self.context_cache is not None:
+            cache_name = await self.context_cache.get(self.model, system, shared)
+        if cache_name:
+            # The cache holds the system instruction and shared contents
+            config["cached_content"] = cache_name
+            contents: str | list[str] = prompt
+        else:
+            if system:
+                config["system_instruction"] = system
+            contents = [shared, prompt] if shared else prompt
+        return contents, config, cache_name
+
+    async def _generate(
+        self,
+        prompt: str,
+        max_tokens: int,
+        schema: Any = None,
+        system: str = "",
+        shared: str = "",
+        use_context_cache: bool = True,
+    ) -> str:
+        logger.debug(f"Generating with Gemini: {prompt[:100]}...")
+        contents, config, cache_name = await self._request(
+            prompt, max_tokens, schema, system, shared, use_context_cache
+        )
+        try:
+            response = await self._send(contents, config)
+        except CacheNotFound:
+            logger.debug(f"Context cache {cache_name} is gone; sending the prefix uncached")
+            self.context_cache.invalidate(cache_name)
+            return await self._generate(
+                prompt, max_tokens, schema, system, shared, use_context_cache=False
+            )
         text = response.text
         logger.debug(f"Gemini response: {len(text)} chars")
+        if schema is not None:
+            # Raising here keeps malformed output out of the response cache
+            json.loads(text)
         return text
 
-    def embed(self, texts: list[str]) -> list[list[float]]:
+    async def _send(self, contents: str | list[str], config: dict) -> TransportResponse:
+        """One provider call, held against today's quota and recorded in the ledger."""
+        with self.ledger.reserve(self.model, self.daily_requests, self.daily_tokens):
+            try:
+                response = await self.transport.generate(self.model, contents, config)
+            except asyncio.CancelledError:
+                # Hedge loser or cancelled run: the prompt is billed all the same
+                self._record(TokenUsage.estimated(_request_text(contents, config)))
+                raise
+            self._record(response.usage)
+        return response
+
+    def _record(self, usage: TokenUsage) -> None:
+        """Count a provider call's tokens for this run and in the daily ledger."""
+        self.usage.add(usage)
+        self.ledger.record(self.model, usage)
+
+    async def close(self) -> None:
+        """Release provider context caches created by this client."""
+        if self.context_cache is not None:
+            await self.context_cache.close()
+
+    def embed(
+        self,
+        texts: list[str],
+        output_dimensionality: int | None = None,
+    ) -> list[list[float]]:
         """Generate embeddings for texts.
 
         Args:
             texts: List of texts to embed
+            output_dimensionality: Optional truncated vector size
 
         Returns:
             List of embedding vectors
@@ -55,16 +281,22 @@ class GeminiClient:
         result = self.client.models.embed_content(
             model=self.embedding_model,
             contents=texts,
+            config=self._embed_config(output_dimensionality),
         )
 
         # Extract embeddings from response
         return [emb.values for emb in result.embeddings]
 
-    async def embed_async(self, texts: list[str]) -> list[list[float]]:
+    async def embed_async(
+        self,
+        texts: list[str],
+        output_dimensionality: int | None = None,
+    ) -> list[list[float]]:
         """Async embedding.
 
         Args:
             texts: List of texts to embed
+            output_dimensionality: Optional truncated vector size
 
         Returns:
             List of embedding vectors
@@ -74,6 +306,20 @@ class GeminiClient:
         result = await self.client.aio.models.embed_content(
             model=self.embedding_model,
             contents=texts,
+            config=self._embed_config(output_dimensionality),
         )
 
         return [emb.values for emb in result.embeddings]
+
+    def _embed_config(self, output_dimensionality: int | None) -> dict | None:
+        """Build embed_content config (provider-side truncation if requested)."""
+        if not output_dimensionality:
+            return None
+        return {"output_dimensionality": output_dimensionality}
+
+
+def _request_text(contents: str | list[str], config: dict) -> str:
+    """Prompt text of a request, for estimating usage the provider didn't report."""
+    parts = contents if isinstance(contents, list) else [contents]
+    return "".join([config.get("system_instruction") or "", *parts])
+
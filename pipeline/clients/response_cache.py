@@ -0,0 +1,218 @@
+"""Content-addressed on-disk cache of LLM responses."""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from ..config import get_settings
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ReplayMiss(LookupError):
+    """Raised in replay mode when a prompt has no cached response."""
+
+
+def response_key(
+    model: str,
+    temperature: float | None,
+    max_tokens: int | None,
+    prompt: str,
+    system: str = "",
+    schema: str = "",
+) -> str:
+    """Build the cache key for one LLM call.
+
+    Args:
+        model: Model name
+        temperature: Sampling temperature (None = provider default)
+        max_tokens: Output token limit (None = provider default)
+        prompt: User prompt
+        system: System prompt
+        schema: Response schema fingerprint, for structured output
+
+    Returns:
+        Hex digest identifying the call
+    """
+    prompt_hash = hashlib.sha256(f"{system}\0{schema}\0{prompt}".encode()).hexdigest()
+    header = json.dumps([model, temperature, max_tokens, prompt_hash])
+    return hashlib.sha256(header.encode()).hexdigest()
+
+
+class ResponseCache:
+    """LLM responses stored one file per key under ``root``.
+
+    Entries older than ``ttl`` seconds are ignored and deleted on lookup, and
+    the oldest entries are evicted once ``max_entries`` is reached. In replay
+    mode a miss raises ``ReplayMiss`` instead of calling the provider, so
+    reruns of downstream stages are offline and deterministic. In refresh
+    mode every lookup misses and new responses overwrite the old entries,
+    so regenerating a card asks the provider again.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        ttl: float | None = None,
+        max_entries: int = 20_000,
+        replay: bool = False,
+        refresh: bool = False,
+    ):
+        """Initialize cache.
+
+        Args:
+            root: Directory holding the entries
+            ttl: Seconds an entry stays valid (None = forever)
+            max_entries: Maximum number of cached responses
+            replay: Serve from the cache only, never call the provider
+            refresh: Ignore stored entries and overwrite them with new responses
+        """
+        self.root = Path(root)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.replay = replay
+        self.refresh = refresh and not replay
+        self.hits = 0
+        self.misses = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._index: dict[str, float] | None = None  # key -> created, built lazily
+
+    @classmethod
+    def from_settings(cls) -> "ResponseCache | None":
+        """Cache configured by LLM_CACHE* settings (None when disabled)."""
+        settings = get_settings()
+        if not (settings.llm_cache or settings.llm_replay):
+            return None
+        ttl_days = settings.llm_cache_ttl_days
+        return cls(
+            settings.llm_cache_dir,
+            ttl=ttl_days * 86400 if ttl_days > 0 else None,
+            max_entries=settings.llm_cache_size,
+            replay=settings.llm_replay,
+            refresh=settings.llm_cache_refresh,
+        )
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _entries(self) -> dict[str, float]:
+        """Creation time of every stored entry (scanned once per process)."""
+        if self._index is None:
+            self._index = {}
+            for path in self.root.glob("*/*.json"):
+                self._index[path.stem] = path.stat().st_mtime
+        return self._index
+
+    def get(self, key: str) -> str | None:
+        """Look up a cached response and record a hit or miss."""
+        if self.refresh:
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        if self.ttl is not None and time.time() - entry.get("created", 0) > self.ttl:
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry.get("text")
+
+    def put(self, key: str, text: str, **info) -> None:
+        """Store a response, evicting the oldest entries when full.
+
+        Args:
+            key: Key from ``response_key()``
+            text: Response text
+            **info: Extra fields kept with the entry for debugging (model, ...)
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        created = time.time()
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"created": created, "text": text, **info}, f)
+        os.replace(tmp, path)
+
+        entries = self._entries()
+        entries[key] = created
+        if len(entries) > self.max_entries:
+            overflow = len(entries) - self.max_entries
+            for old in sorted(entries, key=entries.get)[:overflow]:
+                self._remove(old)
+
+    def _remove(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+        if self._index is not None:
+            self._index.pop(key, None)
+
+    async def get_or_call(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[str]],
+        **info,
+    ) -> str:
+        """Return the cached response, or make the call and cache its result.
+
+        Concurrent lookups of the same key share one provider call.
+
+        Args:
+            key: Key from ``response_key()``
+            call: Coroutine factory making the provider call
+            **info: Extra fields stored with a new entry
+
+        Returns:
+            Response text
+
+        Raises:
+            ReplayMiss: In replay mode, if the key isn't cached
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        if self.replay:
+            raise ReplayMiss(f"No cached LLM response for {key[:12]} (replay mode)")
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            text = await call()
+        except asyncio.CancelledError:
+            future.cancel()  # waiters retry rather than hang on an abandoned call
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when no one else is waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(text)
+        self.put(key, text, **info)
+        return text
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "replay": self.replay,
+            "refresh": self.refresh,
+        }
@@ -0,0 +1,518 @@
+"""Routing LLM requests across providers, with hedging and failover."""
+
+import asyncio
+import bisect
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from ..config import get_settings
+from ..utils.logging import get_logger
+from ..utils.rate_limiter import RateLimiter, estimate_tokens
+from .context_cache import TokenUsage
+from .usage_ledger import UsageLedger
+
+logger = get_logger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+
+# Samples a provider needs before its p95 is trusted as a hedge delay
+_MIN_HEDGE_SAMPLES = 5
+
+# Added to the score of a provider whose daily quota can't cover the request,
+# so it's only tried once every provider with quota left has failed
+_OUT_OF_QUOTA_PENALTY_MS = 1e9
+
+
+@dataclass
+class LatencyHistogram:
+    """Counts of request latencies in fixed log-spaced buckets."""
+
+    counts: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def record(self, latency_ms: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+    def buckets(self) -> dict[str, int]:
+        """Counts keyed by bucket label ("<=250ms", ..., ">64000ms")."""
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS]
+        labels.append(f">{LATENCY_BUCKETS_MS[-1]}ms")
+        return dict(zip(labels, self.counts))
+
+
+@dataclass
+class ProviderStats:
+    """Rolling health of one provider plus lifetime counters."""
+
+    window: int = 100
+    latencies_ms: deque = field(default_factory=deque)  # successful calls only
+    outcomes: deque = field(default_factory=deque)  # True = success
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    requests: int = 0
+    failures: int = 0
+    hedges: int = 0  # hedged duplicates sent to this provider
+    wins: int = 0  # requests this provider answered first while another was in flight
+    cancelled: int = 0  # calls abandoned unfinished (hedge losers, rejected streams)
+    cooldown_until: float = 0.0  # rate limited until (monotonic time)
+
+    def __post_init__(self):
+        self.latencies_ms = deque(maxlen=self.window)
+        self.outcomes = deque(maxlen=self.window)
+
+    def record(self, latency_ms: float | None) -> None:
+        """Record a finished call (latency None = failed)."""
+        self.outcomes.append(latency_ms is not None)
+        if latency_ms is None:
+            self.failures += 1
+            return
+        self.latencies_ms.append(latency_ms)
+        self.histogram.record(latency_ms)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def percentile(self, q: float) -> float | None:
+        if not self.latencies_ms:
+            return None
+        return float(np.percentile(np.asarray(self.latencies_ms), q))
+
+    def summary(self) -> dict:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "error_rate": round(self.error_rate, 3),
+            "p50_ms": round(p50) if p50 is not None else None,
+            "p95_ms": round(p95) if p95 is not None else None,
+            "hedges": self.hedges,
+            "wins": self.wins,
+            "cancelled": self.cancelled,
+            "histogram": self.histogram.buckets(),
+        }
+
+
+class GeminiProvider:
+    """Router adapter for ``GeminiClient``."""
+
+    def __init__(self, client, name: str = "gemini"):
+        self.client = client
+        self.name = name
+
+    async def generate(
+        self, prompt: str, max_tokens: int, schema: Any, system: str, shared: str = ""
+    ) -> str:
+        return await self.client.generate(
+            prompt, max_tokens=max_tokens, schema=schema, system=system, shared=shared
+        )
+
+    def stream(
+        self, prompt: str, max_tokens: int, schema: Any, system: str, shared: str = ""
+    ) -> AsyncIterator[str]:
+        return self.client.generate_stream(
+            prompt, max_tokens=max_tokens, schema=schema, system=system, shared=shared
+        )
+
+    def remaining(self) -> tuple[int | None, int | None]:
+        """Requests and tokens left of the model's daily quota (None = no limit)."""
+        client = self.client
+        return client.ledger.remaining(client.model, client.daily_requests, client.daily_tokens)
+
+
+class ClaudeProvider:
+    """Router adapter for ``ClaudeClient``."""
+
+    def __init__(self, client, name: str = "claude"):
+        self.client = client
+        self.name = name
+
+    async def generate(
+        self, prompt: str, max_tokens: int, schema: Any, system: str, shared: str = ""
+    ) -> str:
+        if schema is None:
+            return await self.client.generate(
+                prompt, system=system, max_tokens=max_tokens, shared=shared
+            )
+        return await self.client.generate_json(
+            prompt, system=system, schema=schema, max_tokens=max_tokens, shared=shared
+        )
+
+    def stream(
+        self, prompt: str, max_tokens: int, schema: Any, system: str, shared: str = ""
+    ) -> AsyncIterator[str]:
+        return self.client.generate_stream(
+            prompt, system=system, max_tokens=max_tokens, schema=schema, shared=shared
+        )
+
+    def remaining(self) -> tuple[int | None, int | None]:
+        """Requests and tokens left of the model's daily quota (None = no limit)."""
+        client = self.client
+        return client.ledger.remaining(client.model, client.daily_requests, client.daily_tokens)
+
+
+class StubProvider:
+    """Local provider answering with ``respond(prompt)`` after a set latency.
+
+    ``latency_s`` may be a number or a callable returning one per call, and
+    ``fail`` a callable deciding per call whether to raise, so routing,
+    hedging and failover can be exercised without network access. With a
+    ``ledger``, calls are held against the daily limits under the
+    provider's name and their estimated usage is recorded, like the real
+    clients do.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        respond: Callable[[str], str] | None = None,
+        latency_s: float | Callable[[], float] = 0.0,
+        fail: Callable[[], bool] | None = None,
+        ledger: UsageLedger | None = None,
+        daily_requests: int = 0,
+        daily_tokens: int = 0,
+    ):
+        self.name = name
+        self.respond = respond or (lambda prompt: "{}")
+        self.latency_s = latency_s
+        self.fail = fail
+        self.ledger = ledger
+        self.daily_requests = daily_requests
+        self.daily_tokens = daily_tokens
+        self.calls = 0
+
+    async def generate(
+        self, prompt: str, max_tokens: int, schema: Any, system: str, shared: str = ""
+    ) -> str:
+        if self.ledger is None:
+            return await self._respond(prompt)
+        with self.ledger.reserve(self.name, self.daily_requests, self.daily_tokens):
+            text = await self._respond(prompt)
+            self.ledger.record(self.name, TokenUsage.estimated(system + shared + prompt, text))
+        return text
+
+    async def _respond(self, prompt: str) -> str:
+        self.calls += 1
+        latency = self.latency_s() if callable(self.latency_s) else self.latency_s
+        await asyncio.sleep(latency)
+        if self.fail is not None and self.fail():
+            raise RuntimeError(f"{self.name} stub failure")
+        return self.respond(prompt)
+
+    async def stream(
+        self, prompt: str, max_tokens: int, schema: Any, system: str, shared: str = ""
+    ) -> AsyncIterator[str]:
+        text = await self.generate(prompt, max_tokens, schema, system, shared)
+        for i in range(0, len(text), 16):
+            await asyncio.sleep(0)
+            yield text[i : i + 16]
+
+    def remaining(self) -> tuple[int | None, int | None]:
+        """Requests and tokens left today (None = no limit or no ledger)."""
+        if self.ledger is None:
+            return None, None
+        return self.ledger.remaining(self.name, self.daily_requests, self.daily_tokens)
+
+
+@dataclass
+class _Route:
+    provider: Any
+    limiter: RateLimiter
+    stats: ProviderStats
+    rank: int
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether a provider error means its quota is exhausted (HTTP 429)."""
+    return 429 in (getattr(error, "code", None), getattr(error, "status_code", None))
+
+
+class LLMRouter:
+    """Sends each request to the provider expected to answer it soonest.
+
+    Providers are ranked per request by their rolling median latency,
+    inflated by their recent error rate, plus the time their RPM/TPM
+    limiter would make the request wait; providers that returned HTTP 429
+    sit out a cooldown, and providers whose remaining daily quota (see
+    ``UsageLedger``) can't cover the request go last. If the chosen
+    provider hasn't answered after its own rolling p95 latency, a hedged
+    duplicate goes to the next provider and whichever answers first wins;
+    the other call is cancelled. A failed call fails over to the next
+    provider immediately.
+    """
+
+    def __init__(
+        self,
+        providers: list,
+        limiters: list[RateLimiter] | None = None,
+        hedge: bool = True,
+        cooldown_s: float = 30.0,
+        cold_latency_ms: float = 5000.0,
+        error_penalty: float = 4.0,
+    ):
+        """Initialize router.
+
+        Args:
+            providers: Providers in order of preference (objects with
+                ``name`` and ``generate(prompt, max_tokens, schema, system,
+                shared)``,
+                optionally ``remaining()`` of their daily quota)
+            limiters: RPM/TPM limiter per provider (default: unlimited)
+            hedge: Send hedged duplicates of slow requests
+            cooldown_s: Seconds a rate-limited provider is skipped
+            cold_latency_ms: Latency assumed for a provider with no samples
+            error_penalty: Weight of the error rate in a provider's score
+        """
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider")
+        limiters = limiters or [RateLimiter() for _ in providers]
+        self.routes = [
+            _Route(provider, limiter, ProviderStats(), rank)
+            for rank, (provider, limiter) in enumerate(zip(providers, limiters))
+        ]
+        self.hedge = hedge
+        self.cooldown_s = cooldown_s
+        self.cold_latency_ms = cold_latency_ms
+        self.error_penalty = error_penalty
+
+    @classmethod
+    def from_settings(cls, gemini=None, claude=None) -> "LLMRouter":
+        """Router over the providers in LLM_PROVIDERS that are configured.
+
+        Claude is only used when ANTHROPIC_API_KEY is set. In replay mode
+        responses come from the cache, so limits and hedging are off.
+
+        Args:
+            gemini: GeminiClient to use (default: a new one)
+            claude: ClaudeClient to use (default: a new one)
+        """
+        from .claude_client import ClaudeClient
+        from .gemini_client import GeminiClient
+
+        settings = get_settings()
+        providers, limiters = [], []
+        for name in (n.strip() for n in settings.llm_providers.split(",")):
+            if name == "gemini":
+                providers.append(GeminiProvider(gemini or GeminiClient()))
+                limiters.append(RateLimiter(rpm=settings.llm_rpm, tpm=settings.llm_tpm))
+            elif name == "claude" and (claude is not None or settings.anthropic_api_key):
+                providers.append(ClaudeProvider(claude or ClaudeClient()))
+                limiters.append(RateLimiter(rpm=settings.claude_rpm, tpm=settings.claude_tpm))
+            elif name != "claude":
+                logger.warning(f"Unknown LLM provider in LLM_PROVIDERS: {name}")
+
+        if settings.llm_replay:
+            limiters = [RateLimiter() for _ in providers]
+        return cls(
+            providers,
+            limiters,
+            hedge=settings.llm_hedge and not settings.llm_replay,
+            cooldown_s=settings.llm_cooldown_s,
+        )
+
+    @property
+    def providers(self) -> list:
+        return [route.provider for route in self.routes]
+
+    @property
+    def waited_s(self) -> float:
+        """Total time requests spent waiting for provider quota."""
+        return sum(route.limiter.waited_s for route in self.routes)
+
+    def _score(self, route: _Route, tokens: int, now: float) -> float:
+        """Expected milliseconds until the provider answers."""
+        median = route.stats.percentile(50)
+        latency = self.cold_latency_ms if median is None else median
+        score = latency * (1 + self.error_penalty * route.stats.error_rate)
+        score += route.limiter.wait_time(tokens) * 1000
+        score += max(0.0, route.stats.cooldown_until - now) * 1000
+        if self._out_of_quota(route, tokens):
+            score += _OUT_OF_QUOTA_PENALTY_MS
+        return score
+
+    @staticmethod
+    def _out_of_quota(route: _Route, tokens: int) -> bool:
+        """Whether the provider's remaining daily quota can't cover a request."""
+        remaining = getattr(route.provider, "remaining", None)
+        if remaining is None:
+            return False
+        requests, quota_tokens = remaining()
+        return requests == 0 or (quota_tokens is not None and quota_tokens < tokens)
+
+    def rank(self, tokens: int = 0) -> list[_Route]:
+        """Routes best first for a request of this size."""
+        now = time.monotonic()
+        return sorted(self.routes, key=lambda r: (self._score(r, tokens, now), r.rank))
+
+    def _hedge_delay(self, route: _Route) -> float | None:
+        """Seconds to wait on a call before hedging (None = don't hedge)."""
+        if len(route.stats.latencies_ms) < _MIN_HEDGE_SAMPLES:
+            return None
+        return route.stats.percentile(95) / 1000
+
+    async def _call(
+        self,
+        route: _Route,
+        prompt: str,
+        max_tokens: int,
+        schema: Any,
+        system: str,
+        shared: str,
+    ) -> str:
+        prompt_tokens = estimate_tokens(system + shared) + estimate_tokens(prompt)
+        reservation = await route.limiter.acquire(prompt_tokens + max_tokens)
+        route.stats.requests += 1
+        start = time.perf_counter()
+        try:
+            text = await route.provider.generate(prompt, max_tokens, schema, system, shared)
+        except asyncio.CancelledError:
+            route.stats.cancelled += 1
+            raise
+        except Exception as e:
+            route.stats.record(None)
+            if is_rate_limited(e):
+                route.stats.cooldown_until = time.monotonic() + self.cooldown_s
+                logger.warning(f"{route.provider.name} rate limited; cooling down")
+            raise
+        route.stats.record((time.perf_counter() - start) * 1000)
+        route.limiter.settle(reservation, prompt_tokens + estimate_tokens(text))
+        return text
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 4096,
+        schema: Any = None,
+        system: str = "",
+        shared: str = "",
+    ) -> str:
+        """Generate a completion from the best available provider.
+
+        Args:
+            prompt: User prompt
+            max_tokens: Maximum output tokens
+            schema: Pydantic model or type constraining the response to JSON
+            system: System prompt
+            shared: Contents shared by a group of requests, cached with the
+                system prompt as the stable prefix
+
+        Returns:
+            Text of the first successful response
+
+        Raises:
+            Exception: The last provider error, if every provider failed
+        """
+        routes = self.rank(
+            estimate_tokens(system + shared) + estimate_tokens(prompt) + max_tokens
+        )
+        queue = deque(routes)
+        pending: dict[asyncio.Task, _Route] = {}
+        last_error: BaseException | None = None
+
+        def launch() -> _Route:
+            route = queue.popleft()
+            task = asyncio.ensure_future(
+                self._call(route, prompt, max_tokens, schema, system, shared)
+            )
+            pending[task] = route
+            return route
+
+        latest = launch()
+        try:
+            while pending:
+                timeout = self._hedge_delay(latest) if self.hedge and queue else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    latest = launch()
+                    latest.stats.hedges += 1
+                    logger.debug(f"Hedging request to {latest.provider.name}")
+                    continue
+
+                for task in done:
+                    route = pending.pop(task)
+                    if task.exception() is None:
+                        if pending:
+                            route.stats.wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"{route.provider.name} failed: {last_error}")
+                if not pending and queue:
+                    latest = launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 4096,
+        schema: Any = None,
+        system: str = "",
+        shared: str = "",
+    ) -> AsyncIterator[str]:
+        """Stream a completion from the best available provider.
+
+        Streams aren't hedged: the caller consumes the deltas as they come,
+        so only one provider can be streaming. A provider that fails before
+        its first delta fails over to the next one; a failure mid-stream is
+        raised to the caller, which can retry. Closing this stream early
+        closes the provider's stream too, cancelling the upstream call.
+
+        Args:
+            prompt: User prompt
+            max_tokens: Maximum output tokens
+            schema: Pydantic model or type constraining the response to JSON
+            system: System prompt
+            shared: Contents shared by a group of requests (see ``generate()``)
+
+        Yields:
+            Text deltas in order
+
+        Raises:
+            Exception: The last provider error, if every provider failed
+        """
+        prompt_tokens = estimate_tokens(system + shared) + estimate_tokens(prompt)
+        last_error: Exception | None = None
+        for route in self.rank(prompt_tokens + max_tokens):
+            reservation = await route.limiter.acquire(prompt_tokens + max_tokens)
+            route.stats.requests += 1
+            start = time.perf_counter()
+            chars = 0
+            inner = route.provider.stream(prompt, max_tokens, schema, system, shared)
+            try:
+                async for delta in inner:
+                    chars += len(delta)
+                    yield delta
+            except Exception as e:
+                route.stats.record(None)
+                if is_rate_limited(e):
+                    route.stats.cooldown_until = time.monotonic() + self.cooldown_s
+                if chars:
+                    raise
+                logger.warning(f"{route.provider.name} failed: {e}")
+                last_error = e
+                continue
+            except GeneratorExit:
+                # Abandoned by the caller (e.g. output rejected mid-stream)
+                route.stats.cancelled += 1
+                raise
+            finally:
+                # Closes the provider's HTTP stream now rather than at garbage collection
+                await inner.aclose()
+            route.stats.record((time.perf_counter() - start) * 1000)
+            route.limiter.settle(reservation, prompt_tokens + chars // 4)
+            return
+        raise last_error
+
+    def stats(self) -> dict[str, dict]:
+        """Per-provider counters and latency histograms."""
+        return {route.provider.name: route.stats.summary() for route in self.routes}
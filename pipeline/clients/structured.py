@@ -0,0 +1,47 @@
+"""Schema-constrained LLM output: JSON schemas and validation from pydantic types."""
+
+import json
+from functools import lru_cache
+from typing import Any
+
+from pydantic import TypeAdapter, ValidationError
+
+
+@lru_cache(maxsize=64)
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def json_schema(schema: Any) -> dict:
+    """JSON schema of a pydantic model or type (e.g. ``list[Model]``)."""
+    return _adapter(schema).json_schema()
+
+
+def schema_fingerprint(schema: Any) -> str:
+    """Stable text form of a schema, for cache keys."""
+    return json.dumps(json_schema(schema), sort_keys=True)
+
+
+def parse_structured(schema: Any, text: str) -> Any:
+    """Validate JSON text against a schema in one pass.
+
+    Args:
+        schema: Pydantic model or type the text was generated for
+        text: Raw JSON returned by the provider
+
+    Returns:
+        Validated model instance (or list of instances)
+
+    Raises:
+        pydantic.ValidationError: If the text isn't valid JSON for the schema
+    """
+    return _adapter(schema).validate_json(text)
+
+
+def conforms(schema: Any, text: str) -> bool:
+    """Whether JSON text validates against a schema (e.g. before caching it)."""
+    try:
+        parse_structured(schema, text)
+    except ValidationError:
+        return False
+    return True
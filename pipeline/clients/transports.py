@@ -0,0 +1,262 @@
+"""Provider transports: the raw API calls behind GeminiClient and ClaudeClient.
+
+Clients build requests and handle caching; transports send them and report
+token usage. The stub transports answer in memory, so client logic
+(context caching, usage accounting, response caching) runs without network
+access or API keys. Streaming calls yield text deltas as TransportResponse
+objects and report the request's usage on the last one.
+"""
+
+import json
+import time
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+
+from google.genai import errors as genai_errors
+
+from ..utils.rate_limiter import estimate_tokens
+from .context_cache import TokenUsage
+
+# Characters per delta in the stub transports' streams
+_STUB_DELTA_CHARS = 16
+
+
+class CacheNotFound(LookupError):
+    """Raised when a request references a context cache the provider no longer has."""
+
+
+@dataclass
+class TransportResponse:
+    """Provider reply reduced to what the clients use."""
+
+    text: str
+    usage: TokenUsage = field(default_factory=TokenUsage)
+    data: dict | None = None  # tool input, for Claude structured output
+
+
+class GenAITransport:
+    """Gemini calls through the google-genai SDK."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def generate(self, model: str, contents: str | list, config: dict) -> TransportResponse:
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=model, contents=contents, config=config
+            )
+        except genai_errors.ClientError as e:
+            _raise_cache_not_found(e, config)
+            raise
+        return TransportResponse(response.text or "", _gemini_usage(response.usage_metadata))
+
+    async def generate_stream(
+        self, model: str, contents: str | list, config: dict
+    ) -> AsyncIterator[TransportResponse]:
+        try:
+            stream = await self.client.aio.models.generate_content_stream(
+                model=model, contents=contents, config=config
+            )
+        except genai_errors.ClientError as e:
+            _raise_cache_not_found(e, config)
+            raise
+
+        meta = None
+        async for chunk in stream:
+            meta = chunk.usage_metadata or meta
+            if chunk.text:
+                yield TransportResponse(chunk.text, TokenUsage())
+        yield TransportResponse("", _gemini_usage(meta))
+
+    async def create_cache(
+        self, model: str, system: str, contents: list[str], ttl: int
+    ) -> tuple[str, int]:
+        cache = await self.client.aio.caches.create(
+            model=model,
+            config={
+                "system_instruction": system or None,
+                "contents": contents or None,
+                "ttl": f"{ttl}s",
+            },
+        )
+        tokens = cache.usage_metadata.total_token_count if cache.usage_metadata else 0
+        return cache.name, tokens or 0
+
+    async def update_cache(self, name: str, ttl: int) -> None:
+        await self.client.aio.caches.update(name=name, config={"ttl": f"{ttl}s"})
+
+    async def delete_cache(self, name: str) -> None:
+        await self.client.aio.caches.delete(name=name)
+
+
+def _raise_cache_not_found(error: genai_errors.ClientError, config: dict) -> None:
+    if config.get("cached_content") and error.code in (403, 404):
+        raise CacheNotFound(str(error)) from error
+
+
+def _gemini_usage(meta) -> TokenUsage:
+    """Token usage from Gemini usage metadata (prompt count includes cached tokens)."""
+    if meta is None:
+        return TokenUsage(requests=1)
+    prompt_tokens = meta.prompt_token_count or 0
+    cached = meta.cached_content_token_count or 0
+    return TokenUsage(
+        input_tokens=prompt_tokens - cached,
+        cached_tokens=cached,
+        output_tokens=meta.candidates_token_count or 0,
+        requests=1,
+    )
+
+
+class AnthropicTransport:
+    """Claude calls through the anthropic SDK."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def create_message(self, **request) -> TransportResponse:
+        response = await self.client.messages.create(**request)
+        text = next((b.text for b in response.content if b.type == "text"), "")
+        data = next((b.input for b in response.content if b.type == "tool_use"), None)
+        return TransportResponse(text, _anthropic_usage(response.usage), data)
+
+    async def stream_message(self, **request) -> AsyncIterator[TransportResponse]:
+        """Stream text deltas, or the tool input JSON as it's written."""
+        async with self.client.messages.stream(**request) as stream:
+            async for event in stream:
+                if event.type != "content_block_delta":
+                    continue
+                if event.delta.type == "text_delta":
+                    yield TransportResponse(event.delta.text, TokenUsage())
+                elif event.delta.type == "input_json_delta":
+                    yield TransportResponse(event.delta.partial_json, TokenUsage())
+            message = await stream.get_final_message()
+        yield TransportResponse("", _anthropic_usage(message.usage))
+
+
+def _anthropic_usage(usage) -> TokenUsage:
+    """Token usage from a Claude response (input_tokens excludes cache reads/writes)."""
+    return TokenUsage(
+        input_tokens=usage.input_tokens,
+        cached_tokens=usage.cache_read_input_tokens or 0,
+        cache_write_tokens=usage.cache_creation_input_tokens or 0,
+        output_tokens=usage.output_tokens,
+        requests=1,
+    )
+
+
+class StubGeminiTransport:
+    """In-memory Gemini transport.
+
+    Answers with ``respond(prompt)`` and reports usage like the provider:
+    tokens in a referenced cache are cached, and a system instruction seen
+    before counts as an implicit cache hit. Every request is kept in
+    ``calls``.
+    """
+
+    def __init__(self, respond: Callable[[str], str] | None = None):
+        self.respond = respond or (lambda prompt: "{}")
+        self.calls: list[dict] = []
+        self.caches: dict[str, tuple[int, float]] = {}  # name -> (tokens, expires_at)
+        self._prefixes: set[str] = set()
+
+    async def generate(self, model: str, contents: str | list, config: dict) -> TransportResponse:
+        self.calls.append({"model": model, "contents": contents, "config": dict(config)})
+        parts = contents if isinstance(contents, list) else [contents]
+        prompt = parts[-1]
+
+        name = config.get("cached_content")
+        if name:
+            tokens, expires_at = self.caches.get(name, (0, 0.0))
+            if expires_at <= time.time():
+                raise CacheNotFound(f"CachedContent {name} not found")
+            cached = tokens
+        else:
+            prefix = config.get("system_instruction") or ""
+            cached = estimate_tokens(prefix) if prefix in self._prefixes else 0
+            self._prefixes.add(prefix)
+        uncached = sum(estimate_tokens(p) for p in parts) + (
+            0 if name or cached else estimate_tokens(config.get("system_instruction") or "")
+        )
+
+        text = self.respond(prompt)
+        usage = TokenUsage(
+            input_tokens=uncached,
+            cached_tokens=cached,
+            output_tokens=estimate_tokens(text),
+            requests=1,
+        )
+        return TransportResponse(text, usage)
+
+    async def generate_stream(
+        self, model: str, contents: str | list, config: dict
+    ) -> AsyncIterator[TransportResponse]:
+        response = await self.generate(model, contents, config)
+        for delta in _deltas(response.text):
+            yield TransportResponse(delta, TokenUsage())
+        yield TransportResponse("", response.usage)
+
+    async def create_cache(
+        self, model: str, system: str, contents: list[str], ttl: int
+    ) -> tuple[str, int]:
+        name = f"cachedContents/stub-{len(self.caches) + 1}"
+        tokens = estimate_tokens(system + "".join(contents))
+        self.caches[name] = (tokens, time.time() + ttl)
+        return name, tokens
+
+    async def update_cache(self, name: str, ttl: int) -> None:
+        if name not in self.caches:
+            raise CacheNotFound(f"CachedContent {name} not found")
+        self.caches[name] = (self.caches[name][0], time.time() + ttl)
+
+    async def delete_cache(self, name: str) -> None:
+        self.caches.pop(name, None)
+
+
+class StubAnthropicTransport:
+    """In-memory Claude transport.
+
+    Answers with ``respond(prompt)`` (JSON text, returned as tool input when
+    the request has tools) and reports prompt cache reads and writes for
+    the tools and system blocks marked with ``cache_control``.
+    """
+
+    def __init__(self, respond: Callable[[str], str] | None = None):
+        self.respond = respond or (lambda prompt: "{}")
+        self.calls: list[dict] = []
+        self._prefixes: set[str] = set()
+
+    async def create_message(self, **request) -> TransportResponse:
+        self.calls.append(request)
+        prompt = request["messages"][-1]["content"]
+        tools = request.get("tools", [])
+        system = request.get("system", [])
+        blocks = system if isinstance(system, list) else [{"text": system}]
+
+        prefix = json.dumps(tools) + "".join(b["text"] for b in blocks)
+        marked = any("cache_control" in item for item in [*tools, *blocks])
+        prefix_tokens = estimate_tokens(prefix)
+        usage = TokenUsage(input_tokens=estimate_tokens(prompt), requests=1)
+        if not marked:
+            usage.input_tokens += prefix_tokens
+        elif prefix in self._prefixes:
+            usage.cached_tokens = prefix_tokens
+        else:
+            usage.cache_write_tokens = prefix_tokens
+            self._prefixes.add(prefix)
+
+        text = self.respond(prompt)
+        usage.output_tokens = estimate_tokens(text)
+        return TransportResponse(text, usage, json.loads(text) if tools else None)
+
+    async def stream_message(self, **request) -> AsyncIterator[TransportResponse]:
+        response = await self.create_message(**request)
+        text = json.dumps(response.data) if response.data is not None else response.text
+        for delta in _deltas(text):
+            yield TransportResponse(delta, TokenUsage())
+        yield TransportResponse("", response.usage)
+
+
+def _deltas(text: str) -> list[str]:
+    """Split a stub response into stream deltas."""
+    return [text[i : i + _STUB_DELTA_CHARS] for i in range(0, len(text), _STUB_DELTA_CHARS)]
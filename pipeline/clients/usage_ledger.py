@@ -0,0 +1,151 @@
+"""Persistent per-day ledger of LLM requests and tokens, for daily quotas."""
+
+import json
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from ..config import get_settings
+from ..utils.logging import get_logger
+from .context_cache import TokenUsage
+
+logger = get_logger(__name__)
+
+
+class QuotaExhausted(RuntimeError):
+    """Raised instead of sending a request once a model's daily quota is used up."""
+
+    code = 429  # handled like a provider rate limit (see router.is_rate_limited)
+
+
+class UsageLedger:
+    """Requests and tokens per model per day, kept in one JSON file.
+
+    Days follow ``timezone``, the time zone the provider resets its daily
+    quotas in (Pacific time for Gemini), so "today" matches the provider's
+    count. Only provider calls are recorded; responses served from the
+    response cache cost no quota. The file is rewritten after each call
+    and keeps the last ``keep_days`` days.
+    """
+
+    def __init__(self, path: str | Path, timezone: str = "UTC", keep_days: int = 30):
+        """Initialize ledger, loading existing entries.
+
+        Args:
+            path: JSON file holding the ledger
+            timezone: IANA zone whose midnight starts a new day
+            keep_days: Days of history kept in the file
+        """
+        self.path = Path(path)
+        self.tz = ZoneInfo(timezone)
+        self.keep_days = keep_days
+        self.days: dict[str, dict[str, dict[str, int]]] = {}
+        self.in_flight: dict[str, int] = {}  # requests sent but not yet recorded
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    self.days = json.load(f).get("days", {})
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignoring unreadable usage ledger {self.path}: {e}")
+
+    @classmethod
+    def from_settings(cls) -> "UsageLedger":
+        """Ledger at USAGE_LEDGER_PATH, shared by every client in the process."""
+        settings = get_settings()
+        return _shared_ledger(settings.usage_ledger_path, settings.quota_timezone)
+
+    def today(self) -> str:
+        return datetime.now(self.tz).date().isoformat()
+
+    def record(self, model: str, usage: TokenUsage) -> None:
+        """Add one provider call's usage to today's totals and save."""
+        entry = self.days.setdefault(self.today(), {}).setdefault(
+            model, {"requests": 0, "input_tokens": 0, "output_tokens": 0}
+        )
+        entry["requests"] += max(1, usage.requests)
+        entry["input_tokens"] += usage.prompt_tokens
+        entry["output_tokens"] += usage.output_tokens
+        self.save()
+
+    @contextmanager
+    def reserve(
+        self, model: str, daily_requests: int = 0, daily_tokens: int = 0
+    ) -> Iterator[None]:
+        """Hold one of today's requests for a call while it's in flight.
+
+        Requests already in flight count against the limit, so concurrent
+        calls, retries and hedged duplicates can't overshoot it together.
+        Record the call's usage before leaving the block.
+
+        Args:
+            model: Model the request goes to
+            daily_requests: Requests per day (0 = unlimited)
+            daily_tokens: Tokens per day (0 = unlimited)
+
+        Raises:
+            QuotaExhausted: If today's requests or tokens are used up
+        """
+        used = self.used(model)
+        in_flight = self.in_flight.get(model, 0)
+        if daily_requests and used["requests"] + in_flight >= daily_requests:
+            raise QuotaExhausted(
+                f"{model}: {used['requests']}/{daily_requests} requests used today"
+            )
+        if daily_tokens and used["tokens"] >= daily_tokens:
+            raise QuotaExhausted(f"{model}: {used['tokens']}/{daily_tokens} tokens used today")
+        self.in_flight[model] = in_flight + 1
+        try:
+            yield
+        finally:
+            self.in_flight[model] -= 1
+
+    def remaining(
+        self, model: str, daily_requests: int = 0, daily_tokens: int = 0
+    ) -> tuple[int | None, int | None]:
+        """Requests and tokens a model has left today (None where there is no limit).
+
+        Requests in flight count as used.
+        """
+        used = self.used(model)
+        requests = tokens = None
+        if daily_requests > 0:
+            requests = max(0, daily_requests - used["requests"] - self.in_flight.get(model, 0))
+        if daily_tokens > 0:
+            tokens = max(0, daily_tokens - used["tokens"])
+        return requests, tokens
+
+    def used(self, model: str, day: str | None = None) -> dict[str, int]:
+        """Requests and tokens (input + output) a model used on a day (default today)."""
+        entry = self.days.get(day or self.today(), {}).get(model, {})
+        return {
+            "requests": entry.get("requests", 0),
+            "tokens": entry.get("input_tokens", 0) + entry.get("output_tokens", 0),
+        }
+
+    def tokens_per_request(self, model: str) -> float | None:
+        """Average tokens per request of a model over the kept history."""
+        requests = tokens = 0
+        for models in self.days.values():
+            entry = models.get(model)
+            if entry:
+                requests += entry["requests"]
+                tokens += entry["input_tokens"] + entry["output_tokens"]
+        return tokens / requests if requests else None
+
+    def save(self) -> None:
+        for day in sorted(self.days)[: -self.keep_days]:
+            del self.days[day]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"timezone": str(self.tz), "days": self.days}, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+@lru_cache(maxsize=4)
+def _shared_ledger(path: str, timezone: str) -> UsageLedger:
+    return UsageLedger(path, timezone)
@@ -6,22 +6,81 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     """Pipeline configuration loaded from environment variables."""
 
-    # API Keys (Google required, Anthropic optional)
-    google_api_key: str
+    # API Keys (Google required for Gemini models, Anthropic optional)
+    google_api_key: str = ""
     anthropic_api_key: str = ""  # Optional - for Claude fallback
 
-    # ChromaDB
+    # Vector store (ChromaDB or embedded NumPy; both live under chroma_persist_dir)
     chroma_persist_dir: str = "./data/chroma"
     chroma_collection: str = "ios_docs"
+    vector_store: str = "chroma"  # chroma or numpy
+    partition_by_topic: bool = False  # one collection per topic plus a global one
+    vector_store_workers: int = 1  # threads for index work off the event loop
+    vector_batch_window_ms: float = 5.0  # wait to merge concurrent retrievals
+    hnsw_m: int = 16  # graph neighbours per node (fixed at build time)
+    hnsw_construction_ef: int = 100  # build-time candidate list (fixed at build time)
+    hnsw_search_ef: int = 100  # query-time candidate list (recall vs latency)
+    numpy_ivf_lists: int = 0  # IVF partitions for the numpy store (0 = exact)
+    numpy_ivf_probes: int = 8  # partitions scanned per query
+    vector_quantization: str = "none"  # none, int8 or binary
+    quantization_rescore_factor: int = 4  # candidates rescored per result
+    hybrid_retrieval: bool = True  # fuse BM25 with vector results when indexed
+    rrf_k: int = 60  # reciprocal rank fusion constant
+    mmr_fetch_factor: int = 3  # candidates fetched per context chunk (1 = no MMR)
+    mmr_lambda: float = 0.7  # 1.0 = relevance only, 0.0 = diversity only
+    retrieval_cache: bool = True  # reuse query results until the index changes
+    retrieval_cache_size: int = 5000  # cached queries kept on disk
 
     # Models
     claude_model: str = "claude-sonnet-4-20250514"
     gemini_model: str = "gemini-2.5-pro"
-    embedding_model: str = "models/text-embedding-004"
+    embedding_model: str = "models/text-embedding-004"  # or "local/hashing-384"
+    embedding_dimensions: int | None = None  # reduced vector size (None = full)
 
     # Limits
     max_tokens: int = 4096
+    context_tokens: int = 2000  # retrieved context per card, packed by relevance
+    topic_context_tokens: int = 4096  # background shared by a topic's requests (0 = none)
     embedding_batch_size: int = 100
+    generation_concurrency: int = 4  # generation requests in flight at the same time
+    cards_per_request: int = 1  # subtopics of one topic generated per LLM request
+    llm_rpm: int = 0  # Gemini requests per minute (0 = unlimited)
+    llm_tpm: int = 0  # Gemini tokens per minute, prompt + output (0 = unlimited)
+
+    # LLM routing (Claude joins only when ANTHROPIC_API_KEY is set)
+    llm_providers: str = "gemini,claude"  # in order of preference
+    claude_rpm: int = 0  # Claude requests per minute (0 = unlimited)
+    claude_tpm: int = 0  # Claude tokens per minute (0 = unlimited)
+    llm_hedge: bool = True  # duplicate requests slower than the provider's p95
+    llm_cooldown_s: float = 30  # seconds a rate-limited (429) provider is skipped
+    llm_stream: bool = True  # stream single cards and abort malformed output early
+    stream_retries: int = 2  # immediate retries of an aborted stream
+
+    # LLM response cache (content-addressed by model, sampling settings and prompt)
+    llm_cache: bool = True
+    llm_cache_dir: str = "./data/llm_cache"
+    llm_cache_ttl_days: float = 30  # 0 = never expire
+    llm_cache_size: int = 20_000  # cached responses kept on disk
+    llm_replay: bool = False  # serve cached responses only; misses fail, no API calls
+    llm_cache_refresh: bool = False  # skip cached responses; new ones overwrite them
+
+    # Provider context caching of the stable prompt prefix (system prompt, schema)
+    context_cache: bool = True
+    context_cache_ttl_s: int = 3600  # lifetime of a cache without use (Claude: 5m or 1h)
+    # Smallest prefix given an explicit Gemini cache (the provider's floor is 4096 for
+    # Pro models, 1024 for Flash). The system prompt alone is far below it; the
+    # topic background (topic_context_tokens) lifts each topic's prefix above it
+    context_cache_min_tokens: int = 4096
+
+    # Daily quota scheduling (0 = unlimited); the scheduler plans against gemini_model
+    llm_daily_requests: int = 0
+    llm_daily_tokens: int = 0
+    claude_daily_requests: int = 0  # claude_model's own daily limits, enforced per request
+    claude_daily_tokens: int = 0
+    quota_timezone: str = "America/Los_Angeles"  # where the provider's day starts
+    usage_ledger_path: str = "./data/usage_ledger.json"
+    flashcards_dir: str = "./src/data/flashcards"  # published cards, never regenerated
+    published_index_path: str = "./data/published_index.json"  # IDs and fronts of those
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,12 +1,38 @@
 """Embedding pipeline for document indexing."""
 
+from .backends import (
+    EmbeddingBackend,
+    GeminiEmbeddingBackend,
+    HashingEmbeddingBackend,
+    get_embedding_backend,
+)
 from .chunker import Chunk, DocumentChunker
 from .embedder import Embedder
+from .index_metadata import IndexMetadata
 from .indexer import Indexer
+from .lexical import BM25Index, tokenize
+from .projection import PCAProjection
+from .quantization import BinaryQuantizer, Int8Quantizer, QuantizedIndex
+from .snapshot import IndexSnapshot
+from .source_manifest import SourceEntry, SourceManifest
 
 __all__ = [
+    "BM25Index",
+    "BinaryQuantizer",
     "Chunk",
     "DocumentChunker",
     "Embedder",
+    "EmbeddingBackend",
+    "GeminiEmbeddingBackend",
+    "HashingEmbeddingBackend",
+    "IndexMetadata",
+    "IndexSnapshot",
     "Indexer",
+    "Int8Quantizer",
+    "PCAProjection",
+    "QuantizedIndex",
+    "SourceEntry",
+    "SourceManifest",
+    "get_embedding_backend",
+    "tokenize",
 ]
@@ -0,0 +1,196 @@
+"""Pluggable embedding backends selected by ``Settings.embedding_model``."""
+
+import re
+import zlib
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from ..config import get_settings
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Model IDs starting with this prefix are served by local CPU backends
+LOCAL_MODEL_PREFIX = "local/"
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z_@][A-Za-z0-9_]*|\d+")
+
+
+class EmbeddingBackend(ABC):
+    """Abstract base class for embedding providers."""
+
+    # Seconds to wait between batches (remote APIs only)
+    rate_limit: float = 0.0
+
+    # Whether the provider can return reduced-size vectors itself
+    supports_output_dimensionality: bool = False
+
+    def __init__(self, model_id: str):
+        """Initialize backend.
+
+        Args:
+            model_id: Model identifier from settings
+        """
+        self.model_id = model_id
+
+    @property
+    def dimensions(self) -> int | None:
+        """Output vector size, or None if only known after the first call."""
+        return None
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for texts.
+
+        Args:
+            texts: List of texts to embed
+
+        Returns:
+            List of embedding vectors
+        """
+        pass
+
+    async def embed_async(self, texts: list[str]) -> list[list[float]]:
+        """Async embedding (defaults to the synchronous implementation).
+
+        Args:
+            texts: List of texts to embed
+
+        Returns:
+            List of embedding vectors
+        """
+        return self.embed(texts)
+
+
+class GeminiEmbeddingBackend(EmbeddingBackend):
+    """Embeddings from the Gemini API."""
+
+    rate_limit = 0.3
+    supports_output_dimensionality = True
+
+    def __init__(self, model_id: str, output_dimensionality: int | None = None):
+        """Initialize backend.
+
+        Args:
+            model_id: Gemini embedding model name
+            output_dimensionality: Optional truncated vector size
+        """
+        # Imported lazily so local backends work without the Gemini SDK configured
+        from ..clients.gemini_client import GeminiClient
+
+        super().__init__(model_id)
+        self.client = GeminiClient()
+        self.client.embedding_model = model_id
+        self.output_dimensionality = output_dimensionality
+
+    @property
+    def dimensions(self) -> int | None:
+        return self.output_dimensionality
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return self.client.embed(texts, self.output_dimensionality)
+
+    async def embed_async(self, texts: list[str]) -> list[list[float]]:
+        return await self.client.embed_async(texts, self.output_dimensionality)
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """Deterministic local embeddings from hashed word n-grams.
+
+    Each token and adjacent token pair is hashed (CRC32) into a fixed number of
+    signed buckets, counts are log-scaled and the vector is L2-normalized. No
+    network access or model files are needed, and the same text always maps to
+    the same vector across runs and machines.
+    """
+
+    def __init__(self, model_id: str, dimensions: int = 384):
+        """Initialize backend.
+
+        Args:
+            model_id: Model identifier from settings
+            dimensions: Output vector size
+        """
+        super().__init__(model_id)
+        self._dimensions = dimensions
+        self._token_hashes: dict[str, int] = {}
+
+    @property
+    def dimensions(self) -> int:
+        return self._dimensions
+
+    def _hash_tokens(self, text: str) -> np.ndarray:
+        """Map text to an array of cached 32-bit token hashes."""
+        cache = self._token_hashes
+        hashes = []
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            h = cache.get(token)
+            if h is None:
+                h = zlib.crc32(token.encode())
+                cache[token] = h
+            hashes.append(h)
+        return np.array(hashes, dtype=np.uint64)
+
+    def embed_matrix(self, texts: list[str]) -> np.ndarray:
+        """Embed texts into a float32 matrix of shape (len(texts), dimensions)."""
+        dim = self._dimensions
+        matrix = np.zeros((len(texts), dim), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            unigrams = self._hash_tokens(text)
+            if unigrams.size == 0:
+                continue
+            # Bigram hashes derived arithmetically from unigram hashes
+            bigrams = (unigrams[:-1] * np.uint64(1000003)) ^ unigrams[1:]
+            features = np.concatenate([unigrams, bigrams]) & np.uint64(0xFFFFFFFF)
+
+            buckets = (features % np.uint64(dim)).astype(np.intp)
+            signs = np.where(features & np.uint64(0x80000000), -1.0, 1.0)
+            counts = np.bincount(buckets, weights=signs, minlength=dim)
+            matrix[row] = np.sign(counts) * np.log1p(np.abs(counts))
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_matrix(texts).tolist()
+
+
+def get_embedding_backend(
+    model_id: str | None = None,
+    dimensions: int | None = None,
+) -> EmbeddingBackend:
+    """Create the embedding backend for a model ID.
+
+    Supported IDs:
+        - ``local/hashing`` or ``local/hashing-<dim>``: offline hashed n-grams
+        - anything else: Gemini embedding model name
+
+    Args:
+        model_id: Model identifier (default: ``Settings.embedding_model``)
+        dimensions: Reduced output size, passed to providers that support
+            truncation (default: ``Settings.embedding_dimensions``; others
+            return full-width vectors and are reduced by the Indexer)
+
+    Returns:
+        Embedding backend instance
+
+    Raises:
+        ValueError: If a ``local/`` model ID is not recognized
+    """
+    settings = get_settings()
+    model_id = model_id or settings.embedding_model
+    if dimensions is None:
+        dimensions = settings.embedding_dimensions
+
+    if model_id.startswith(LOCAL_MODEL_PREFIX):
+        name = model_id[len(LOCAL_MODEL_PREFIX) :]
+        match = re.fullmatch(r"hashing(?:-(\d+))?", name)
+        if not match:
+            raise ValueError(f"Unknown local embedding model: {model_id}")
+        width = int(match.group(1)) if match.group(1) else 384
+        logger.debug(f"Using local hashing embeddings ({width} dims)")
+        return HashingEmbeddingBackend(model_id, dimensions=width)
+
+    return GeminiEmbeddingBackend(model_id, output_dimensionality=dimensions)
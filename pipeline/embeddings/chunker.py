@@ -1,5 +1,6 @@
 """Document chunking with sentence-aware splitting."""
 
+import hashlib
 from dataclasses import dataclass, field
 
 import tiktoken
@@ -22,6 +23,11 @@ class Chunk:
     position: int
     metadata: dict = field(default_factory=dict)
 
+    @property
+    def content_hash(self) -> str:
+        """Short hash of the chunk text, used to detect changed chunks."""
+        return hashlib.sha1(self.content.encode()).hexdigest()[:16]
+
 
 class DocumentChunker:
     """Chunks documents into embedable segments with overlap."""
@@ -1,25 +1,30 @@
-"""Embedding generation using Gemini API."""
+"""Embedding generation using a pluggable embedding backend."""
 
 import asyncio
 from collections.abc import Callable
 
-from ..clients.gemini_client import GeminiClient
 from ..utils.logging import get_logger
+from .backends import EmbeddingBackend, get_embedding_backend
 from .chunker import Chunk
 
 logger = get_logger(__name__)
 
 
 class Embedder:
-    """Generates embeddings for text chunks using Gemini."""
+    """Generates embeddings for text chunks."""
 
-    def __init__(self, batch_size: int = 100):
+    def __init__(
+        self,
+        batch_size: int = 100,
+        backend: EmbeddingBackend | None = None,
+    ):
         """Initialize embedder.
 
         Args:
             batch_size: Number of texts per API call
+            backend: Embedding backend (default: from Settings.embedding_model)
         """
-        self.client = GeminiClient()
+        self.backend = backend or get_embedding_backend()
         self.batch_size = batch_size
 
     async def embed_chunks(
@@ -44,7 +49,7 @@ class Embedder:
             texts = [c.content for c in batch]
 
             try:
-                embeddings = await self.client.embed_async(texts)
+                embeddings = await self.backend.embed_async(texts)
 
                 for chunk, embedding in zip(batch, embeddings):
                     results.append((chunk, embedding))
@@ -57,7 +62,8 @@ class Embedder:
                 raise
 
             # Rate limit between batches
-            await asyncio.sleep(0.3)
+            if self.backend.rate_limit:
+                await asyncio.sleep(self.backend.rate_limit)
 
         logger.info(f"Embedded {len(results)} chunks")
         return results
@@ -71,9 +77,25 @@ class Embedder:
         Returns:
             Query embedding vector
         """
-        embeddings = await self.client.embed_async([query])
+        embeddings = await self.backend.embed_async([query])
         return embeddings[0]
 
+    async def embed_queries(self, queries: list[str]) -> list[list[float]]:
+        """Embed many queries with as few API calls as possible.
+
+        Args:
+            queries: Query texts
+
+        Returns:
+            Query embedding vectors, in input order
+        """
+        embeddings = []
+        for i in range(0, len(queries), self.batch_size):
+            embeddings.extend(
+                await self.backend.embed_async(queries[i : i + self.batch_size])
+            )
+        return embeddings
+
     def embed_query_sync(self, query: str) -> list[float]:
         """Synchronous query embedding.
 
@@ -83,5 +105,5 @@ class Embedder:
         Returns:
             Query embedding vector
         """
-        embeddings = self.client.embed([query])
+        embeddings = self.backend.embed([query])
         return embeddings[0]
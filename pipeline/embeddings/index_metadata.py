@@ -0,0 +1,50 @@
+"""Metadata describing how an index's vectors were produced."""
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+@dataclass
+class IndexMetadata:
+    """Embedding model and vector shape recorded alongside an index.
+
+    Queries are checked against it so query and document vectors always come
+    from the same model and have the same dimensionality.
+    """
+
+    embedding_model: str
+    dimensions: int
+    source_dimensions: int
+    reduction: str = "none"  # none, native (provider truncation) or pca
+
+    def is_compatible(self, model_id: str, dimensions: int | None) -> bool:
+        """Check whether vectors from a model/size can be mixed with this index.
+
+        Args:
+            model_id: Embedding model of the new vectors
+            dimensions: Requested reduced size (None = full width)
+
+        Returns:
+            True if the model matches and the vector size would be the same
+        """
+        if self.embedding_model != model_id:
+            return False
+        if dimensions:
+            return self.dimensions == dimensions
+        return self.reduction == "none"
+
+    def save(self, path: str | Path) -> None:
+        """Write metadata as JSON."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(asdict(self), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "IndexMetadata | None":
+        """Read metadata, or None if the index has none yet."""
+        if not Path(path).exists():
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
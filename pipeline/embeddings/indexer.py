@@ -1,28 +1,202 @@
-"""ChromaDB indexing for embedded chunks."""
+"""Vector store indexing for embedded chunks."""
 
-from ..clients.chroma_client import ChromaClient
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from ..config import get_settings
+from ..stores import RESULT_KEYS, PartitionedVectorStore, get_vector_store
 from ..utils.logging import get_logger
 from .chunker import Chunk
+from .index_metadata import IndexMetadata
+from .lexical import BM25Index, reciprocal_rank_fusion
+from .mmr import collapse_adjacent, mmr_select
+from .projection import PCAProjection
+from .quantization import QuantizedIndex
+from .retrieval_cache import RetrievalCache, cache_key, new_epoch
+from .snapshot import IndexSnapshot
+from .source_manifest import SourceEntry, SourceManifest, source_hash
 
 logger = get_logger(__name__)
 
 
+@dataclass
+class IndexPlan:
+    """Changes needed to bring the index in line with the current chunks."""
+
+    to_embed: list[Chunk] = field(default_factory=list)  # new or changed
+    to_delete: list[str] = field(default_factory=list)  # chunk IDs no longer present
+    unchanged: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.to_embed and not self.to_delete
+
+
 class Indexer:
-    """Indexes embedded chunks into ChromaDB."""
+    """Indexes embedded chunks into the configured vector store."""
+
+    # Items per vector store write call
+    batch_size = 500
 
-    def __init__(self, collection_name: str | None = None):
+    # Items per write call when restoring a snapshot (below ChromaDB's max batch)
+    bulk_batch_size = 5000
+
+    def __init__(
+        self,
+        collection_name: str | None = None,
+        persist_dir: str | None = None,
+    ):
         """Initialize indexer.
 
         Args:
             collection_name: Optional custom collection name
+            persist_dir: Optional custom storage directory
         """
-        self.chroma = ChromaClient(collection_name)
+        settings = get_settings()
+        self.store = get_vector_store(collection_name, persist_dir)
+
+        # Per-collection files kept next to the vector store data
+        self.sidecar_dir = (
+            Path(persist_dir or settings.chroma_persist_dir) / "sidecars" / self.store.name
+        )
 
-    def index(self, chunks_with_embeddings: list[tuple[Chunk, list[float]]]) -> int:
-        """Index chunks with embeddings into ChromaDB.
+        # How stored vectors were produced (model, dims, reduction)
+        self.metadata = IndexMetadata.load(self.sidecar_dir / "index.json")
+        if self.metadata and self.metadata.embedding_model != settings.embedding_model:
+            logger.warning(
+                f"Index was built with {self.metadata.embedding_model}, "
+                f"settings use {settings.embedding_model}; re-run embed"
+            )
+
+        projection_path = self.sidecar_dir / "projection.npz"
+        self.projection: PCAProjection | None = (
+            PCAProjection.load(projection_path) if projection_path.exists() else None
+        )
+
+        # Optional quantized copy of the vectors used for search
+        self.quantized: QuantizedIndex | None = None
+        if settings.vector_quantization != "none":
+            self.quantized = QuantizedIndex(
+                self.sidecar_dir / "quantized",
+                mode=settings.vector_quantization,
+                rescore_factor=settings.quantization_rescore_factor,
+                fetch=self._stored_vectors,
+            )
+
+        # Keyword index fused with vector hits when query text is available
+        self.lexical = BM25Index.load(self.sidecar_dir / "bm25")
+        self.hybrid = settings.hybrid_retrieval
+        self.rrf_k = settings.rrf_k
+
+        # Indexed chunks per source document (read once, no store scans)
+        self.sources = SourceManifest(self.sidecar_dir / "sources.json")
+
+        # Index version, replaced whenever stored vectors or keywords change
+        epoch_path = self.sidecar_dir / "epoch"
+        if epoch_path.exists():
+            self.epoch = epoch_path.read_text().strip()
+        else:
+            self.epoch = new_epoch()
+        self.cache: RetrievalCache | None = None
+        if settings.retrieval_cache:
+            self.cache = RetrievalCache(
+                self.sidecar_dir / "retrieval_cache.json",
+                self.epoch,
+                max_entries=settings.retrieval_cache_size,
+            )
+
+    def fit_projection(self, embeddings: list[list[float]], dimensions: int) -> None:
+        """Fit a PCA projection for providers that can't truncate vectors.
+
+        Applied to every vector indexed afterwards and to every query.
+
+        Args:
+            embeddings: Full-width document embeddings (the corpus)
+            dimensions: Reduced vector size
+        """
+        self.projection = PCAProjection().fit(embeddings, dimensions)
+        self.sidecar_dir.mkdir(parents=True, exist_ok=True)
+        self.projection.save(self.sidecar_dir / "projection.npz")
+
+    def _bump_epoch(self) -> None:
+        """Mark the index as changed, invalidating cached query results."""
+        self.epoch = new_epoch()
+        self.sidecar_dir.mkdir(parents=True, exist_ok=True)
+        (self.sidecar_dir / "epoch").write_text(self.epoch)
+        if self.cache is not None:
+            self.cache.invalidate(self.epoch)
+
+    def _project(self, embeddings: list[list[float]]) -> list[list[float]]:
+        """Apply the fitted projection, if any."""
+        if self.projection is None:
+            return embeddings
+        return self.projection.transform(embeddings).tolist()
+
+    def _prepare_queries(self, embeddings: list[list[float]]) -> list[list[float]]:
+        """Project query embeddings and check they match the stored vectors.
+
+        Raises:
+            ValueError: If a query size doesn't match the indexed vectors
+        """
+        sizes = {len(e) for e in embeddings}
+
+        if self.projection is not None:
+            if sizes != {self.projection.source_dimensions}:
+                raise ValueError(
+                    f"Query embeddings have {sorted(sizes)} dims, projection "
+                    f"expects {self.projection.source_dimensions}; re-run embed"
+                )
+            embeddings = self._project(embeddings)
+            sizes = {self.projection.dimensions}
+
+        if self.metadata and sizes != {self.metadata.dimensions}:
+            raise ValueError(
+                f"Query embeddings have {sorted(sizes)} dims but the index holds "
+                f"{self.metadata.dimensions}-dim vectors from "
+                f"{self.metadata.embedding_model}; re-run embed"
+            )
+        return embeddings
+
+    def similarities(
+        self,
+        query_embeddings: list[list[float]],
+        chunk_embeddings: list[list[float]],
+    ) -> np.ndarray:
+        """Cosine similarity of queries to chunks in the index's vector space.
+
+        Both sides go through the fitted projection, if any, so scores are
+        comparable with the distances returned by queries.
+
+        Args:
+            query_embeddings: Query vectors as returned by the embedder
+            chunk_embeddings: Chunk vectors as returned by the embedder
+
+        Returns:
+            Matrix of shape (n_queries, n_chunks)
+        """
+        queries = np.asarray(self._project([list(e) for e in query_embeddings]), dtype=np.float32)
+        chunks = np.asarray(self._project([list(e) for e in chunk_embeddings]), dtype=np.float32)
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        chunks /= np.maximum(np.linalg.norm(chunks, axis=1, keepdims=True), 1e-12)
+        return queries @ chunks.T
+
+    def index(
+        self,
+        chunks_with_embeddings: list[tuple[Chunk, list[float]]],
+        model_id: str | None = None,
+    ) -> int:
+        """Index chunks with embeddings into the vector store.
 
         Args:
             chunks_with_embeddings: List of (chunk, embedding) tuples
+            model_id: Embedding model that produced the vectors
+                (default: ``Settings.embedding_model``)
+
+        Chunks whose IDs are already indexed are overwritten, so this is also
+        the write step of incremental indexing.
 
         Returns:
             Number of chunks indexed
@@ -30,6 +204,9 @@ class Indexer:
         if not chunks_with_embeddings:
             return 0
 
+        settings = get_settings()
+        source_dimensions = len(chunks_with_embeddings[0][1])
+
         ids = []
         embeddings = []
         documents = []
@@ -46,17 +223,20 @@ class Indexer:
                     "topic": chunk.topic,
                     "position": chunk.position,
                     "token_count": chunk.token_count,
+                    "content_hash": chunk.content_hash,
                     **chunk.metadata,
                 }
             )
 
-        # Batch add to avoid memory issues
-        batch_size = 500
+        embeddings = self._project(embeddings)
+
+        # Batch upsert to avoid memory issues (new IDs are inserted, known ones replaced)
+        batch_size = self.batch_size
         indexed = 0
 
         for i in range(0, len(ids), batch_size):
             end = min(i + batch_size, len(ids))
-            self.chroma.add(
+            self.store.upsert(
                 ids=ids[i:end],
                 embeddings=embeddings[i:end],
                 documents=documents[i:end],
@@ -64,17 +244,294 @@ class Indexer:
             )
             indexed += end - i
             logger.debug(f"Indexed batch: {indexed}/{len(ids)}")
+        self.store.flush()
+
+        if self.quantized is not None:
+            self.quantized.add(ids, embeddings, [m["topic"] for m in metadatas])
+            self.quantized.save()
+
+        self._ensure_manifest()
+        self.sources.add(
+            [(m["source_id"], chunk_id, m["content_hash"]) for chunk_id, m in zip(ids, metadatas)]
+        )
+        self.sources.save()
 
-        logger.info(f"Indexed {indexed} chunks into ChromaDB")
+        if self.projection is not None:
+            reduction = "pca"
+        elif settings.embedding_dimensions:
+            reduction = "native"
+        else:
+            reduction = "none"
+        self.metadata = IndexMetadata(
+            embedding_model=model_id or settings.embedding_model,
+            dimensions=len(embeddings[0]),
+            source_dimensions=source_dimensions,
+            reduction=reduction,
+        )
+        self.metadata.save(self.sidecar_dir / "index.json")
+        self._bump_epoch()
+
+        logger.info(f"Indexed {indexed} chunks into {self.store.name}")
         return indexed
 
+    def build_lexical_index(self, chunks: list[Chunk]) -> None:
+        """Rebuild the BM25 keyword index over every chunk.
+
+        Tokenizing is local and fast, so the index is always rebuilt from the
+        full corpus rather than patched.
+
+        Args:
+            chunks: Every chunk of the current corpus
+        """
+        self.lexical = BM25Index().build(
+            [c.id for c in chunks],
+            [c.content for c in chunks],
+            [c.topic for c in chunks],
+        )
+        self.lexical.save(self.sidecar_dir / "bm25")
+        self._bump_epoch()
+
+    def delete(self, ids: list[str]) -> int:
+        """Delete chunks by ID in bulk.
+
+        Args:
+            ids: Chunk IDs to remove
+
+        Returns:
+            Number of IDs submitted for deletion
+        """
+        if not ids:
+            return 0
+
+        for i in range(0, len(ids), self.batch_size):
+            self.store.delete(ids[i : i + self.batch_size])
+        self.store.flush()
+
+        if self.quantized is not None:
+            self.quantized.delete(ids)
+            self.quantized.save()
+
+        self._ensure_manifest()
+        self.sources.remove(ids)
+        self.sources.save()
+        self._bump_epoch()
+
+        logger.info(f"Deleted {len(ids)} chunks from {self.store.name}")
+        return len(ids)
+
+    def _ensure_manifest(self) -> None:
+        """Build the source manifest from one store scan if it's missing.
+
+        Only needed for indexes created before the manifest existed; every
+        write keeps it current afterwards.
+        """
+        if self.sources.exists:
+            return
+
+        results = self.store.get(include=["metadatas"])
+        self.sources.add(
+            [
+                ((meta or {}).get("source_id", ""), chunk_id, (meta or {}).get("content_hash", ""))
+                for chunk_id, meta in zip(results["ids"], results["metadatas"])
+            ]
+        )
+        self.sources.save()
+        logger.info(f"Built source manifest: {len(self.sources)} documents")
+
+    def indexed_sources(self) -> dict[str, SourceEntry]:
+        """Get every indexed source document without querying the store.
+
+        Returns:
+            Dict mapping source ID -> entry with content hash, chunk count
+            and per-chunk hashes
+        """
+        self._ensure_manifest()
+        return self.sources.sources
+
+    def stored_hashes(self) -> dict[str, str]:
+        """Get content hash of every indexed chunk from the source manifest.
+
+        Returns:
+            Dict mapping chunk ID -> content hash ("" if indexed without one)
+        """
+        self._ensure_manifest()
+        return self.sources.chunk_hashes()
+
+    def needs_rebuild(self, model_id: str, dimensions: int | None) -> bool:
+        """Check whether stored vectors are incompatible with the current config.
+
+        Args:
+            model_id: Embedding model that will produce new vectors
+            dimensions: Requested reduced size (None = full width)
+
+        Returns:
+            True if the index is empty or built with another model/size
+        """
+        if self.metadata is None:
+            return True
+        return not self.metadata.is_compatible(model_id, dimensions)
+
+    def export_snapshot(self, path: str | Path) -> int:
+        """Write the whole index to one compressed snapshot file.
+
+        Args:
+            path: Snapshot file (.npz)
+
+        Returns:
+            Number of chunks exported
+
+        Raises:
+            ValueError: If the index is empty
+        """
+        if self.metadata is None:
+            raise ValueError("Index is empty; run embed before exporting a snapshot")
+
+        self.store.flush()
+        found = self.store.get(include=["embeddings", "documents", "metadatas"])
+        snapshot = IndexSnapshot(
+            metadata=self.metadata,
+            ids=list(found["ids"]),
+            vectors=np.asarray(found["embeddings"], dtype=np.float32).reshape(
+                len(found["ids"]), self.metadata.dimensions
+            ),
+            documents=list(found["documents"]),
+            metadatas=list(found["metadatas"]),
+            projection=self.projection,
+        )
+        snapshot.save(path)
+        logger.info(f"Exported {len(snapshot.ids)} chunks to {path}")
+        return len(snapshot.ids)
+
+    def import_snapshot(
+        self,
+        path: str | Path,
+        model_id: str | None = None,
+        dimensions: int | None = None,
+    ) -> int:
+        """Replace the index with a snapshot, without re-embedding.
+
+        Vectors are bulk-loaded in large batches.
+
+        Args:
+            path: Snapshot file written by ``export_snapshot()``
+            model_id: Embedding model queries will use
+                (default: ``Settings.embedding_model``)
+            dimensions: Reduced vector size in use
+                (default: ``Settings.embedding_dimensions``)
+
+        Returns:
+            Number of chunks restored
+
+        Raises:
+            ValueError: If the snapshot format is unsupported or its vectors
+                come from another embedding model or size
+        """
+        settings = get_settings()
+        model_id = model_id or settings.embedding_model
+        if dimensions is None:
+            dimensions = settings.embedding_dimensions
+
+        snapshot = IndexSnapshot.load(path)
+        if not snapshot.metadata.is_compatible(model_id, dimensions):
+            raise ValueError(
+                f"Snapshot holds {snapshot.metadata.dimensions}-dim vectors from "
+                f"{snapshot.metadata.embedding_model} ({snapshot.metadata.reduction}), "
+                f"settings use {model_id} with dimensions={dimensions}"
+            )
+
+        self.reset()
+        n = len(snapshot.ids)
+        for i in range(0, n, self.bulk_batch_size):
+            end = min(i + self.bulk_batch_size, n)
+            self.store.upsert(
+                ids=snapshot.ids[i:end],
+                embeddings=snapshot.vectors[i:end].tolist(),
+                documents=snapshot.documents[i:end],
+                metadatas=snapshot.metadatas[i:end],
+            )
+        self.store.flush()
+
+        if self.quantized is not None:
+            self.quantized.add(
+                snapshot.ids, snapshot.vectors, [m["topic"] for m in snapshot.metadatas]
+            )
+            self.quantized.save()
+
+        self.projection = snapshot.projection
+        if self.projection is not None:
+            self.projection.save(self.sidecar_dir / "projection.npz")
+        self.metadata = snapshot.metadata
+        self.metadata.save(self.sidecar_dir / "index.json")
+
+        self.sources.add(
+            [
+                (m["source_id"], chunk_id, m.get("content_hash", ""))
+                for chunk_id, m in zip(snapshot.ids, snapshot.metadatas)
+            ]
+        )
+        self.sources.save()
+
+        # Keyword index is cheap to rebuild from the restored text
+        self.lexical = BM25Index().build(
+            snapshot.ids, snapshot.documents, [m["topic"] for m in snapshot.metadatas]
+        )
+        self.lexical.save(self.sidecar_dir / "bm25")
+        self._bump_epoch()
+
+        logger.info(f"Restored {n} chunks from {path}")
+        return n
+
+    def plan_sync(self, chunks: list[Chunk]) -> IndexPlan:
+        """Diff current chunks against the index by source and content hash.
+
+        Documents whose chunk hashes all match are skipped as a whole; only
+        changed documents are compared chunk by chunk.
+
+        Args:
+            chunks: Every chunk of the current corpus
+
+        Returns:
+            Plan with chunks to (re-)embed and stale IDs to delete
+        """
+        indexed = self.indexed_sources()
+        plan = IndexPlan()
+
+        by_source: dict[str, list[Chunk]] = {}
+        for chunk in chunks:
+            by_source.setdefault(chunk.source_id, []).append(chunk)
+
+        for source_id, source_chunks in by_source.items():
+            entry = indexed.get(source_id)
+            current = {c.id: c.content_hash for c in source_chunks}
+            if entry is not None and entry.content_hash == source_hash(current):
+                plan.unchanged += len(source_chunks)
+                continue
+
+            stored = entry.chunks if entry is not None else {}
+            for chunk in source_chunks:
+                if stored.get(chunk.id) == chunk.content_hash:
+                    plan.unchanged += 1
+                else:
+                    plan.to_embed.append(chunk)
+            plan.to_delete.extend(chunk_id for chunk_id in stored if chunk_id not in current)
+
+        for source_id, entry in indexed.items():
+            if source_id not in by_source:
+                plan.to_delete.extend(entry.chunks)
+
+        logger.info(
+            f"Index plan: {len(plan.to_embed)} to embed, "
+            f"{len(plan.to_delete)} to delete, {plan.unchanged} unchanged"
+        )
+        return plan
+
     def query(
         self,
         embedding: list[float],
         topic: str | None = None,
         n_results: int = 10,
     ) -> dict:
-        """Query ChromaDB for similar chunks.
+        """Query the vector store for similar chunks.
 
         Args:
             embedding: Query embedding vector
@@ -84,24 +541,334 @@ class Indexer:
         Returns:
             Query results with ids, documents, distances, metadatas
         """
-        where = {"topic": topic} if topic else None
-        return self.chroma.query(
-            query_embedding=embedding,
-            n_results=n_results,
-            where=where,
+        return self.query_batch([embedding], [topic], n_results)[0]
+
+    def query_batch(
+        self,
+        embeddings: list[list[float]],
+        topics: list[str | None] | None = None,
+        n_results: int = 10,
+        fallback_unfiltered: bool = False,
+        query_texts: list[str] | None = None,
+    ) -> list[dict]:
+        """Query similar chunks for many embeddings in one call.
+
+        Args:
+            embeddings: Query embedding vectors
+            topics: Optional topic filter per query (aligned with embeddings)
+            n_results: Number of results per query
+            fallback_unfiltered: Re-run topic-filtered queries that found
+                nothing without the filter (one extra batched call)
+            query_texts: Optional query text per query; when a BM25 index
+                exists, keyword hits are fused with vector hits (RRF)
+
+        Returns:
+            One result dict per query, shaped like ``query()`` output
+        """
+        if not embeddings:
+            return []
+
+        topics = topics or [None] * len(embeddings)
+        embeddings = self._prepare_queries(embeddings)
+        if not (self.hybrid and self.lexical is not None and len(self.lexical)):
+            query_texts = None
+
+        if self.cache is None:
+            return self._query_uncached(
+                embeddings, topics, n_results, fallback_unfiltered, query_texts
+            )
+
+        keys = [
+            cache_key(
+                embedding,
+                {"topic": topic} if topic else None,
+                n_results,
+                json.dumps([fallback_unfiltered, query_texts[i] if query_texts else None]),
+            )
+            for i, (embedding, topic) in enumerate(zip(embeddings, topics))
+        ]
+        results: list[dict | None] = [self.cache.get(key) for key in keys]
+
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            fresh = self._query_uncached(
+                [embeddings[i] for i in misses],
+                [topics[i] for i in misses],
+                n_results,
+                fallback_unfiltered,
+                [query_texts[i] for i in misses] if query_texts else None,
+            )
+            for i, result in zip(misses, fresh):
+                results[i] = result
+                self.cache.put(keys[i], result)
+
+        return results
+
+    def _query_uncached(
+        self,
+        embeddings: list[list[float]],
+        topics: list[str | None],
+        n_results: int,
+        fallback_unfiltered: bool,
+        query_texts: list[str] | None,
+    ) -> list[dict]:
+        """Search prepared queries, with the optional unfiltered retry."""
+        results = self._search_batch(embeddings, topics, n_results, query_texts)
+
+        if fallback_unfiltered:
+            empty = [i for i, r in enumerate(results) if topics[i] and not r["ids"][0]]
+            if empty:
+                logger.debug(f"Retrying {len(empty)} queries without topic filter")
+                retried = self._search_batch(
+                    [embeddings[i] for i in empty],
+                    [None] * len(empty),
+                    n_results,
+                    [query_texts[i] for i in empty] if query_texts else None,
+                )
+                for i, result in zip(empty, retried):
+                    results[i] = result
+
+        return results
+
+    def diversify(
+        self,
+        embeddings: list[list[float]],
+        results: list[dict],
+        n_results: int,
+        lambda_mult: float = 0.7,
+    ) -> list[dict]:
+        """Rerank over-fetched results with MMR and collapse overlapping neighbours.
+
+        Candidate vectors for all queries are fetched from the store in one
+        call. Picks are taken in MMR order until ``n_results`` entries remain
+        after merging adjacent chunks of the same document.
+
+        Args:
+            embeddings: Query embeddings the results were retrieved with
+            results: Output of ``query_batch()`` (ideally with more candidates
+                than ``n_results``)
+            n_results: Number of context entries to keep per query
+            lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+
+        Returns:
+            One result dict per query, shaped like ``query()`` output
+        """
+        if not results:
+            return []
+
+        embeddings = self._prepare_queries(embeddings)
+        unique_ids = list({i for r in results for i in r["ids"][0]})
+        vectors: dict[str, np.ndarray] = {}
+        if unique_ids:
+            found = self.store.get(ids=unique_ids, include=["embeddings"])
+            vectors = {
+                chunk_id: np.asarray(vector, dtype=np.float32)
+                for chunk_id, vector in zip(found["ids"], found["embeddings"])
+            }
+
+        diversified = []
+        for embedding, result in zip(embeddings, results):
+            rows = [i for i, chunk_id in enumerate(result["ids"][0]) if chunk_id in vectors]
+            if not rows:
+                diversified.append(result)
+                continue
+
+            candidates = np.stack([vectors[result["ids"][0][i]] for i in rows])
+            order = [
+                rows[i]
+                for i in mmr_select(
+                    np.asarray(embedding, dtype=np.float32), candidates, len(rows), lambda_mult
+                )
+            ]
+
+            for take in range(min(n_results, len(order)), len(order) + 1):
+                picked = order[:take]
+                collapsed = collapse_adjacent(
+                    *([result[key][0][i] for i in picked] for key in RESULT_KEYS)
+                )
+                if len(collapsed["ids"]) >= n_results:
+                    break
+
+            diversified.append({key: [collapsed[key][:n_results]] for key in RESULT_KEYS})
+        return diversified
+
+    def _search_batch(
+        self,
+        embeddings: list[list[float]],
+        topics: list[str | None],
+        n_results: int,
+        query_texts: list[str] | None = None,
+    ) -> list[dict]:
+        """Run prepared queries against the quantized index or the store."""
+        if query_texts is not None:
+            return self._search_hybrid(embeddings, topics, n_results, query_texts)
+
+        if self.quantized is not None:
+            batch = self._search_quantized(embeddings, topics, n_results)
+        else:
+            batch = self.store.query_batch(
+                embeddings,
+                n_results=n_results,
+                wheres=[{"topic": t} if t else None for t in topics],
+            )
+
+        return [
+            {key: [batch[key][i]] for key in RESULT_KEYS} for i in range(len(embeddings))
+        ]
+
+    def _search_hybrid(
+        self,
+        embeddings: list[list[float]],
+        topics: list[str | None],
+        n_results: int,
+        query_texts: list[str],
+    ) -> list[dict]:
+        """Fuse vector and BM25 rankings with reciprocal rank fusion.
+
+        Both sides over-fetch so chunks ranked moderately by each can win the
+        fusion. Keyword-only hits are fetched from the store in one call, with
+        their vectors so every result carries a real cosine distance.
+        """
+        n_candidates = n_results * 2
+        dense = self._search_batch(embeddings, topics, n_candidates)
+        lexical = [
+            [chunk_id for chunk_id, _ in self.lexical.search(text, n_candidates, topic)]
+            for text, topic in zip(query_texts, topics)
+        ]
+
+        by_id: dict[str, tuple] = {}
+        for result in dense:
+            for chunk_id, doc, meta, distance in zip(*(result[k][0] for k in RESULT_KEYS)):
+                by_id[chunk_id] = (doc, meta, distance)
+
+        missing = list({i for ranking in lexical for i in ranking} - by_id.keys())
+        vectors: dict[str, np.ndarray] = {}
+        if missing:
+            found = self.store.get(
+                ids=missing, include=["documents", "metadatas", "embeddings"]
+            )
+            for chunk_id, doc, meta, vector in zip(
+                found["ids"], found["documents"], found["metadatas"], found["embeddings"]
+            ):
+                by_id[chunk_id] = (doc, meta, None)
+                vectors[chunk_id] = np.asarray(vector, dtype=np.float32)
+
+        results = []
+        for embedding, result, keyword_ids in zip(embeddings, dense, lexical):
+            fused = reciprocal_rank_fusion([result["ids"][0], keyword_ids], k=self.rrf_k)
+            top = [chunk_id for chunk_id, _ in fused if chunk_id in by_id][:n_results]
+
+            query = np.asarray(embedding, dtype=np.float32)
+            query_norm = float(np.linalg.norm(query)) or 1.0
+            distances = []
+            for chunk_id in top:
+                distance = by_id[chunk_id][2]
+                if distance is None:
+                    vector = vectors[chunk_id]
+                    similarity = float(vector @ query) / (
+                        query_norm * (float(np.linalg.norm(vector)) or 1.0)
+                    )
+                    distance = 1.0 - similarity
+                distances.append(distance)
+
+            results.append(
+                {
+                    "ids": [top],
+                    "documents": [[by_id[i][0] for i in top]],
+                    "metadatas": [[by_id[i][1] for i in top]],
+                    "distances": [distances],
+                }
+            )
+        return results
+
+    def _search_quantized(
+        self,
+        embeddings: list[list[float]],
+        topics: list[str | None],
+        n_results: int,
+    ) -> dict:
+        """Search the quantized index, then fetch all hits from the store at once."""
+        hits = self.quantized.search_batch(embeddings, n_results, topics)
+
+        unique_ids = list({i for ids, _ in hits for i in ids})
+        found = (
+            self.store.get(ids=unique_ids, include=["documents", "metadatas"])
+            if unique_ids
+            else {"ids": [], "documents": [], "metadatas": []}
+        )
+        by_id = {
+            doc_id: (doc, meta)
+            for doc_id, doc, meta in zip(
+                found["ids"], found["documents"], found["metadatas"]
+            )
+        }
+
+        batch: dict = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for ids, distances in hits:
+            kept = [(i, d) for i, d in zip(ids, distances) if i in by_id]
+            batch["ids"].append([i for i, _ in kept])
+            batch["documents"].append([by_id[i][0] for i, _ in kept])
+            batch["metadatas"].append([by_id[i][1] for i, _ in kept])
+            batch["distances"].append([d for _, d in kept])
+        return batch
+
+    def _stored_vectors(self, ids: list[str]) -> np.ndarray:
+        """Stored vectors of chunks, one row per ID (zeros for unknown IDs)."""
+        found = self.store.get(ids=ids, include=["embeddings"])
+        by_id = dict(zip(found["ids"], found["embeddings"]))
+        dims = len(next(iter(by_id.values()))) if by_id else 0
+        return np.array(
+            [by_id[i] if i in by_id else np.zeros(dims) for i in ids], dtype=np.float32
         )
 
+    def flush(self) -> None:
+        """Persist query results cached since the last flush.
+
+        Query batches only update the retrieval cache in memory, so a run
+        writes the cache file once, here, rather than after every batch.
+        """
+        if self.cache is not None:
+            self.cache.save()
+
     def get_stats(self) -> dict:
         """Get collection statistics."""
-        return {
-            "total_chunks": self.chroma.count(),
-            "collection": self.chroma.collection.name,
+        stats = {
+            "total_chunks": self.store.count(),
+            "documents": len(self.indexed_sources()),
+            "collection": self.store.name,
+            "vector_store": type(self.store).__name__,
         }
+        if isinstance(self.store, PartitionedVectorStore):
+            stats["partitions"] = self.store.partition_counts()
+        if self.metadata is not None:
+            stats["embedding_model"] = self.metadata.embedding_model
+            stats["dimensions"] = self.metadata.dimensions
+            stats["reduction"] = self.metadata.reduction
+        if self.lexical is not None:
+            stats["bm25_terms"] = len(self.lexical.vocab)
+        if self.quantized is not None:
+            stats["quantization"] = self.quantized.mode
+            stats["quantized_mb"] = round(self.quantized.memory_bytes / 1024**2, 2)
+        if self.cache is not None:
+            stats["retrieval_cache"] = self.cache.stats()
+        return stats
 
     def reset(self) -> None:
         """Reset collection (delete all data)."""
-        self.chroma.reset()
-        logger.info("Reset ChromaDB collection")
+        self.store.reset()
+        if self.quantized is not None:
+            self.quantized.reset()
+
+        # Vectors are gone, so the projection and metadata describe nothing
+        self.projection = None
+        self.metadata = None
+        self.lexical = None
+        self.sources.clear()
+        self.sources.save()
+        for name in ("projection.npz", "index.json", "bm25.npz", "bm25.json"):
+            (self.sidecar_dir / name).unlink(missing_ok=True)
+        self._bump_epoch()
+        logger.info(f"Reset index: {self.store.name}")
 
     def has_document(self, doc_id: str) -> bool:
         """Check if document chunks exist in index.
@@ -112,8 +879,4 @@ class Indexer:
         Returns:
             True if document has indexed chunks
         """
-        results = self.chroma.collection.get(
-            where={"source_id": doc_id},
-            limit=1,
-        )
-        return len(results["ids"]) > 0
+        return doc_id in self.indexed_sources()
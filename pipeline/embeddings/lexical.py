@@ -0,0 +1,255 @@
+"""BM25 inverted index with a code-identifier-aware tokenizer."""
+
+import json
+import re
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Identifiers incl. Swift attributes (@Observable) and dotted members (URLSession.shared)
+_IDENTIFIER = re.compile(r"@?[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*|\d+(?:\.\d+)*")
+# Parts of camelCase / PascalCase / acronyms (NSPersistentContainer -> NS, Persistent, Container)
+_CAMEL_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from has have how if in into is it its "
+    "of on or so that the their then there these this to use used using vs was "
+    "we what when which while will with you your".split()
+)
+
+
+@lru_cache(maxsize=65536)
+def _expand(word: str) -> tuple[str, ...]:
+    """Terms for one identifier: its whole form, then its distinct parts."""
+    whole = word.lower()
+    terms = [] if whole in _STOPWORDS else [whole]
+
+    parts = []
+    for segment in word.lstrip("@").split("."):
+        pieces = [p for chunk in segment.split("_") for p in _CAMEL_PART.findall(chunk)]
+        if len(pieces) > 1 or segment.lower() != whole:
+            parts.append(segment.lower())
+        if len(pieces) > 1:
+            parts.extend(p.lower() for p in pieces)
+    terms.extend(
+        p for p in dict.fromkeys(parts) if len(p) > 1 and p != whole and p not in _STOPWORDS
+    )
+    return tuple(terms)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into BM25 terms, keeping code identifiers searchable.
+
+    Each identifier yields its whole lowercased form (``@observable``,
+    ``nspersistentcontainer``, ``urlsession.shared``) plus its parts
+    (``observable``; ``ns``, ``persistent``, ``container``; ``urlsession``,
+    ``shared``), so both exact identifiers and plain words match.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms (with repeats, for term frequencies)
+    """
+    terms = []
+    for word in _IDENTIFIER.findall(text):
+        terms.extend(_expand(word))
+    return terms
+
+
+class BM25Index:
+    """Compact BM25 inverted index over chunk text.
+
+    Postings are stored in CSR form (one offsets array into flat document
+    and term-frequency arrays), so a query is a few array slices and one
+    ``np.bincount`` with no API or database call.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """Initialize index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.ids: list[str] = []
+        self.vocab: dict[str, int] = {}
+        self.topics: list[str] = []
+        self.topic_codes = np.zeros(0, dtype=np.int32)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.postings = np.zeros(0, dtype=np.int32)
+        self.tfs = np.zeros(0, dtype=np.uint16)
+        self.doc_lengths = np.zeros(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def document_frequency(self, term: str) -> int:
+        """Number of chunks containing a (tokenized) term."""
+        i = self.vocab.get(term)
+        return 0 if i is None else int(self.offsets[i + 1] - self.offsets[i])
+
+    def build(self, ids: list[str], texts: list[str], topics: list[str]) -> "BM25Index":
+        """Build the index from scratch.
+
+        Args:
+            ids: Chunk IDs
+            texts: Chunk texts
+            topics: Chunk topics (for filtering)
+
+        Returns:
+            Self, for chaining
+        """
+        postings: dict[int, list[tuple[int, int]]] = {}
+        lengths = np.zeros(len(ids), dtype=np.float32)
+        vocab: dict[str, int] = {}
+
+        for doc, text in enumerate(texts):
+            # Expand each distinct identifier once, weighted by its frequency
+            counts: Counter[str] = Counter()
+            for word, n in Counter(_IDENTIFIER.findall(text)).items():
+                for term in _expand(word):
+                    counts[term] += n
+            lengths[doc] = sum(counts.values())
+            for term, tf in counts.items():
+                term_id = vocab.setdefault(term, len(vocab))
+                postings.setdefault(term_id, []).append((doc, tf))
+
+        sizes = np.array([len(postings[t]) for t in range(len(vocab))], dtype=np.int64)
+        self.offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.offsets[1:])
+
+        flat = [pair for t in range(len(vocab)) for pair in postings[t]]
+        self.postings = np.array([d for d, _ in flat], dtype=np.int32)
+        self.tfs = np.minimum(np.array([tf for _, tf in flat], dtype=np.int64), 65535).astype(
+            np.uint16
+        )
+
+        self.ids = list(ids)
+        self.vocab = vocab
+        self.doc_lengths = lengths
+        self.topics = sorted(set(topics))
+        topic_index = {t: i for i, t in enumerate(self.topics)}
+        self.topic_codes = np.array([topic_index[t] for t in topics], dtype=np.int32)
+
+        logger.info(f"Built BM25 index: {len(ids)} chunks, {len(vocab)} terms")
+        return self
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 10,
+        topic: str | None = None,
+    ) -> list[tuple[str, float]]:
+        """Rank chunks by BM25 score.
+
+        Args:
+            query: Query text
+            n_results: Number of results
+            topic: Optional topic filter
+
+        Returns:
+            List of (chunk ID, score), best first; only chunks matching a term
+        """
+        n_docs = len(self.ids)
+        term_ids = [self.vocab[t] for t in dict.fromkeys(tokenize(query)) if t in self.vocab]
+        if not n_docs or not term_ids:
+            return []
+
+        avg_length = float(self.doc_lengths.mean()) or 1.0
+        docs_parts, weight_parts = [], []
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.postings[start:end]
+            tf = self.tfs[start:end].astype(np.float32)
+            df = end - start
+            idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[docs] / avg_length)
+            docs_parts.append(docs)
+            weight_parts.append(idf * tf * (self.k1 + 1) / (tf + norm))
+
+        docs = np.concatenate(docs_parts)
+        scores = np.bincount(docs, weights=np.concatenate(weight_parts), minlength=n_docs)
+
+        candidates = np.unique(docs)
+        if topic is not None:
+            if topic not in self.topics:
+                return []
+            candidates = candidates[self.topic_codes[candidates] == self.topics.index(topic)]
+
+        k = min(n_results, len(candidates))
+        if k == 0:
+            return []
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[d], float(scores[d])) for d in top]
+
+    def save(self, path: str | Path) -> None:
+        """Save arrays to ``<path>.npz`` and terms/IDs to ``<path>.json``."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path.with_suffix(".npz"),
+            offsets=self.offsets,
+            postings=self.postings,
+            tfs=self.tfs,
+            doc_lengths=self.doc_lengths,
+            topic_codes=self.topic_codes,
+        )
+        with open(path.with_suffix(".json"), "w") as f:
+            json.dump(
+                {
+                    "k1": self.k1,
+                    "b": self.b,
+                    "ids": self.ids,
+                    "topics": self.topics,
+                    "terms": list(self.vocab),
+                },
+                f,
+            )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BM25Index | None":
+        """Load an index saved with ``save()``, or None if it doesn't exist."""
+        path = Path(path)
+        if not path.with_suffix(".json").exists():
+            return None
+
+        with open(path.with_suffix(".json")) as f:
+            meta = json.load(f)
+        index = cls(k1=meta["k1"], b=meta["b"])
+        index.ids = meta["ids"]
+        index.topics = meta["topics"]
+        index.vocab = {term: i for i, term in enumerate(meta["terms"])}
+        with np.load(path.with_suffix(".npz")) as data:
+            index.offsets = data["offsets"]
+            index.postings = data["postings"]
+            index.tfs = data["tfs"]
+            index.doc_lengths = data["doc_lengths"]
+            index.topic_codes = data["topic_codes"]
+        return index
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[tuple[str, float]]:
+    """Fuse ranked ID lists with reciprocal rank fusion.
+
+    Args:
+        rankings: Ranked ID lists, best first
+        k: RRF constant (larger flattens the rank weighting)
+
+    Returns:
+        List of (ID, fused score), best first
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
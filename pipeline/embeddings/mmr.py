@@ -0,0 +1,161 @@
+"""Maximal marginal relevance reranking and overlap collapsing for context."""
+
+import numpy as np
+
+# Characters of a chunk's start searched for in its predecessor to find overlap
+_OVERLAP_PROBE = 64
+
+
+def mmr_select(
+    query: np.ndarray,
+    candidates: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.7,
+) -> list[int]:
+    """Order candidates by maximal marginal relevance.
+
+    Each step picks the candidate maximizing
+    ``lambda * sim(query, c) - (1 - lambda) * max sim(c, selected)``.
+    Pairwise similarities are computed once as a matrix and the running
+    maximum is updated with one vector operation per pick.
+
+    Args:
+        query: Query vector (dim,)
+        candidates: Candidate vectors (n, dim)
+        k: Number of candidates to select
+        lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+
+    Returns:
+        Indices into candidates, in selection order
+    """
+    n = len(candidates)
+    k = min(k, n)
+    if k == 0:
+        return []
+
+    norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    matrix = np.divide(candidates, norms, out=np.zeros_like(candidates), where=norms > 0)
+    q = query / (np.linalg.norm(query) or 1.0)
+
+    relevance = matrix @ q
+    pairwise = matrix @ matrix.T
+
+    selected = [int(np.argmax(relevance))]
+    redundancy = pairwise[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(redundancy, pairwise[pick], out=redundancy)
+
+    return selected
+
+
+def overlap_length(first: str, second: str) -> int:
+    """Length of the text that ends first and starts second.
+
+    Returns:
+        Number of shared characters (0 if second doesn't start inside first)
+    """
+    probe = second[:_OVERLAP_PROBE]
+    if not probe:
+        return 0
+    start = first.find(probe)
+    while start != -1:
+        shared = first[start:]
+        if second.startswith(shared):
+            return len(shared)
+        start = first.find(probe, start + 1)
+    return 0
+
+
+def _merge_overlap(first: str, second: str) -> str | None:
+    """Join two consecutive chunks, dropping the text they share.
+
+    Returns:
+        Merged text, or None if second doesn't start inside first
+    """
+    if not second:
+        return first
+    shared = overlap_length(first, second)
+    if not shared:
+        return None
+    return first + second[shared:]
+
+
+def collapse_adjacent(
+    ids: list[str],
+    documents: list[str],
+    metadatas: list[dict],
+    distances: list[float],
+) -> dict:
+    """Merge chunks that are neighbours in the same source document.
+
+    Chunks overlap by design, so consecutive chunks of one document repeat
+    text. Neighbours (position n and n+1) whose texts overlap are merged into
+    one entry with the shared text kept once. A merged entry keeps the ID,
+    metadata and distance of its best-ranked member, and lists every member
+    under ``metadata["merged_ids"]``. Entries keep the order of their
+    best-ranked member.
+
+    Args:
+        ids: Chunk IDs, best first
+        documents: Chunk texts
+        metadatas: Chunk metadata (``source_id`` and ``position`` are used)
+        distances: Chunk distances
+
+    Returns:
+        Dict of ids, documents, metadatas, distances (flat lists)
+    """
+    by_source: dict[str, list[int]] = {}
+    for i, meta in enumerate(metadatas):
+        meta = meta or {}
+        if "source_id" in meta and "position" in meta:
+            by_source.setdefault(meta["source_id"], []).append(i)
+
+    # Rank of each group's head -> (member ranks, merged text)
+    groups: dict[int, tuple[list[int], str]] = {
+        i: ([i], doc) for i, doc in enumerate(documents)
+    }
+    for members in by_source.values():
+        members.sort(key=lambda i: metadatas[i]["position"])
+        run = [members[0]]
+        text = documents[members[0]]
+        for prev, cur in zip(members, members[1:]):
+            merged = None
+            if metadatas[cur]["position"] == metadatas[prev]["position"] + 1:
+                merged = _merge_overlap(text, documents[cur])
+            if merged is None:
+                _store_run(groups, run, text)
+                run, text = [cur], documents[cur]
+            else:
+                run.append(cur)
+                text = merged
+        _store_run(groups, run, text)
+
+    result: dict = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+    for head in sorted(groups):
+        members, text = groups[head]
+        meta = dict(metadatas[head] or {})
+        if len(members) > 1:
+            ordered = sorted(members, key=lambda i: metadatas[i]["position"])
+            meta["merged_ids"] = [ids[i] for i in ordered]
+        result["ids"].append(ids[head])
+        result["documents"].append(text)
+        result["metadatas"].append(meta)
+        result["distances"].append(min(distances[i] for i in members))
+    return result
+
+
+def _store_run(groups: dict[int, tuple[list[int], str]], run: list[int], text: str) -> None:
+    """Replace the single-chunk groups of a run with one merged group."""
+    if len(run) == 1:
+        return
+    for i in run:
+        groups.pop(i, None)
+    groups[min(run)] = (run, text)
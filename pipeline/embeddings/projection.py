@@ -0,0 +1,115 @@
+"""PCA projection for reducing embedding dimensionality locally."""
+
+from pathlib import Path
+
+import numpy as np
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class PCAProjection:
+    """Linear projection onto the top principal components of a corpus.
+
+    Used when the embedding provider can't truncate vectors itself. Fitted
+    once on the document embeddings at index time and applied to every query
+    so both sides live in the same reduced space.
+    """
+
+    def __init__(
+        self,
+        mean: np.ndarray | None = None,
+        components: np.ndarray | None = None,
+        explained_variance: float = 0.0,
+    ):
+        self.mean = mean
+        self.components = components
+        self.explained_variance = explained_variance
+
+    @property
+    def dimensions(self) -> int:
+        """Output vector size."""
+        return 0 if self.components is None else self.components.shape[0]
+
+    @property
+    def source_dimensions(self) -> int:
+        """Input vector size."""
+        return 0 if self.components is None else self.components.shape[1]
+
+    def fit(
+        self,
+        embeddings: list[list[float]] | np.ndarray,
+        dimensions: int,
+        max_samples: int = 20_000,
+        seed: int = 0,
+    ) -> "PCAProjection":
+        """Fit components on a sample of the corpus.
+
+        Args:
+            embeddings: Full-width document embeddings
+            dimensions: Output vector size
+            max_samples: Rows sampled for the SVD
+            seed: Sampling seed
+
+        Returns:
+            Self, for chaining
+
+        Raises:
+            ValueError: If dimensions exceeds the input width or sample size
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if len(matrix) > max_samples:
+            rows = np.random.default_rng(seed).choice(len(matrix), max_samples, replace=False)
+            matrix = matrix[rows]
+
+        if dimensions > min(matrix.shape):
+            raise ValueError(
+                f"Cannot project {matrix.shape[1]}-dim vectors from "
+                f"{matrix.shape[0]} samples down to {dimensions} dims"
+            )
+
+        self.mean = matrix.mean(axis=0)
+        _, singular, vt = np.linalg.svd(matrix - self.mean, full_matrices=False)
+        self.components = vt[:dimensions].astype(np.float32)
+
+        variance = singular**2
+        self.explained_variance = float(variance[:dimensions].sum() / variance.sum())
+        logger.info(
+            f"Fitted PCA {self.source_dimensions} -> {dimensions} dims "
+            f"({self.explained_variance:.1%} variance kept)"
+        )
+        return self
+
+    def transform(self, embeddings: list[list[float]] | np.ndarray) -> np.ndarray:
+        """Project and L2-normalize vectors.
+
+        Args:
+            embeddings: Full-width vectors (n, source_dimensions)
+
+        Returns:
+            Reduced vectors (n, dimensions)
+        """
+        matrix = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        reduced = (matrix - self.mean) @ self.components.T
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        return np.divide(reduced, norms, out=np.zeros_like(reduced), where=norms > 0)
+
+    def save(self, path: str | Path) -> None:
+        """Save projection to an .npz file."""
+        np.savez(
+            path,
+            mean=self.mean,
+            components=self.components,
+            explained_variance=self.explained_variance,
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "PCAProjection":
+        """Load projection from an .npz file."""
+        with np.load(path) as data:
+            return cls(
+                mean=data["mean"],
+                components=data["components"],
+                explained_variance=float(data["explained_variance"]),
+            )
@@ -0,0 +1,401 @@
+"""Quantized vector storage with coarse search and full-precision rescoring."""
+
+import json
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so dot products are cosine similarities."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+# Rows decoded per block during coarse scans (keeps temporaries cache-sized)
+_SCAN_BLOCK = 4096
+
+
+def _blockwise_scores(codes: np.ndarray, decode, query: np.ndarray) -> np.ndarray:
+    """Dot products of a query with decoded code rows, one block at a time."""
+    scores = np.empty(len(codes), dtype=np.float32)
+    for start in range(0, len(codes), _SCAN_BLOCK):
+        block = decode(codes[start : start + _SCAN_BLOCK])
+        scores[start : start + _SCAN_BLOCK] = block @ query
+    return scores
+
+
+# Shift of the running corpus mean (unit vectors) that makes binary codes recalibrate
+_MEAN_DRIFT = 0.05
+
+# +/-1 bit patterns of every byte value, most significant bit first (packbits order)
+_BYTE_SIGNS = (
+    np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).astype(np.float32)
+    * 2.0
+    - 1.0
+)
+
+
+class Int8Quantizer:
+    """Symmetric per-dimension scalar quantization to int8."""
+
+    def __init__(self):
+        self.scale: np.ndarray | None = None
+
+    def fit(self, vectors: np.ndarray) -> None:
+        """Calibrate per-dimension scales from the largest magnitudes."""
+        peak = np.abs(vectors).max(axis=0)
+        self.scale = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+
+    def update(self, vectors: np.ndarray) -> bool:
+        """Whether added vectors fit the calibrated range (False = refit first)."""
+        if self.scale is None:
+            return False
+        return bool((np.abs(vectors) <= self.scale * 127.0 * (1 + 1e-6)).all())
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.rint(vectors / self.scale)
+        return np.clip(codes, -127, 127).astype(np.int8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return codes.astype(np.float32) * self.scale
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Approximate dot products between a query and all codes."""
+        return _blockwise_scores(
+            codes, lambda block: block.astype(np.float32), query * self.scale
+        )
+
+    def state(self) -> dict:
+        return {"scale": self.scale.tolist() if self.scale is not None else None}
+
+    def load_state(self, state: dict) -> None:
+        if state.get("scale") is not None:
+            self.scale = np.array(state["scale"], dtype=np.float32)
+
+
+class BinaryQuantizer:
+    """1-bit sign quantization of mean-centered vectors, 8 dimensions per byte.
+
+    Scoring is asymmetric: the query stays in float32 and is compared with the
+    +/-1 codes, which keeps noticeably more recall than Hamming distance on
+    sparse or short-query embeddings.
+    """
+
+    def __init__(self):
+        self.mean: np.ndarray | None = None
+        self.total: np.ndarray | None = None  # sum of every vector added since fit()
+        self.count = 0
+
+    def fit(self, vectors: np.ndarray) -> None:
+        """Record the corpus mean used to center vectors before taking signs."""
+        self.mean = vectors.mean(axis=0).astype(np.float32)
+        self.total = vectors.sum(axis=0, dtype=np.float64)
+        self.count = len(vectors)
+
+    def update(self, vectors: np.ndarray) -> bool:
+        """Count added vectors; whether the corpus mean stayed put (False = refit)."""
+        if self.mean is None:
+            return False
+        self.total = self.total + vectors.sum(axis=0, dtype=np.float64)
+        self.count += len(vectors)
+        drift = np.linalg.norm(self.total / self.count - self.mean)
+        return bool(drift <= _MEAN_DRIFT)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.packbits((vectors - self.mean) > 0, axis=1)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Approximate dot products between a query and all codes.
+
+        Builds a (256, n_bytes) table with the contribution of every possible
+        byte value at every byte position, so a scan is one gather and sum.
+        """
+        padded = np.zeros(codes.shape[1] * 8, dtype=np.float32)
+        padded[: len(query)] = query
+        table = np.ascontiguousarray((_BYTE_SIGNS @ padded.reshape(-1, 8).T).T)
+
+        scores = np.zeros(len(codes), dtype=np.float32)
+        for position, contributions in enumerate(table):
+            scores += contributions.take(codes[:, position])
+        return scores
+
+    def state(self) -> dict:
+        if self.mean is None:
+            return {"mean": None}
+        return {"mean": self.mean.tolist(), "total": self.total.tolist(), "count": self.count}
+
+    def load_state(self, state: dict) -> None:
+        if state.get("mean") is not None:
+            self.mean = np.array(state["mean"], dtype=np.float32)
+            self.total = np.array(state.get("total", self.mean), dtype=np.float64)
+            self.count = state.get("count", 1)
+
+
+class QuantizedIndex:
+    """Quantized copy of indexed vectors kept next to the main collection.
+
+    Coarse search scans only the compact codes (int8 or packed bits). The top
+    ``rescore_factor * n_results`` candidates are then rescored with exact
+    cosine similarity against their full-precision vectors, read from the
+    vector store through ``fetch``; no second float copy is kept on disk.
+
+    The quantizer is calibrated by the first add. Later adds encode only the
+    new vectors while they fit the calibration (int8: within the per-dimension
+    range; binary: the corpus mean hasn't drifted). When they don't, the whole
+    index is recalibrated and re-encoded from the stored vectors once, so
+    incremental syncs still quantize as well as a full build.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        mode: str = "int8",
+        rescore_factor: int = 4,
+        fetch: Callable[[list[str]], np.ndarray] | None = None,
+    ):
+        """Initialize index.
+
+        Args:
+            path: Directory for the quantized files
+            mode: Quantization mode ("int8" or "binary")
+            rescore_factor: Candidates rescored per requested result
+            fetch: Full-precision vectors of stored IDs, one row per ID (e.g.
+                from the vector store). Without it, results keep their coarse
+                scores and recalibration re-encodes from the codes (int8) or
+                waits for ``recalibrate()`` (binary)
+
+        Raises:
+            ValueError: If mode is not a quantized mode
+        """
+        if mode not in ("int8", "binary"):
+            raise ValueError(f"Unsupported quantization mode: {mode}")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.rescore_factor = rescore_factor
+        self.fetch = fetch
+        self.quantizer = Int8Quantizer() if mode == "int8" else BinaryQuantizer()
+
+        self.ids: list[str] = []
+        self.topics: np.ndarray = np.array([], dtype=object)
+        self.codes: np.ndarray | None = None
+        self.recalibrations = 0
+        self._dirty = False
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes of resident codes used by the coarse scan."""
+        return 0 if self.codes is None else int(self.codes.nbytes)
+
+    def _load(self) -> None:
+        """Load codes and ID/topic columns into memory."""
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            return
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        if meta.get("mode") != self.mode:
+            logger.warning(
+                f"Quantized index mode changed ({meta.get('mode')} -> {self.mode}), "
+                "rebuild the index to use it"
+            )
+            return
+
+        self.ids = meta["ids"]
+        self.topics = np.array(meta["topics"], dtype=object)
+        self.quantizer.load_state(meta.get("quantizer", {}))
+        self.codes = np.load(self.path / "codes.npy")
+        logger.debug(f"Loaded quantized index: {len(self.ids)} vectors ({self.mode})")
+
+    def save(self) -> None:
+        """Persist codes and ID/topic columns if they changed."""
+        if not self._dirty:
+            return
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._dirty = False
+        # Full-precision copy written by earlier versions; rescoring reads the store
+        (self.path / "vectors.npy").unlink(missing_ok=True)
+        if self.codes is None:
+            for name in ("meta.json", "codes.npy"):
+                (self.path / name).unlink(missing_ok=True)
+            return
+
+        np.save(self.path / "codes.npy", self.codes)
+        with open(self.path / "meta.json", "w") as f:
+            json.dump(
+                {
+                    "mode": self.mode,
+                    "ids": self.ids,
+                    "topics": self.topics.tolist(),
+                    "quantizer": self.quantizer.state(),
+                },
+                f,
+            )
+
+    def add(
+        self,
+        ids: list[str],
+        embeddings: list[list[float]] | np.ndarray,
+        topics: list[str],
+    ) -> None:
+        """Add or replace vectors.
+
+        Only the new vectors are encoded unless they fall outside the
+        calibration, in which case everything is recalibrated first.
+
+        Args:
+            ids: Chunk IDs
+            embeddings: Embedding vectors
+            topics: Topic of each chunk (used for filtering)
+        """
+        if not ids:
+            return
+
+        self.delete(ids)
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+
+        if self.codes is None:
+            self.quantizer.fit(vectors)
+        elif not self.quantizer.update(vectors):
+            self._recalibrate(vectors)
+
+        codes = self.quantizer.encode(vectors)
+        self.codes = codes if self.codes is None else np.concatenate([self.codes, codes])
+        self.ids = self.ids + list(ids)
+        self.topics = np.concatenate([self.topics, np.array(topics, dtype=object)])
+        self._dirty = True
+
+    def recalibrate(self) -> None:
+        """Refit the quantizer on every stored vector and re-encode all codes."""
+        self._recalibrate(np.empty((0, 0), dtype=np.float32))
+
+    def _recalibrate(self, new: np.ndarray) -> None:
+        """Refit on the indexed vectors plus ``new`` (not yet added), re-encoding codes."""
+        if self.codes is None:
+            return
+        if self.fetch is not None:
+            stored = _normalize(np.asarray(self.fetch(self.ids), dtype=np.float32))
+        elif isinstance(self.quantizer, Int8Quantizer):
+            # Re-encoding decoded codes adds at most half a step of the new scale
+            stored = self.quantizer.decode(self.codes)
+        else:
+            logger.debug("Binary codes left as they are: no stored vectors to re-encode")
+            return
+
+        self.quantizer.fit(np.concatenate([stored, new]) if len(new) else stored)
+        self.codes = self.quantizer.encode(stored)
+        self.recalibrations += 1
+        self._dirty = True
+        logger.debug(f"Recalibrated quantized index ({len(self.ids)} vectors)")
+
+    def delete(self, ids: list[str]) -> None:
+        """Remove vectors by ID (unknown IDs are ignored)."""
+        if self.codes is None or not ids:
+            return
+
+        drop = set(ids)
+        keep = np.array([i not in drop for i in self.ids], dtype=bool)
+        if keep.all():
+            return
+
+        self._dirty = True
+        self.ids = [i for i, k in zip(self.ids, keep) if k]
+        self.topics = self.topics[keep]
+        self.codes = self.codes[keep] if self.ids else None
+
+    def reset(self) -> None:
+        """Delete all vectors."""
+        self.ids = []
+        self.topics = np.array([], dtype=object)
+        self.codes = None
+        self._dirty = True
+        self.save()
+
+    def search(
+        self,
+        query: list[float] | np.ndarray,
+        n_results: int = 10,
+        topic: str | None = None,
+    ) -> tuple[list[str], list[float]]:
+        """Find nearest vectors by coarse scan plus exact rescoring.
+
+        Args:
+            query: Query embedding vector
+            n_results: Number of results
+            topic: Optional topic filter
+
+        Returns:
+            Tuple of (ids, cosine distances), best first
+        """
+        return self.search_batch([query], n_results, [topic])[0]
+
+    def search_batch(
+        self,
+        queries: list[list[float]] | np.ndarray,
+        n_results: int = 10,
+        topics: list[str | None] | None = None,
+    ) -> list[tuple[list[str], list[float]]]:
+        """Search many queries, rescoring all their candidates with one fetch.
+
+        Args:
+            queries: Query embedding vectors
+            n_results: Number of results per query
+            topics: Optional topic filter per query
+
+        Returns:
+            (ids, cosine distances) per query, best first
+        """
+        topics = topics or [None] * len(queries)
+        if self.codes is None:
+            return [([], []) for _ in queries]
+
+        prepared = []
+        for query, topic in zip(queries, topics):
+            q = _normalize(np.asarray(query, dtype=np.float32)[None, :])[0]
+            coarse = self.quantizer.scores(self.codes, q).astype(np.float32)
+            if topic is not None:
+                coarse[self.topics != topic] = -np.inf
+
+            n_candidates = min(n_results * self.rescore_factor, int(np.isfinite(coarse).sum()))
+            if n_candidates == 0:
+                candidates = np.array([], dtype=np.intp)
+            else:
+                candidates = np.argpartition(-coarse, n_candidates - 1)[:n_candidates]
+            prepared.append((q, candidates, coarse[candidates]))
+
+        exact_rows: dict[int, np.ndarray] = {}
+        if self.fetch is not None:
+            rows = sorted({int(r) for _, candidates, _ in prepared for r in candidates})
+            if rows:
+                vectors = _normalize(
+                    np.asarray(self.fetch([self.ids[r] for r in rows]), dtype=np.float32)
+                )
+                exact_rows = dict(zip(rows, vectors))
+
+        results = []
+        for q, candidates, coarse in prepared:
+            if exact_rows:
+                scores = np.array([exact_rows[int(r)] @ q for r in candidates], dtype=np.float32)
+            else:
+                scores = coarse
+            order = np.argsort(-scores)[:n_results]
+            results.append(
+                (
+                    [self.ids[candidates[i]] for i in order],
+                    [float(1.0 - scores[i]) for i in order],
+                )
+            )
+        return results
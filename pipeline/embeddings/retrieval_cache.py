@@ -0,0 +1,134 @@
+"""Persistent cache of retrieval results tied to an index version."""
+
+import hashlib
+import json
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def new_epoch() -> str:
+    """Create a fresh index version token.
+
+    Random rather than a counter, so a reset index (whose sidecar files are
+    deleted) can never reuse the version of results cached before it.
+    """
+    return uuid.uuid4().hex[:12]
+
+
+def cache_key(
+    embedding: list[float],
+    where: dict | None,
+    n_results: int,
+    extra: str = "",
+) -> str:
+    """Build a cache key for one query.
+
+    Args:
+        embedding: Query embedding (as searched, i.e. after any projection)
+        where: Metadata filter
+        n_results: Number of results requested
+        extra: Anything else the result depends on (e.g. keyword query text)
+
+    Returns:
+        Hex digest identifying the query
+    """
+    digest = hashlib.sha1(np.asarray(embedding, dtype=np.float32).tobytes())
+    digest.update(json.dumps([where, n_results, extra], sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class RetrievalCache:
+    """Query results cached on disk for one index epoch.
+
+    Entries are dropped wholesale when the epoch changes, and the oldest
+    entries are evicted once ``max_entries`` is reached. ``put()`` only
+    updates memory; the owner calls ``save()`` once per run (see
+    ``Indexer.flush()``), since each save rewrites the whole file.
+    """
+
+    def __init__(self, path: str | Path, epoch: str, max_entries: int = 5000):
+        """Initialize cache.
+
+        Args:
+            path: JSON file backing the cache
+            epoch: Current index version
+            max_entries: Maximum number of cached queries
+        """
+        self.path = Path(path)
+        self.epoch = epoch
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, dict] = {}
+        self._dirty = False
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable retrieval cache: {e}")
+            return
+        if data.get("epoch") == self.epoch:
+            self._entries = data.get("entries", {})
+
+    def get(self, key: str) -> dict | None:
+        """Look up a cached result and record a hit or miss."""
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result: dict) -> None:
+        """Store a result, evicting the oldest entries when full."""
+        self._entries.pop(key, None)
+        self._entries[key] = result
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+        self._dirty = True
+
+    def invalidate(self, epoch: str) -> None:
+        """Drop every entry after the index changed."""
+        self.epoch = epoch
+        if self._entries:
+            self._entries = {}
+            self._dirty = True
+        self.save()
+
+    def save(self) -> None:
+        """Write entries to disk if they changed."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            # default=float converts NumPy scalars some stores return as distances
+            json.dump({"epoch": self.epoch, "entries": self._entries}, f, default=float)
+        self._dirty = False
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+            "entries": len(self._entries),
+        }
@@ -0,0 +1,102 @@
+"""Portable single-file snapshots of an index."""
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .index_metadata import IndexMetadata
+from .projection import PCAProjection
+
+# Bumped whenever the snapshot layout changes; older snapshots are rejected
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def _pack_json(value) -> np.ndarray:
+    """Encode a JSON-serializable value as a byte array (no pickling needed)."""
+    return np.frombuffer(json.dumps(value).encode(), dtype=np.uint8)
+
+
+def _unpack_json(array: np.ndarray):
+    return json.loads(array.tobytes().decode())
+
+
+@dataclass
+class IndexSnapshot:
+    """Everything needed to restore an index without re-embedding.
+
+    Vectors are stored as indexed (after any PCA projection), together with
+    the projection itself so queries can be reduced the same way.
+    """
+
+    metadata: IndexMetadata
+    ids: list[str]
+    vectors: np.ndarray  # float32, (n, metadata.dimensions)
+    documents: list[str]
+    metadatas: list[dict]
+    projection: PCAProjection | None = None
+
+    @property
+    def content_hashes(self) -> list[str]:
+        return [(m or {}).get("content_hash", "") for m in self.metadatas]
+
+    def save(self, path: str | Path) -> None:
+        """Write the snapshot as one compressed .npz file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        arrays = {
+            "format_version": np.array(SNAPSHOT_FORMAT_VERSION),
+            "metadata": _pack_json(asdict(self.metadata)),
+            "ids": _pack_json(self.ids),
+            "vectors": np.asarray(self.vectors, dtype=np.float32),
+            "documents": _pack_json(self.documents),
+            "metadatas": _pack_json(self.metadatas),
+            "content_hashes": _pack_json(self.content_hashes),
+        }
+        if self.projection is not None:
+            arrays["projection_mean"] = self.projection.mean
+            arrays["projection_components"] = self.projection.components
+            arrays["projection_explained_variance"] = np.array(
+                self.projection.explained_variance
+            )
+
+        # Write to a temp file first so an interrupted export never leaves a
+        # truncated snapshot behind
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "IndexSnapshot":
+        """Read a snapshot written by ``save()``.
+
+        Raises:
+            ValueError: If the snapshot was written in another format version
+        """
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["format_version"])
+            if version != SNAPSHOT_FORMAT_VERSION:
+                raise ValueError(
+                    f"Snapshot format v{version} is not supported "
+                    f"(expected v{SNAPSHOT_FORMAT_VERSION}); re-export it"
+                )
+
+            projection = None
+            if "projection_components" in data:
+                projection = PCAProjection(
+                    mean=data["projection_mean"],
+                    components=data["projection_components"],
+                    explained_variance=float(data["projection_explained_variance"]),
+                )
+
+            return cls(
+                metadata=IndexMetadata(**_unpack_json(data["metadata"])),
+                ids=_unpack_json(data["ids"]),
+                vectors=data["vectors"],
+                documents=_unpack_json(data["documents"]),
+                metadatas=_unpack_json(data["metadatas"]),
+                projection=projection,
+            )
@@ -0,0 +1,123 @@
+"""Sidecar manifest of indexed source documents and their chunks."""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def source_hash(chunk_hashes: dict[str, str]) -> str:
+    """Hash of a source document's chunk IDs and chunk content hashes."""
+    digest = hashlib.sha1()
+    for chunk_id in sorted(chunk_hashes):
+        digest.update(f"{chunk_id}:{chunk_hashes[chunk_id]}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class SourceEntry:
+    """An indexed source document."""
+
+    content_hash: str
+    chunks: dict[str, str] = field(default_factory=dict)  # chunk ID -> content hash
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self.chunks)
+
+
+class SourceManifest:
+    """Indexed chunks grouped by source document, kept in one JSON file.
+
+    Read once when the Indexer opens, so existence and change checks for the
+    whole corpus need no vector store queries.
+    """
+
+    def __init__(self, path: str | Path):
+        """Initialize manifest.
+
+        Args:
+            path: JSON file backing the manifest
+        """
+        self.path = Path(path)
+        self.sources: dict[str, SourceEntry] = {}
+        self._chunk_sources: dict[str, str] = {}  # chunk ID -> source ID
+        self.exists = self.path.exists()
+        if self.exists:
+            with open(self.path) as f:
+                data = json.load(f)
+            for source_id, chunks in data.items():
+                self.sources[source_id] = SourceEntry(source_hash(chunks), chunks)
+                for chunk_id in chunks:
+                    self._chunk_sources[chunk_id] = source_id
+
+    def __contains__(self, source_id: str) -> bool:
+        return source_id in self.sources
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def chunk_hashes(self) -> dict[str, str]:
+        """Content hash of every indexed chunk."""
+        return {
+            chunk_id: chunk_hash
+            for entry in self.sources.values()
+            for chunk_id, chunk_hash in entry.chunks.items()
+        }
+
+    def add(self, chunks: list[tuple[str, str, str]]) -> None:
+        """Record indexed chunks.
+
+        Args:
+            chunks: (source ID, chunk ID, content hash) tuples
+        """
+        touched = set()
+        for source_id, chunk_id, chunk_hash in chunks:
+            previous = self._chunk_sources.get(chunk_id)
+            if previous is not None and previous != source_id:
+                self._remove_chunk(chunk_id)
+                touched.add(previous)
+            self.sources.setdefault(source_id, SourceEntry("")).chunks[chunk_id] = chunk_hash
+            self._chunk_sources[chunk_id] = source_id
+            touched.add(source_id)
+        self._rehash(touched)
+
+    def remove(self, chunk_ids: list[str]) -> None:
+        """Forget deleted chunks (unknown IDs are ignored)."""
+        touched = set()
+        for chunk_id in chunk_ids:
+            source_id = self._remove_chunk(chunk_id)
+            if source_id is not None:
+                touched.add(source_id)
+        self._rehash(touched)
+
+    def clear(self) -> None:
+        self.sources = {}
+        self._chunk_sources = {}
+
+    def _remove_chunk(self, chunk_id: str) -> str | None:
+        source_id = self._chunk_sources.pop(chunk_id, None)
+        if source_id is not None:
+            self.sources[source_id].chunks.pop(chunk_id, None)
+        return source_id
+
+    def _rehash(self, source_ids: set[str]) -> None:
+        for source_id in source_ids:
+            entry = self.sources.get(source_id)
+            if entry is None:
+                continue
+            if not entry.chunks:
+                del self.sources[source_id]
+            else:
+                entry.content_hash = source_hash(entry.chunks)
+
+    def save(self) -> None:
+        """Write the manifest (chunk hashes per source; source hashes are derived)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({sid: entry.chunks for sid, entry in self.sources.items()}, f)
+        self.exists = True
@@ -1,14 +1,35 @@
 """RAG-based flashcard generation."""
 
 from .code_verifier import CodeVerifier
+from .context_map import ContextMap
+from .context_packer import ContextPacker, PackedContext
+from .engine import CardOutcome, GenerationEngine, GenerationStats
 from .flashcard_generator import FlashcardGenerator
-from .models import Flashcard, GenerationResult
+from .models import CodeVerification, Flashcard, FlashcardDraft, GenerationResult
 from .prompts import SENIOR_IOS_TOPICS
+from .published_index import AlreadyPublished, PublishedIndex, normalize_front
+from .scheduler import QuotaScheduler, RunPlan
+from .stream_parser import IncrementalParser, MalformedOutput
 
 __all__ = [
+    "AlreadyPublished",
+    "CardOutcome",
+    "CodeVerification",
     "CodeVerifier",
+    "ContextMap",
+    "ContextPacker",
     "Flashcard",
+    "FlashcardDraft",
     "FlashcardGenerator",
+    "GenerationEngine",
     "GenerationResult",
+    "GenerationStats",
+    "IncrementalParser",
+    "MalformedOutput",
+    "PackedContext",
+    "PublishedIndex",
+    "QuotaScheduler",
+    "RunPlan",
     "SENIOR_IOS_TOPICS",
+    "normalize_front",
 ]
@@ -1,14 +1,14 @@
 """Code example generation and verification."""
 
-import json
 import os
 import re
 import subprocess
 import tempfile
 
 from ..clients.gemini_client import GeminiClient
+from ..clients.structured import parse_structured
 from ..utils.logging import get_logger
-from .models import Flashcard
+from .models import CodeVerification, Flashcard
 from .prompts import CODE_EXAMPLE_PROMPT, CODE_VERIFY_PROMPT
 
 logger = get_logger(__name__)
@@ -69,8 +69,8 @@ class CodeVerifier:
         prompt = CODE_VERIFY_PROMPT.format(code=code)
 
         try:
-            response = await self.gemini.generate(prompt)
-            llm_result = self._parse_verification_response(response)
+            response = await self.gemini.generate(prompt, schema=CodeVerification)
+            llm_result = parse_structured(CodeVerification, response).model_dump()
         except Exception as e:
             logger.error(f"LLM verification failed: {e}")
             llm_result = {"compiles": False, "issues": [str(e)]}
@@ -84,33 +84,6 @@ class CodeVerifier:
             "verified": compiler_result["success"] and llm_result.get("correct", False),
         }
 
-    def _parse_verification_response(self, response: str) -> dict:
-        """Parse verification JSON from LLM response."""
-        # Try extracting JSON
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            pass
-
-        # Try from code block
-        if "```json" in response:
-            match = re.search(r"```json\s*(.*?)\s*```", response, re.DOTALL)
-            if match:
-                try:
-                    return json.loads(match.group(1))
-                except json.JSONDecodeError:
-                    pass
-
-        # Try any JSON object
-        match = re.search(r"\{.*\}", response, re.DOTALL)
-        if match:
-            try:
-                return json.loads(match.group())
-            except json.JSONDecodeError:
-                pass
-
-        return {"compiles": False, "issues": ["Failed to parse verification response"]}
-
     def _swift_compile_check(self, code: str) -> dict:
         """Check if code compiles with Swift compiler."""
         try:
@@ -0,0 +1,431 @@
+"""Precomputed retrieval context for every subtopic in ``SENIOR_IOS_TOPICS``."""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from ..config import get_settings
+from ..embeddings.embedder import Embedder
+from ..embeddings.indexer import Indexer
+from ..embeddings.lexical import tokenize
+from ..embeddings.mmr import collapse_adjacent
+from ..utils.logging import get_logger
+from .prompts import SENIOR_IOS_TOPICS
+
+logger = get_logger(__name__)
+
+
+def query_text(topic: str, subtopic: str) -> str:
+    """Retrieval query for a subtopic."""
+    return f"{topic} {subtopic} iOS interview"
+
+
+def text_hash(text: str) -> str:
+    """Short hash of a context text, used to validate lookups."""
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def search_candidates(
+    indexer: Indexer,
+    items: list[tuple[tuple[str, str], list[float]]],
+    n_context: int,
+) -> list[dict]:
+    """Blocking candidate search for ((topic, subtopic), query embedding) items.
+
+    Topic-filtered hybrid search with an unfiltered fallback, fetching
+    ``mmr_fetch_factor`` times more candidates than context entries.
+
+    Returns:
+        One query result dict per item, in input order
+    """
+    n_candidates = n_context * max(1, get_settings().mmr_fetch_factor)
+    requests = [request for request, _ in items]
+    return indexer.query_batch(
+        [embedding for _, embedding in items],
+        topics=[topic for topic, _ in requests],
+        n_results=n_candidates,
+        fallback_unfiltered=True,
+        query_texts=[subtopic for _, subtopic in requests],
+    )
+
+
+def select_context(
+    indexer: Indexer,
+    embeddings: list[list[float]],
+    candidates: list[dict],
+    n_context: int,
+) -> list[dict]:
+    """Rerank candidates with MMR and merge overlapping neighbours."""
+    settings = get_settings()
+    if max(1, settings.mmr_fetch_factor) == 1:
+        return candidates
+    return indexer.diversify(
+        embeddings, candidates, n_context, lambda_mult=settings.mmr_lambda
+    )
+
+
+def search_context(
+    indexer: Indexer,
+    items: list[tuple[tuple[str, str], list[float]]],
+    n_context: int,
+) -> list[dict]:
+    """Blocking context search for ((topic, subtopic), query embedding) items.
+
+    Args:
+        indexer: Index to search
+        items: ((topic, subtopic), embedding) pairs
+        n_context: Context entries per subtopic
+
+    Returns:
+        One query result dict per item, in input order
+    """
+    candidates = search_candidates(indexer, items, n_context)
+    return select_context(indexer, [e for _, e in items], candidates, n_context)
+
+
+@dataclass
+class ContextEntry:
+    """Stored context of one subtopic."""
+
+    topic: str
+    # One dict per context entry: head chunk "id", "members" (chunk IDs in
+    # document order, more than one when neighbours were merged), "score"
+    # (cosine similarity) and "hash" (of the context text)
+    contexts: list[dict] = field(default_factory=list)
+    # Chunk IDs MMR chose the contexts from, and the lowest similarity among them
+    candidates: list[str] = field(default_factory=list)
+    floor: float = -1.0
+    # Keyword index document frequency of each subtopic term (hybrid only)
+    terms: dict[str, int] = field(default_factory=dict)
+    # Whether the unfiltered fallback contributed candidates
+    crosses_topics: bool = False
+
+    @property
+    def chunk_ids(self) -> set[str]:
+        return {m for c in self.contexts for m in c["members"]}
+
+
+class ContextMap:
+    """Subtopic -> top-k context chunks, computed by the embed stage.
+
+    Saved as ``<path>.json`` (entries) and ``<path>.npz`` (query embeddings,
+    reused when only the index changed). ``generate`` looks contexts up by
+    chunk ID, so it needs no embedding call and no vector search. The map is
+    valid only for the index epoch and retrieval settings it was built with.
+    """
+
+    def __init__(self, path: str | Path):
+        """Initialize map.
+
+        Args:
+            path: File path without suffix
+        """
+        self.path = Path(path)
+        self.epoch = ""
+        self.config: dict = {}
+        self.entries: dict[str, ContextEntry] = {}
+        self.query_vectors: dict[str, np.ndarray] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(topic: str, subtopic: str) -> str:
+        return f"{topic}::{subtopic}"
+
+    @staticmethod
+    def current_config(n_context: int) -> dict:
+        """Settings the stored contexts depend on."""
+        settings = get_settings()
+        return {
+            "embedding_model": settings.embedding_model,
+            "embedding_dimensions": settings.embedding_dimensions,
+            "n_context": n_context,
+            "mmr_fetch_factor": settings.mmr_fetch_factor,
+            "mmr_lambda": settings.mmr_lambda,
+            "hybrid_retrieval": settings.hybrid_retrieval,
+            "rrf_k": settings.rrf_k,
+        }
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ContextMap":
+        """Load a saved map (empty if none exists yet)."""
+        context_map = cls(path)
+        json_path = context_map.path.with_suffix(".json")
+        if not json_path.exists():
+            return context_map
+
+        with open(json_path) as f:
+            data = json.load(f)
+        context_map.epoch = data.get("epoch", "")
+        context_map.config = data.get("config", {})
+        context_map.entries = {
+            key: ContextEntry(**entry) for key, entry in data.get("entries", {}).items()
+        }
+
+        npz_path = context_map.path.with_suffix(".npz")
+        if npz_path.exists():
+            with np.load(npz_path) as arrays:
+                keys = json.loads(arrays["keys"].tobytes().decode())
+                context_map.query_vectors = dict(zip(keys, arrays["vectors"]))
+        return context_map
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix(".json"), "w") as f:
+            json.dump(
+                {
+                    "epoch": self.epoch,
+                    "config": self.config,
+                    "entries": {key: asdict(entry) for key, entry in self.entries.items()},
+                },
+                f,
+            )
+
+        keys = list(self.query_vectors)
+        vectors = (
+            np.stack([self.query_vectors[k] for k in keys]).astype(np.float32)
+            if keys
+            else np.zeros((0, 0), dtype=np.float32)
+        )
+        np.savez(
+            self.path.with_suffix(".npz"),
+            keys=np.frombuffer(json.dumps(keys).encode(), dtype=np.uint8),
+            vectors=vectors,
+        )
+
+    async def refresh(
+        self,
+        indexer: Indexer,
+        embedder: Embedder,
+        changed: list[tuple] | None = None,
+        deleted_ids: list[str] | None = None,
+        previous_epoch: str | None = None,
+        n_context: int = 5,
+        full: bool = False,
+    ) -> int:
+        """Recompute contexts affected by an index update.
+
+        A subtopic is recomputed when it is new, when one of its context
+        chunks changed or was deleted, when a new/changed chunk of its topic
+        is at least as similar to its query as its weakest stored context
+        entry, or (with hybrid retrieval) when the keyword index document
+        frequency of one of its terms changed. Everything is recomputed when ``full`` is set, the
+        retrieval settings changed, or the map wasn't built from the index
+        state this update started from.
+
+        Args:
+            indexer: Updated index
+            embedder: Embedder for subtopic queries without stored vectors
+            changed: (chunk, embedding) pairs indexed in this update
+            deleted_ids: Chunk IDs deleted in this update
+            previous_epoch: Index epoch before this update
+            n_context: Context entries per subtopic
+            full: Recompute every subtopic
+
+        Returns:
+            Number of subtopics recomputed
+        """
+        changed = changed or []
+        config = self.current_config(n_context)
+        if config["embedding_model"] != self.config.get("embedding_model"):
+            self.query_vectors = {}
+        if full or config != self.config or self.epoch != previous_epoch:
+            self.entries = {}
+
+        requests = {
+            self.key(topic, subtopic): (topic, subtopic)
+            for topic, subtopics in SENIOR_IOS_TOPICS.items()
+            for subtopic in subtopics
+        }
+        self.entries = {k: v for k, v in self.entries.items() if k in requests}
+        self.query_vectors = {k: v for k, v in self.query_vectors.items() if k in requests}
+
+        stale = {key for key in requests if key not in self.entries}
+
+        touched = {chunk.id for chunk, _ in changed} | set(deleted_ids or [])
+        if touched:
+            stale |= {
+                key
+                for key, entry in self.entries.items()
+                if not touched.isdisjoint(entry.candidates)
+            }
+
+        if indexer.hybrid and indexer.lexical is not None:
+            stale |= {
+                key
+                for key, entry in self.entries.items()
+                if entry.terms != self._terms(indexer, requests[key][1])
+            }
+
+        # A new chunk matters if it would have made the candidate pool
+        remaining = [key for key in self.entries if key not in stale]
+        if changed and remaining:
+            similarity = indexer.similarities(
+                [self.query_vectors[key] for key in remaining],
+                [embedding for _, embedding in changed],
+            )
+            chunk_topics = np.array([chunk.topic for chunk, _ in changed], dtype=object)
+            for row, key in enumerate(remaining):
+                entry = self.entries[key]
+                relevant = (
+                    np.ones(len(changed), dtype=bool)
+                    if entry.crosses_topics
+                    else chunk_topics == entry.topic
+                )
+                if (similarity[row][relevant] >= entry.floor).any():
+                    stale.add(key)
+
+        if stale:
+            keys = sorted(stale)
+            missing = [key for key in keys if key not in self.query_vectors]
+            if missing:
+                vectors = await embedder.embed_queries(
+                    [query_text(*requests[key]) for key in missing]
+                )
+                for key, vector in zip(missing, vectors):
+                    self.query_vectors[key] = np.asarray(vector, dtype=np.float32)
+
+            items = [(requests[key], self.query_vectors[key].tolist()) for key in keys]
+            pools = search_candidates(indexer, items, n_context)
+            results = select_context(indexer, [e for _, e in items], pools, n_context)
+            for key, pool, result in zip(keys, pools, results):
+                entry = self._entry(requests[key][0], pool, result)
+                entry.terms = self._terms(indexer, requests[key][1])
+                self.entries[key] = entry
+
+        self.epoch = indexer.epoch
+        self.config = config
+        self.save()
+        logger.info(f"Context map: recomputed {len(stale)}/{len(requests)} subtopics")
+        return len(stale)
+
+    @staticmethod
+    def _terms(indexer: Indexer, subtopic: str) -> dict[str, int]:
+        """Document frequency of the subtopic's keyword query terms."""
+        if not indexer.hybrid or indexer.lexical is None:
+            return {}
+        return {
+            term: indexer.lexical.document_frequency(term)
+            for term in dict.fromkeys(tokenize(subtopic))
+        }
+
+    @staticmethod
+    def _entry(topic: str, pool: dict, result: dict) -> ContextEntry:
+        """Convert a candidate pool and the contexts chosen from it into an entry."""
+        contexts = []
+        for chunk_id, doc, meta, distance in zip(
+            result["ids"][0],
+            result["documents"][0],
+            result["metadatas"][0],
+            result["distances"][0],
+        ):
+            meta = meta or {}
+            contexts.append(
+                {
+                    "id": chunk_id,
+                    "members": meta.get("merged_ids", [chunk_id]),
+                    "score": round(1.0 - float(distance), 6),
+                    "hash": text_hash(doc),
+                }
+            )
+        return ContextEntry(
+            topic=topic,
+            contexts=contexts,
+            candidates=list(pool["ids"][0]),
+            floor=round(1.0 - max(pool["distances"][0], default=2.0), 6),
+            crosses_topics=any(
+                (meta or {}).get("topic", topic) != topic for meta in pool["metadatas"][0]
+            ),
+        )
+
+    def is_current(self, indexer: Indexer, n_context: int) -> bool:
+        """Whether the map matches the index and the retrieval settings."""
+        return (
+            bool(self.entries)
+            and self.epoch == indexer.epoch
+            and self.config == self.current_config(n_context)
+        )
+
+    def lookup(
+        self,
+        indexer: Indexer,
+        requests: list[tuple[str, str]],
+        n_context: int = 5,
+    ) -> list[dict | None]:
+        """Get precomputed contexts with one fetch by ID (blocking).
+
+        Args:
+            indexer: Index the map was built from
+            requests: (topic, subtopic) pairs
+            n_context: Context entries per subtopic
+
+        Returns:
+            One result dict per request (shaped like ``Indexer.query()``
+            output), or None where no valid precomputed context exists
+        """
+        if not self.is_current(indexer, n_context):
+            self.misses += len(requests)
+            return [None] * len(requests)
+
+        entries = [self.entries.get(self.key(topic, subtopic)) for topic, subtopic in requests]
+        wanted = list({m for entry in entries if entry for m in entry.chunk_ids})
+        found = (
+            indexer.store.get(ids=wanted, include=["documents", "metadatas"])
+            if wanted
+            else {"ids": [], "documents": [], "metadatas": []}
+        )
+        chunks = {
+            chunk_id: (doc, meta)
+            for chunk_id, doc, meta in zip(found["ids"], found["documents"], found["metadatas"])
+        }
+
+        results: list[dict | None] = []
+        for entry in entries:
+            result = self._rebuild(entry, chunks) if entry else None
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            results.append(result)
+        return results
+
+    @staticmethod
+    def _rebuild(entry: ContextEntry, chunks: dict[str, tuple[str, dict]]) -> dict | None:
+        """Reassemble an entry's context texts; None if any chunk changed."""
+        ids, documents, metadatas, distances = [], [], [], []
+        for context in entry.contexts:
+            members = context["members"]
+            if any(m not in chunks for m in members):
+                return None
+
+            if len(members) == 1:
+                text, meta = chunks[members[0]][0], dict(chunks[members[0]][1] or {})
+            else:
+                merged = collapse_adjacent(
+                    members,
+                    [chunks[m][0] for m in members],
+                    [chunks[m][1] for m in members],
+                    [0.0] * len(members),
+                )
+                if len(merged["ids"]) != 1:
+                    return None
+                text = merged["documents"][0]
+                meta = dict(chunks[context["id"]][1] or {})
+                meta["merged_ids"] = members
+
+            if text_hash(text) != context["hash"]:
+                return None
+            ids.append(context["id"])
+            documents.append(text)
+            metadatas.append(meta)
+            distances.append(1.0 - context["score"])
+
+        return {
+            "ids": [ids],
+            "documents": [documents],
+            "metadatas": [metadatas],
+            "distances": [distances],
+        }
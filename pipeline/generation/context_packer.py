@@ -0,0 +1,159 @@
+"""Token-budgeted packing of retrieved chunks into prompt context."""
+
+from dataclasses import dataclass, field
+
+import tiktoken
+
+from ..embeddings.mmr import overlap_length
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Between chunks in the prompt
+SEPARATOR = "\n\n---\n\n"
+
+# Sentence ends a chunk cut to fit the budget may stop at
+_SENTENCE_ENDS = (". ", ".\n", "! ", "? ")
+
+
+@dataclass
+class PackedContext:
+    """Context for one prompt and the chunks it was built from."""
+
+    text: str = ""
+    chunks: list[str] = field(default_factory=list)  # packed texts, best first
+    chunk_ids: list[str] = field(default_factory=list)  # every chunk with text in the context
+    source_urls: list[str] = field(default_factory=list)  # aligned with chunks
+    tokens: int = 0
+    dropped_ids: list[str] = field(default_factory=list)  # retrieved but over budget
+    trimmed_tokens: int = 0  # overlap with other packed chunks, not repeated
+
+
+class ContextPacker:
+    """Fills a token budget with retrieved chunks, in rank order.
+
+    Tokens are counted with the chunker's tokenizer (cl100k_base), so the
+    budget means the same thing at both ends of the pipeline. Text a chunk
+    shares with an already packed chunk of the same source (the overlap
+    between neighbouring chunks) is dropped instead of repeated. A chunk
+    that doesn't fit is cut at its last sentence end within the budget;
+    if that leaves too little, it is skipped and smaller chunks further
+    down the ranking still get their turn.
+    """
+
+    def __init__(self, budget: int = 2000, min_fragment: int = 64):
+        """Initialize packer.
+
+        Args:
+            budget: Maximum context tokens, separators included
+            min_fragment: Smallest cut chunk worth including, in tokens
+        """
+        self.budget = budget
+        self.min_fragment = min_fragment
+        self.encoder = tiktoken.get_encoding("cl100k_base")
+        self._separator_tokens = len(self.encoder.encode(SEPARATOR))
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text."""
+        return len(self.encoder.encode(text))
+
+    def pack(self, retrieved: dict) -> PackedContext:
+        """Pack a retrieval result into one context string.
+
+        Args:
+            retrieved: Query result dict (``retrieve()``) with ids, documents
+                and metadatas, best first
+
+        Returns:
+            PackedContext with the text and the IDs of the chunks it holds
+        """
+        ids = _first(retrieved.get("ids"))
+        docs = _first(retrieved.get("documents"))
+        metas = _first(retrieved.get("metadatas"))
+
+        packed = PackedContext()
+        by_source: dict[str, list[str]] = {}
+        for i, doc in enumerate(docs):
+            meta = metas[i] if i < len(metas) and isinstance(metas[i], dict) else {}
+            chunk_id = ids[i] if i < len(ids) else ""
+            members = meta.get("merged_ids") or ([chunk_id] if chunk_id else [])
+
+            text, trimmed = self._trim_overlap(doc, by_source.get(meta.get("source_id"), []))
+            if not text:
+                # Already in the context through an overlapping chunk
+                packed.trimmed_tokens += trimmed
+                packed.chunk_ids.extend(members)
+                continue
+
+            remaining = self.budget - packed.tokens
+            if packed.chunks:
+                remaining -= self._separator_tokens
+            tokens = self.count(text)
+            if tokens > remaining:
+                text, tokens = self._cut(text, remaining)
+                if not text:
+                    packed.dropped_ids.extend(members)
+                    continue
+
+            if packed.chunks:
+                packed.tokens += self._separator_tokens
+            packed.tokens += tokens
+            packed.trimmed_tokens += trimmed
+            packed.chunks.append(text)
+            packed.chunk_ids.extend(members)
+            packed.source_urls.append(meta.get("source_url", ""))
+            if "source_id" in meta:
+                by_source.setdefault(meta["source_id"], []).append(text)
+
+        packed.text = SEPARATOR.join(packed.chunks)
+        if packed.dropped_ids:
+            logger.debug(
+                f"Context budget {self.budget} tokens: packed {len(packed.chunks)} chunks, "
+                f"dropped {len(packed.dropped_ids)}"
+            )
+        return packed
+
+    def _trim_overlap(self, text: str, packed: list[str]) -> tuple[str, int]:
+        """Drop text already packed from the same source.
+
+        Returns:
+            Remaining text ("" if all of it is already packed) and the
+            number of tokens removed
+        """
+        original = text
+        for other in packed:
+            if text in other:
+                return "", self.count(original)
+            head = overlap_length(other, text)
+            if head:
+                text = text[head:].lstrip()
+            tail = overlap_length(text, other)
+            if tail:
+                text = text[: len(text) - tail].rstrip()
+        if text == original:
+            return text, 0
+        return text, self.count(original) - self.count(text)
+
+    def _cut(self, text: str, budget: int) -> tuple[str, int]:
+        """Cut text at the last sentence end within budget tokens.
+
+        Returns:
+            Cut text and its token count, or ("", 0) if less than
+            min_fragment tokens would remain
+        """
+        if budget < self.min_fragment:
+            return "", 0
+        head = self.encoder.decode(self.encoder.encode(text)[:budget])
+        end = max(head.rfind(sep) for sep in _SENTENCE_ENDS)
+        if end == -1:
+            return "", 0
+        cut = head[: end + 1].rstrip()
+        tokens = self.count(cut)
+        if not self.min_fragment <= tokens <= budget:
+            return "", 0
+        return cut, tokens
+
+
+def _first(values: list | None) -> list:
+    """Results of the first query in a query result field."""
+    return values[0] if values and values[0] else []
@@ -0,0 +1,193 @@
+"""Concurrent flashcard generation with bounded in-flight LLM calls."""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from ..config import get_settings
+from ..utils.logging import get_logger
+from .flashcard_generator import FlashcardGenerator
+from .models import GenerationResult
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CardOutcome:
+    """A finished generation task."""
+
+    topic: str
+    subtopic: str
+    result: GenerationResult | None
+    latency_ms: float
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.result is not None
+
+
+@dataclass
+class GenerationStats:
+    """Throughput and latency of one engine run."""
+
+    cards: int = 0
+    failures: int = 0
+    requests: int = 0  # LLM requests, including individual retries
+    elapsed_s: float = 0.0
+    latencies_ms: list[float] = field(default_factory=list)
+    rate_limit_wait_s: float = 0.0
+
+    @property
+    def cards_per_minute(self) -> float:
+        return self.cards / self.elapsed_s * 60 if self.elapsed_s else 0.0
+
+    @property
+    def cards_per_request(self) -> float:
+        return self.cards / self.requests if self.requests else 0.0
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        return float(np.percentile(np.asarray(self.latencies_ms), q))
+
+    def summary(self) -> dict:
+        return {
+            "cards": self.cards,
+            "failures": self.failures,
+            "elapsed_s": round(self.elapsed_s, 1),
+            "cards_per_minute": round(self.cards_per_minute, 1),
+            "cards_per_request": round(self.cards_per_request, 2),
+            "latency_p50_ms": round(self.percentile(50)),
+            "latency_p95_ms": round(self.percentile(95)),
+            "rate_limit_wait_s": round(self.rate_limit_wait_s, 1),
+        }
+
+
+class GenerationEngine:
+    """Runs subtopics as concurrent tasks and yields cards as they finish.
+
+    Subtopics of the same topic are grouped ``cards_per_request`` at a time
+    into one LLM request (see ``FlashcardGenerator.generate_many()``). At
+    most ``concurrency`` requests are in flight, counting the individual
+    retries of a failed batch: every provider call takes a slot of the
+    generator's ``llm_slots``. The LLM router's per-provider RPM/TPM
+    limiters pace each call within that bound, so no fixed sleep between
+    cards is needed.
+    """
+
+    def __init__(
+        self,
+        generator: FlashcardGenerator,
+        concurrency: int | None = None,
+        cards_per_request: int | None = None,
+    ):
+        """Initialize engine.
+
+        Args:
+            generator: Generator that runs each request
+            concurrency: Requests in flight (default: GENERATION_CONCURRENCY)
+            cards_per_request: Subtopics per request (default: CARDS_PER_REQUEST)
+        """
+        settings = get_settings()
+        self.generator = generator
+        self.concurrency = max(1, concurrency or settings.generation_concurrency)
+        self.cards_per_request = max(1, cards_per_request or settings.cards_per_request)
+        self.stats = GenerationStats()
+
+    def _groups(
+        self,
+        plan: list[tuple[str, str]],
+        contexts: list[dict | None],
+    ) -> list[tuple[str, list[str], list[dict | None]]]:
+        """Split the plan into per-topic requests of up to cards_per_request."""
+        by_topic: dict[str, list[tuple[str, dict | None]]] = {}
+        for (topic, subtopic), retrieved in zip(plan, contexts):
+            by_topic.setdefault(topic, []).append((subtopic, retrieved))
+
+        groups = []
+        size = self.cards_per_request
+        for topic, items in by_topic.items():
+            for i in range(0, len(items), size):
+                chunk = items[i : i + size]
+                groups.append((topic, [s for s, _ in chunk], [r for _, r in chunk]))
+        return groups
+
+    async def _run_group(
+        self,
+        semaphore: asyncio.Semaphore,
+        topic: str,
+        subtopics: list[str],
+        contexts: list[dict | None],
+    ) -> list[CardOutcome]:
+        async with semaphore:
+            start = time.perf_counter()
+            retrieved = None if any(c is None for c in contexts) else contexts
+            try:
+                results = await self.generator.generate_many(
+                    topic, subtopics, retrieved=retrieved
+                )
+            except Exception as e:
+                results = [e] * len(subtopics)
+            latency_ms = (time.perf_counter() - start) * 1000
+
+        outcomes = []
+        for subtopic, result in zip(subtopics, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed {topic}/{subtopic}: {result}")
+                outcomes.append(CardOutcome(topic, subtopic, None, latency_ms, str(result)))
+            else:
+                outcomes.append(CardOutcome(topic, subtopic, result, latency_ms))
+        return outcomes
+
+    async def as_completed(
+        self,
+        plan: list[tuple[str, str]],
+        contexts: list[dict] | None = None,
+    ) -> AsyncIterator[CardOutcome]:
+        """Generate every planned card, yielding outcomes in completion order.
+
+        Args:
+            plan: (topic, subtopic) pairs
+            contexts: Context prefetched with ``retrieve()``, aligned with
+                plan (None: each task retrieves its own)
+
+        Yields:
+            CardOutcome per subtopic (cards of one request arrive together);
+            failures carry the error instead of raising, so one bad card
+            doesn't stop the run
+        """
+        self.stats = GenerationStats()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        self.generator.llm_slots = asyncio.Semaphore(self.concurrency)
+        contexts = contexts or [None] * len(plan)
+        waited_before = self.generator.llm.waited_s
+        requests_before = self.generator.llm_requests
+        start = time.perf_counter()
+
+        tasks = [
+            asyncio.ensure_future(self._run_group(semaphore, topic, subtopics, group_contexts))
+            for topic, subtopics, group_contexts in self._groups(plan, contexts)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for outcome in await next_done:
+                    if outcome.ok:
+                        self.stats.cards += 1
+                        self.stats.latencies_ms.append(outcome.latency_ms)
+                    else:
+                        self.stats.failures += 1
+                    self.stats.elapsed_s = time.perf_counter() - start
+                    self.stats.requests = self.generator.llm_requests - requests_before
+                    yield outcome
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.stats.elapsed_s = time.perf_counter() - start
+            self.stats.rate_limit_wait_s = self.generator.llm.waited_s - waited_before
+            self.stats.requests = self.generator.llm_requests - requests_before
+
+        logger.info(f"Generation finished: {self.stats.summary()}")
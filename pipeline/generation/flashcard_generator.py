@@ -1,204 +1,471 @@
 """Flashcard generation using RAG with Gemini."""
 
 import asyncio
-import hashlib
 import json
-import re
+import warnings
 from datetime import datetime, timezone
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
 
 from ..clients.gemini_client import GeminiClient
+from ..clients.router import LLMRouter
+from ..clients.structured import parse_structured
+from ..config import get_settings
 from ..embeddings.embedder import Embedder
 from ..embeddings.indexer import Indexer
+from ..stores.async_store import AsyncVectorStore
 from ..utils.logging import get_logger
-from .models import Flashcard, GenerationResult
-from .prompts import FLASHCARD_SYSTEM_PROMPT, FLASHCARD_USER_PROMPT
+from .context_map import ContextMap, query_text, search_context
+from .context_packer import ContextPacker, PackedContext
+from .models import (
+    LLM_CARD_FIELDS,
+    Flashcard,
+    FlashcardDraft,
+    GenerationResult,
+    KeyedFlashcardDraft,
+    card_id,
+)
+from .published_index import AlreadyPublished, PublishedIndex
+from .prompts import (
+    FLASHCARD_BATCH_SECTION,
+    FLASHCARD_BATCH_USER_PROMPT,
+    FLASHCARD_SYSTEM_PROMPT,
+    FLASHCARD_TOPIC_CONTEXT,
+    FLASHCARD_USER_PROMPT,
+)
+from .stream_parser import IncrementalParser, MalformedOutput
 
 logger = get_logger(__name__)
 
+# Chunks retrieved for a topic's background context, before packing
+_TOPIC_CONTEXT_CHUNKS = 12
+
 
 class FlashcardGenerator:
     """Generates flashcards using RAG: retrieve context then generate."""
 
     def __init__(self):
+        settings = get_settings()
         self.gemini = GeminiClient()
         self.embedder = Embedder()
         self.indexer = Indexer()
 
+        # Index work runs off the event loop so LLM calls keep overlapping
+        self.vector_io = AsyncVectorStore(
+            self.indexer.store,
+            max_workers=settings.vector_store_workers,
+            batch_window=settings.vector_batch_window_ms / 1000,
+        )
+        self.context_map = ContextMap.load(self.indexer.sidecar_dir / "context_map")
+        self.packer = ContextPacker(budget=settings.context_tokens)
+
+        # Background on each topic, sent after the system prompt in every
+        # request of the topic. The system prompt alone is far below the
+        # providers' minimum cache size, so this is what makes the stable
+        # prefix large enough for Gemini's explicit context cache
+        self.topic_packer = None
+        if settings.topic_context_tokens > 0:
+            self.topic_packer = ContextPacker(budget=settings.topic_context_tokens)
+        self._topic_contexts: dict[str, asyncio.Future] = {}
+
+        # Subtopics whose card is already in the app cost no embedding or
+        # LLM call unless force_refresh is set. force_refresh only skips this
+        # check; set LLM_CACHE_REFRESH too (run_generate does) so the LLM is
+        # asked again instead of answering from the response cache
+        self.published = PublishedIndex.from_settings()
+        self.force_refresh = False
+
+        # Shared by every concurrent generate() call; the router holds each
+        # provider's RPM/TPM limiter, llm_slots bounds the calls in flight
+        # (GenerationEngine replaces it with its own concurrency)
+        self.max_tokens = settings.max_tokens
+        self.llm_requests = 0
+        self.llm_slots = asyncio.Semaphore(max(1, settings.generation_concurrency))
+        self.llm = LLMRouter.from_settings(gemini=self.gemini)
+        self.stream = settings.llm_stream
+        self.stream_retries = settings.stream_retries
+        self.stream_aborts = 0
+
+    async def retrieve(
+        self,
+        requests: list[tuple[str, str]],
+        n_context: int = 5,
+    ) -> list[dict]:
+        """Retrieve context for many subtopics with one embed and one search call.
+
+        Contexts precomputed by the embed stage (see ``ContextMap``) are
+        looked up by chunk ID, with no embedding call and no vector search.
+        Subtopics without a valid precomputed context are searched live:
+        each query is filtered to its topic; queries that match nothing are
+        retried together without the filter. Vector hits are fused with BM25
+        keyword hits on the subtopic, so chunks naming an exact identifier
+        (``@Observable``, ``AsyncStream``) are not missed. Extra candidates
+        are fetched and reranked with MMR, and overlapping neighbouring
+        chunks are merged, so the context repeats less text. All index work
+        runs on the vector store thread pool, never on the event loop.
+
+        Subtopics whose card is already published get an empty result
+        without being looked up, unless ``force_refresh`` is set.
+
+        Args:
+            requests: (topic, subtopic) pairs
+            n_context: Number of context chunks per subtopic
+
+        Returns:
+            One query result dict per request, in input order
+        """
+        if not self.force_refresh:
+            todo = [i for i, request in enumerate(requests) if not self._published(*request)]
+            if len(todo) < len(requests):
+                results = [{"ids": [[]], "documents": [[]], "metadatas": [[]]} for _ in requests]
+                found = await self._retrieve([requests[i] for i in todo], n_context)
+                for i, result in zip(todo, found):
+                    results[i] = result
+                return results
+        return await self._retrieve(requests, n_context)
+
+    async def _retrieve(self, requests: list[tuple[str, str]], n_context: int) -> list[dict]:
+        if not requests:
+            return []
+
+        results = await self.vector_io.run(
+            self.context_map.lookup, self.indexer, requests, n_context
+        )
+        misses = [i for i, result in enumerate(results) if result is None]
+        if not misses:
+            return results
+
+        queries = [query_text(*requests[i]) for i in misses]
+        embeddings = await self.embedder.embed_queries(queries)
+
+        # Concurrent retrieve() calls within the batch window share one search
+        found = await self.vector_io.batched(
+            ("retrieve", n_context),
+            [(requests[i], embedding) for i, embedding in zip(misses, embeddings)],
+            lambda items: search_context(self.indexer, items, n_context),
+        )
+        for i, result in zip(misses, found):
+            results[i] = result
+        return results
+
+    async def topic_context(self, topic: str) -> str:
+        """Background context shared by every request of a topic.
+
+        Retrieved and packed once per topic, so every request of the topic
+        sends the same text after the system prompt and the provider can
+        serve the whole prefix from its context cache.
+
+        Returns:
+            The topic's background section ("" if disabled or nothing was found)
+        """
+        if self.topic_packer is None:
+            return ""
+        future = self._topic_contexts.get(topic)
+        if future is None:
+            future = asyncio.ensure_future(self._topic_background(topic))
+            self._topic_contexts[topic] = future
+        try:
+            # Shielded: a cancelled card mustn't cancel the topic's other cards' wait
+            return await asyncio.shield(future)
+        except Exception as e:
+            logger.warning(f"No background context for {topic}: {e}")
+            self._topic_contexts.pop(topic, None)
+            return ""
+
+    async def _topic_background(self, topic: str) -> str:
+        retrieved = (await self._retrieve([(topic, topic)], _TOPIC_CONTEXT_CHUNKS))[0]
+        context = self.topic_packer.pack(retrieved)
+        if not context.text:
+            return ""
+        return FLASHCARD_TOPIC_CONTEXT.format(topic=topic, context=context.text)
+
     async def generate(
         self,
         topic: str,
         subtopic: str,
         n_context: int = 5,
+        retrieved: dict | None = None,
     ) -> GenerationResult:
         """Generate a single flashcard.
 
+        With LLM_STREAM on, the card is streamed and checked field by field;
+        output that can't become a valid card (prose, an overlong field) is
+        abandoned mid-stream and requested again right away.
+
         Args:
             topic: Main topic (swift, concurrency, etc.)
             subtopic: Specific subtopic for the flashcard
             n_context: Number of context chunks to retrieve
+            retrieved: Context prefetched with ``retrieve()`` (skips retrieval)
 
         Returns:
             GenerationResult with flashcard and metadata
+
+        Raises:
+            AlreadyPublished: If the card is already in the app and
+                force_refresh is off
         """
+        if self._published(topic, subtopic):
+            raise AlreadyPublished(f"{card_id(topic, subtopic)} ({topic}/{subtopic})")
         start_time = datetime.now(timezone.utc)
 
-        # 1. Get query embedding
-        query = f"{topic} {subtopic} iOS interview"
-        query_embedding = await self.embedder.embed_query(query)
+        # 1-2. Retrieve relevant context (topic filter with unfiltered fallback)
+        if retrieved is None:
+            retrieved = (await self.retrieve([(topic, subtopic)], n_context))[0]
+        context = self.packer.pack(retrieved)
+        shared = await self.topic_context(topic)
 
-        # 2. Retrieve relevant context from ChromaDB
-        # Try with topic filter first, fallback to no filter
-        results = self.indexer.query(query_embedding, topic=topic, n_results=n_context)
+        # 3. Generate flashcard with Gemini
+        topic_str = f"{topic}: {subtopic}"
+        user_prompt = FLASHCARD_USER_PROMPT.format(
+            topic=topic_str,
+            context=context.text
+        )
+        if self.stream:
+            # 4. Validated field by field while streaming
+            draft = await self._stream_card(user_prompt, self.max_tokens, shared)
+        else:
+            response = await self._complete(
+                user_prompt, self.max_tokens, FlashcardDraft, shared
+            )
+            # 4. Validate the schema-constrained response
+            draft = parse_structured(FlashcardDraft, response)
 
-        docs = results.get("documents", [[]])
-        metas = results.get("metadatas", [[]])
+        # 5. Create flashcard
+        elapsed_ms = int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000)
+        return self._build_result(topic, subtopic, draft, context, elapsed_ms)
 
-        # Handle empty results - try without topic filter
-        if not docs or not docs[0]:
-            results = self.indexer.query(query_embedding, topic=None, n_results=n_context)
-            docs = results.get("documents", [[]])
-            metas = results.get("metadatas", [[]])
+    async def generate_many(
+        self,
+        topic: str,
+        subtopics: list[str],
+        n_context: int = 5,
+        retrieved: list[dict] | None = None,
+    ) -> list[GenerationResult | Exception]:
+        """Generate flashcards for several subtopics of one topic in one request.
 
-        context_chunks = docs[0] if docs and docs[0] else []
-        metadatas = metas[0] if metas and metas[0] else []
-        source_urls = [
-            m.get("source_url", "") if isinstance(m, dict) else ""
-            for m in metadatas
-        ]
+        Every subtopic goes into the prompt under a short key with its own
+        context, and the model returns a JSON array of cards tagged with
+        those keys. Subtopics whose card is missing or unusable are retried
+        individually with ``generate()``.
 
-        context_text = "\n\n---\n\n".join(context_chunks)
+        Args:
+            topic: Main topic shared by the subtopics
+            subtopics: Subtopics to generate cards for
+            n_context: Number of context chunks per subtopic
+            retrieved: Contexts prefetched with ``retrieve()``, aligned with
+                subtopics (skips retrieval)
 
-        # 3. Generate flashcard with Gemini
-        topic_str = f"{topic}: {subtopic}"
-        user_prompt = FLASHCARD_USER_PROMPT.format(
-            topic=topic_str,
-            context=context_text[:8000]
+        Returns:
+            One GenerationResult per subtopic, in input order, or the
+            exception that made its individual retry fail (AlreadyPublished
+            for cards already in the app)
+        """
+        todo = [i for i, subtopic in enumerate(subtopics) if not self._published(topic, subtopic)]
+        if len(todo) < len(subtopics):
+            outcomes: list[GenerationResult | Exception] = [
+                AlreadyPublished(f"{card_id(topic, s)} ({topic}/{s})") for s in subtopics
+            ]
+            if todo:
+                generated = await self.generate_many(
+                    topic,
+                    [subtopics[i] for i in todo],
+                    n_context,
+                    [retrieved[i] for i in todo] if retrieved else None,
+                )
+                for i, result in zip(todo, generated):
+                    outcomes[i] = result
+            return outcomes
+
+        if len(subtopics) == 1:
+            results = await asyncio.gather(
+                self.generate(
+                    topic, subtopics[0], n_context, retrieved[0] if retrieved else None
+                ),
+                return_exceptions=True,
+            )
+            return list(results)
+
+        start_time = datetime.now(timezone.utc)
+        if retrieved is None:
+            retrieved = await self.retrieve([(topic, s) for s in subtopics], n_context)
+        contexts = [self.packer.pack(r) for r in retrieved]
+        shared = await self.topic_context(topic)
+
+        keys = [f"c{i + 1}" for i in range(len(subtopics))]
+        sections = "\n\n".join(
+            FLASHCARD_BATCH_SECTION.format(key=key, subtopic=subtopic, context=context.text)
+            for key, subtopic, context in zip(keys, subtopics, contexts)
+        )
+        user_prompt = FLASHCARD_BATCH_USER_PROMPT.format(
+            count=len(subtopics), topic=topic, sections=sections, first_key=keys[0]
         )
-        prompt = f"{FLASHCARD_SYSTEM_PROMPT}\n\n{user_prompt}"
 
-        response = await self.gemini.generate(prompt)
+        cards: dict[str, BaseModel] = {}
+        try:
+            response = await self._complete(
+                user_prompt, self.max_tokens * len(subtopics), list[KeyedFlashcardDraft], shared
+            )
+            cards = self._parse_cards(response)
+        except Exception as e:
+            logger.warning(f"Batch of {len(subtopics)} {topic} cards failed: {e}")
+        elapsed_ms = int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000)
 
-        # 4. Parse JSON response
-        data = self._parse_json_response(response)
+        results: list[GenerationResult | Exception | None] = []
+        for key, subtopic, context in zip(keys, subtopics, contexts):
+            draft = cards.get(key)
+            results.append(
+                self._build_result(topic, subtopic, draft, context, elapsed_ms)
+                if draft is not None
+                else None
+            )
+
+        retry = [i for i, result in enumerate(results) if result is None]
+        if retry:
+            logger.info(
+                f"Batch returned {len(subtopics) - len(retry)}/{len(subtopics)} "
+                f"{topic} cards; retrying {len(retry)} individually"
+            )
+            retried = await asyncio.gather(
+                *(
+                    self.generate(topic, subtopics[i], n_context, retrieved[i])
+                    for i in retry
+                ),
+                return_exceptions=True,
+            )
+            for i, result in zip(retry, retried):
+                results[i] = result
+        return results
 
-        # 5. Create flashcard
-        card_id = hashlib.md5(f"{topic}_{subtopic}".encode()).hexdigest()[:12]
+    def _published(self, topic: str, subtopic: str) -> bool:
+        return not self.force_refresh and self.published.is_published(topic, subtopic)
 
+    async def _complete(self, prompt: str, max_tokens: int, schema: Any, shared: str = "") -> str:
+        """Call the LLM through the router, constrained to a schema.
+
+        The system prompt and the topic's background (``shared``) are sent
+        as the stable prefix of every request, so the provider can serve
+        them from its context cache.
+        """
+        async with self.llm_slots:
+            self.llm_requests += 1
+            return await self.llm.generate(
+                prompt,
+                max_tokens=max_tokens,
+                schema=schema,
+                system=FLASHCARD_SYSTEM_PROMPT,
+                shared=shared,
+            )
+
+    async def _stream_card(self, prompt: str, max_tokens: int, shared: str = "") -> BaseModel:
+        """Stream one card, aborting and retrying as soon as it can't be valid.
+
+        Raises:
+            MalformedOutput: If every attempt produced unusable output
+        """
+        error: MalformedOutput | None = None
+        for attempt in range(1 + self.stream_retries):
+            async with self.llm_slots:
+                parser = IncrementalParser(FlashcardDraft)
+                self.llm_requests += 1
+                stream = self.llm.stream(
+                    prompt,
+                    max_tokens=max_tokens,
+                    schema=FlashcardDraft,
+                    system=FLASHCARD_SYSTEM_PROMPT,
+                    shared=shared,
+                )
+                try:
+                    async for delta in stream:
+                        parser.feed(delta)
+                    return parser.finish()
+                except MalformedOutput as e:
+                    self.stream_aborts += 1
+                    logger.warning(
+                        f"Aborted card stream after {len(parser.text)} chars "
+                        f"(attempt {attempt + 1}): {e}"
+                    )
+                    error = e
+                finally:
+                    # Closing the stream cancels the provider call; partial output isn't cached
+                    await stream.aclose()
+        raise error
+
+    @staticmethod
+    def _build_result(
+        topic: str,
+        subtopic: str,
+        draft: BaseModel,
+        context: PackedContext,
+        elapsed_ms: int,
+    ) -> GenerationResult:
+        """Create a flashcard from validated model output."""
+        fields = draft.model_dump(include=set(LLM_CARD_FIELDS))
         flashcard = Flashcard(
-            id=f"{topic}_{card_id}",
-            front=data.get("front", subtopic),
-            back=data.get("back", ""),
+            id=card_id(topic, subtopic),
             topic=topic,
-            tags=data.get("tags", [subtopic]),
-            sources=list(set(url for url in source_urls if url)),
-            swift_version=data.get("swift_version"),
-            confidence=float(data.get("confidence", 0.8)),
+            sources=list(set(url for url in context.source_urls if url)),
+            **{**fields, "tags": fields["tags"] or [subtopic]},
         )
 
-        elapsed_ms = int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000)
-
         logger.info(f"Generated: {flashcard.front[:50]}... ({elapsed_ms}ms)")
 
         return GenerationResult(
             flashcard=flashcard,
-            raw_context=context_chunks,
+            raw_context=context.chunks,
+            context_ids=context.chunk_ids,
             generation_time_ms=elapsed_ms,
             verification_passed=False,
         )
 
-    def _parse_json_response(self, response: str) -> dict:
-        """Parse JSON from LLM response, handling markdown code blocks."""
-        result = None
+    @staticmethod
+    def _parse_cards(response: str) -> dict[str, BaseModel]:
+        """Validate a multi-card response item by item.
 
-        # Try direct parse
-        try:
-            result = json.loads(response)
-        except json.JSONDecodeError:
-            pass
-
-        # Try extracting from code block (greedy to get full content)
-        if result is None and "```" in response:
-            # Try json code block first
-            match = re.search(r"```json\s*(\{.*\})\s*```", response, re.DOTALL)
-            if not match:
-                # Try generic code block
-                match = re.search(r"```\s*(\{.*\})\s*```", response, re.DOTALL)
-            if match:
-                try:
-                    result = json.loads(match.group(1))
-                except json.JSONDecodeError:
-                    pass
-
-        # Try extracting JSON object - find matching braces (handle strings)
-        if result is None:
-            start = response.find("{")
-            if start != -1:
-                depth = 0
-                end = start
-                in_string = False
-                escape = False
-                for i, char in enumerate(response[start:], start):
-                    if escape:
-                        escape = False
-                        continue
-                    if char == "\\":
-                        escape = True
-                        continue
-                    if char == '"':
-                        in_string = not in_string
-                        continue
-                    if not in_string:
-                        if char == "{":
-                            depth += 1
-                        elif char == "}":
-                            depth -= 1
-                            if depth == 0:
-                                end = i + 1
-                                break
-                if end > start:
-                    try:
-                        result = json.loads(response[start:end])
-                    except json.JSONDecodeError:
-                        pass
-
-        # Handle list response - take first item
-        if isinstance(result, list) and result:
-            result = result[0]
-
-        if not isinstance(result, dict):
-            logger.warning(f"Failed to parse JSON: {response[:200]}")
-            return {}
-
-        return result
+        Returns:
+            Cards by subtopic key; items that fail validation are dropped
+            (and retried individually by the caller)
+        """
+        cards = {}
+        for item in json.loads(response):
+            try:
+                card = KeyedFlashcardDraft.model_validate(item)
+            except ValidationError as e:
+                logger.warning(f"Dropping invalid card in batch response: {e}")
+                continue
+            cards[card.key] = card
+        return cards
 
     async def generate_batch(
         self,
         topic: str,
         subtopics: list[str],
-        delay: float = 1.0,
+        delay: float | None = None,
     ) -> list[GenerationResult]:
-        """Generate flashcards for multiple subtopics.
+        """Generate flashcards for multiple subtopics concurrently.
 
         Args:
             topic: Main topic
             subtopics: List of subtopics
-            delay: Seconds between requests (rate limiting)
+            delay: Deprecated and ignored; requests are paced by the
+                LLM_RPM/LLM_TPM limiters instead of a fixed sleep
 
         Returns:
-            List of generation results
+            Generation results in completion order (failures are logged)
         """
-        results = []
+        from .engine import GenerationEngine
 
-        for i, subtopic in enumerate(subtopics):
-            try:
-                logger.info(f"Generating [{i+1}/{len(subtopics)}]: {topic}/{subtopic}")
-                result = await self.generate(topic, subtopic)
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Failed {topic}/{subtopic}: {e}")
+        _warn_delay(delay)
 
-            if i < len(subtopics) - 1:
-                await asyncio.sleep(delay)
+        plan = [(topic, subtopic) for subtopic in subtopics]
+        contexts = await self.retrieve(plan)
+        engine = GenerationEngine(self)
+        results = [
+            outcome.result
+            async for outcome in engine.as_completed(plan, contexts)
+            if outcome.result is not None
+        ]
 
         logger.info(f"Generated {len(results)}/{len(subtopics)} flashcards for {topic}")
         return results
@@ -206,24 +473,39 @@ class FlashcardGenerator:
     async def generate_all_topics(
         self,
         topics: dict[str, list[str]],
-        delay: float = 1.0,
+        delay: float | None = None,
     ) -> dict[str, list[GenerationResult]]:
-        """Generate flashcards for all topics.
+        """Generate flashcards for all topics, all subtopics in flight together.
 
         Args:
             topics: Dict mapping topic -> list of subtopics
-            delay: Seconds between requests
+            delay: Deprecated and ignored (see ``generate_batch()``)
 
         Returns:
             Dict mapping topic -> list of results
         """
-        all_results = {}
+        from .engine import GenerationEngine
+
+        _warn_delay(delay)
 
-        for topic, subtopics in topics.items():
-            logger.info(f"Starting topic: {topic} ({len(subtopics)} subtopics)")
-            results = await self.generate_batch(topic, subtopics, delay)
-            all_results[topic] = results
+        plan = [(topic, subtopic) for topic, subtopics in topics.items() for subtopic in subtopics]
+        contexts = await self.retrieve(plan)
+        all_results: dict[str, list[GenerationResult]] = {topic: [] for topic in topics}
+
+        engine = GenerationEngine(self)
+        async for outcome in engine.as_completed(plan, contexts):
+            if outcome.result is not None:
+                all_results[outcome.topic].append(outcome.result)
 
         total = sum(len(r) for r in all_results.values())
-        logger.info(f"Total generated: {total} flashcards")
+        logger.info(f"Total generated: {total} flashcards ({engine.stats.summary()})")
         return all_results
+
+
+def _warn_delay(delay: float | None) -> None:
+    if delay is not None:
+        warnings.warn(
+            "delay is ignored: generation is paced by the LLM_RPM/LLM_TPM limiters",
+            DeprecationWarning,
+            stacklevel=3,
+        )
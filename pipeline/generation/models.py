@@ -1,8 +1,9 @@
 """Data models for flashcard generation."""
 
+import hashlib
 from datetime import datetime, timezone
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, create_model
 
 
 class Flashcard(BaseModel):
@@ -26,13 +27,49 @@ class Flashcard(BaseModel):
         return f"[{self.topic}] {self.front[:50]}..."
 
 
+def card_id(topic: str, subtopic: str) -> str:
+    """Deterministic ID of the card generated for a subtopic."""
+    return f"{topic}_{hashlib.md5(f'{topic}_{subtopic}'.encode()).hexdigest()[:12]}"
+
+
 class GenerationResult(BaseModel):
     """Result of flashcard generation including context."""
 
     flashcard: Flashcard
     raw_context: list[str] = Field(default_factory=list)
+    context_ids: list[str] = Field(default_factory=list)  # chunks packed into the prompt
     generation_time_ms: int = 0
     verification_passed: bool = False
 
     def __str__(self) -> str:
         return f"{self.flashcard} ({self.generation_time_ms}ms)"
+
+
+# Flashcard fields the LLM writes; the rest (id, topic, sources, ...) are set by the pipeline
+LLM_CARD_FIELDS = ("front", "summary", "back", "tags", "swift_version", "confidence")
+
+# Response schema for one generated card, with the constraints of Flashcard
+FlashcardDraft = create_model(
+    "FlashcardDraft",
+    **{
+        name: (Flashcard.model_fields[name].annotation, Flashcard.model_fields[name])
+        for name in LLM_CARD_FIELDS
+    },
+)
+
+# Card in a multi-card response, tagged with its subtopic key
+KeyedFlashcardDraft = create_model(
+    "KeyedFlashcardDraft",
+    __base__=FlashcardDraft,
+    key=(str, Field(description="Key of the subtopic this card is for")),
+)
+
+
+class CodeVerification(BaseModel):
+    """LLM review of a Swift code example."""
+
+    compiles: bool = False
+    modern: bool = False
+    correct: bool = False
+    issues: list[str] = Field(default_factory=list)
+    fixed_code: str | None = None
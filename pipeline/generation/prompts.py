@@ -42,6 +42,31 @@ REQUIREMENTS:
 
 Output JSON only, no explanation."""
 
+FLASHCARD_BATCH_USER_PROMPT = """Create one comprehensive Senior iOS interview flashcard for EACH of the {count} subtopics of {topic} below. Each subtopic has its own documentation context; base each card on its own context.
+
+{sections}
+
+REQUIREMENTS (for every card):
+- Question should test deep understanding (not simple recall)
+- Summary: 1-2 sentences that directly answer the question (max 150 chars)
+- Back: Detailed answer (800-1500 chars) including:
+  * Clear explanation of the concept
+  * Code example demonstrating usage
+  * Common mistakes to avoid
+  * Comparison with alternatives if applicable
+- Write as a Senior dev would explain in an interview
+- Include Swift version if feature is version-specific
+- Confidence = how sure you are this is accurate (0.0-1.0)
+
+Output a JSON array only, no explanation: one object per subtopic in the OUTPUT FORMAT above, plus a "key" field holding the subtopic's key (e.g. "{first_key}")."""
+
+FLASHCARD_TOPIC_CONTEXT = """BACKGROUND DOCUMENTATION ON {topic} (shared by every card of this topic; the context given with each card takes precedence):
+{context}"""
+
+FLASHCARD_BATCH_SECTION = """=== [{key}] {subtopic} ===
+CONTEXT FROM DOCUMENTATION:
+{context}"""
+
 CODE_EXAMPLE_PROMPT = """Generate a minimal, compilable Swift code example demonstrating:
 
 Topic: {topic}
@@ -0,0 +1,174 @@
+"""Index of the cards already published in the app's flashcard files."""
+
+import json
+import os
+import re
+import unicodedata
+from pathlib import Path
+
+from ..config import get_settings
+from ..utils.logging import get_logger
+from .models import card_id
+
+logger = get_logger(__name__)
+
+# Typographic characters the workflow's merge step folds before comparing fronts
+_FRONT_REPLACEMENTS = {
+    "\u2018": "'",  # left single quote
+    "\u2019": "'",  # right single quote (apostrophe)
+    "\u201c": '"',  # left double quote
+    "\u201d": '"',  # right double quote
+    "\u2013": "-",  # en dash
+    "\u2014": "-",  # em dash
+}
+
+_INDEX_VERSION = 1
+
+
+class AlreadyPublished(Exception):
+    """Raised instead of generating a card the app already has."""
+
+
+def normalize_front(text: str) -> str:
+    """Front text as the workflow's merge step compares it.
+
+    Smart quotes and dashes become ASCII, then NFC, stripped, lowercased.
+    """
+    for old, new in _FRONT_REPLACEMENTS.items():
+        text = text.replace(old, new)
+    return unicodedata.normalize("NFC", text).strip().lower()
+
+
+def _tag(value) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", str(value).lower()).strip()
+
+
+class PublishedIndex:
+    """Card IDs, normalized fronts and tags of every published card.
+
+    Built from ``src/data/flashcards/*.json`` and kept on disk next to the
+    other pipeline state. Each file's entry is keyed by its size and mtime,
+    so a run re-reads only the flashcard files that changed since the index
+    was written; with nothing changed, loading is one small JSON read.
+
+    Cards are attributed to the generator topic in their ID prefix
+    (``swift_…`` in swift-fundamentals.json counts for "swift"), which
+    survives the workflow's merge into the hand-written files.
+    """
+
+    def __init__(self, directory: str | Path, path: str | Path | None = None):
+        """Load the index, refreshing entries of changed flashcard files.
+
+        Args:
+            directory: Directory of the app's flashcard JSON files
+            path: On-disk index (None = build in memory only)
+        """
+        self.directory = Path(directory)
+        self.path = Path(path) if path else None
+        self.files: dict[str, dict] = {}
+        self.rescanned = 0
+        self._load()
+        self.refresh()
+
+    @classmethod
+    def from_settings(cls) -> "PublishedIndex":
+        """Index of FLASHCARDS_DIR stored at PUBLISHED_INDEX_PATH."""
+        settings = get_settings()
+        return cls(settings.flashcards_dir, settings.published_index_path)
+
+    def refresh(self) -> None:
+        """Re-read flashcard files added or changed since the last refresh."""
+        seen = set()
+        changed = False
+        for file in sorted(self.directory.glob("*.json")):
+            stat = file.stat()
+            seen.add(file.name)
+            entry = self.files.get(file.name)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                continue
+            self.files[file.name] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "cards": self._read(file),
+            }
+            self.rescanned += 1
+            changed = True
+        for name in set(self.files) - seen:
+            del self.files[name]
+            changed = True
+
+        self._build()
+        if changed:
+            self.save()
+            logger.debug(f"Published index: re-read {self.rescanned} flashcard files")
+
+    def is_published(self, topic: str, subtopic: str) -> bool:
+        """Whether the card generated for a subtopic is already in the app."""
+        return card_id(topic, subtopic) in self.ids
+
+    def has_front(self, front: str) -> bool:
+        """Whether a published card asks the same question."""
+        return normalize_front(front) in self.fronts
+
+    def topic_cards(self, topic: str) -> int:
+        return len(self.tags.get(topic, []))
+
+    def subtopic_cards(self, topic: str, subtopic: str) -> int:
+        """Cards of a topic tagged with part of the subtopic's name."""
+        name = f" {_tag(subtopic)} "
+        return sum(
+            1
+            for tags in self.tags.get(topic, [])
+            if any(tag != topic and f" {tag} " in name for tag in tags)
+        ) + self.is_published(topic, subtopic)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"version": _INDEX_VERSION, "files": self.files}, f)
+        os.replace(tmp, self.path)
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Rebuilding unreadable published index {self.path}: {e}")
+            return
+        if data.get("version") == _INDEX_VERSION:
+            self.files = data.get("files", {})
+
+    def _build(self) -> None:
+        self.ids: set[str] = set()
+        self.fronts: set[str] = set()
+        self.tags: dict[str, list[list[str]]] = {}  # topic -> tags per card
+        for entry in self.files.values():
+            for cid, front, tags in entry["cards"]:
+                self.ids.add(cid)
+                if front:
+                    self.fronts.add(front)
+                self.tags.setdefault(cid.rsplit("_", 1)[0], []).append(tags)
+
+    @staticmethod
+    def _read(file: Path) -> list[list]:
+        """(id, normalized front, tags) of every card in a flashcard file."""
+        try:
+            with open(file) as f:
+                cards = json.load(f).get("cards", [])
+        except (OSError, json.JSONDecodeError, AttributeError) as e:
+            logger.warning(f"Skipping unreadable flashcard file {file}: {e}")
+            return []
+        return [
+            [
+                card["id"],
+                normalize_front(card.get("front") or ""),
+                sorted({_tag(t) for t in card.get("tags", [])}),
+            ]
+            for card in cards
+            if isinstance(card, dict) and isinstance(card.get("id"), str)
+        ]
@@ -0,0 +1,150 @@
+"""Quota-aware planning of which subtopics a generation run covers."""
+
+import math
+from dataclasses import dataclass, field
+
+from ..clients.usage_ledger import UsageLedger
+from ..config import get_settings
+from ..utils.logging import get_logger
+from ..utils.rate_limiter import estimate_tokens
+from .prompts import FLASHCARD_SYSTEM_PROMPT
+from .published_index import PublishedIndex
+
+logger = get_logger(__name__)
+
+# Rough output tokens of one card, until the ledger has real averages
+_CARD_OUTPUT_TOKENS = 500
+
+
+@dataclass
+class RunPlan:
+    """Subtopics chosen for one run and what they are expected to cost."""
+
+    plan: list[tuple[str, str]] = field(default_factory=list)
+    requests: int = 0
+    tokens: int = 0
+    skipped_existing: int = 0  # already published, not refreshed
+    skipped_quota: int = 0  # left for a later day
+    remaining_requests: int | None = None  # None = no daily limit
+    remaining_tokens: int | None = None
+
+
+class QuotaScheduler:
+    """Plans a run to fit what is left of the day's LLM quota.
+
+    Subtopics with the fewest published cards go first: those with no
+    card of their own, then those whose topic tags cover them least, then
+    those of the thinnest topics. Subtopics whose card is already
+    published are skipped unless ``refresh`` is set. Requests are costed
+    the way the engine groups them, ``cards_per_request`` subtopics of one
+    topic each, so a subtopic that fills a free slot in an already counted
+    request costs no extra request. Token costs are the ledger's average
+    per request, or an estimate from the prompt sizes before there is
+    history. Retries and hedged duplicates aren't planned; the clients
+    hold every request against the ledger when it's sent and refuse it
+    with ``QuotaExhausted`` once the day's quota is used up.
+    """
+
+    def __init__(
+        self,
+        ledger: UsageLedger | None = None,
+        published: PublishedIndex | None = None,
+        daily_requests: int | None = None,
+        daily_tokens: int | None = None,
+        cards_per_request: int | None = None,
+    ):
+        """Initialize scheduler.
+
+        Args:
+            ledger: Usage so far (default: the shared USAGE_LEDGER_PATH ledger)
+            published: Published cards (default: index of FLASHCARDS_DIR)
+            daily_requests: Requests per day (default: LLM_DAILY_REQUESTS; 0 = unlimited)
+            daily_tokens: Tokens per day (default: LLM_DAILY_TOKENS; 0 = unlimited)
+            cards_per_request: Subtopics per request (default: CARDS_PER_REQUEST)
+        """
+        settings = get_settings()
+        self.model = settings.gemini_model
+        self.ledger = ledger or UsageLedger.from_settings()
+        self.published = published or PublishedIndex.from_settings()
+        self.daily_requests = (
+            settings.llm_daily_requests if daily_requests is None else daily_requests
+        )
+        self.daily_tokens = settings.llm_daily_tokens if daily_tokens is None else daily_tokens
+        self.cards_per_request = max(1, cards_per_request or settings.cards_per_request)
+        self.fallback_tokens = (
+            estimate_tokens(FLASHCARD_SYSTEM_PROMPT)
+            + settings.topic_context_tokens
+            + self.cards_per_request * (settings.context_tokens + _CARD_OUTPUT_TOKENS)
+        )
+
+    def remaining(self) -> tuple[int | None, int | None]:
+        """Requests and tokens left today (None where there is no limit)."""
+        return self.ledger.remaining(self.model, self.daily_requests, self.daily_tokens)
+
+    def request_tokens(self) -> int:
+        """Expected tokens of one generation request."""
+        average = self.ledger.tokens_per_request(self.model)
+        return math.ceil(average) if average else self.fallback_tokens
+
+    def plan(
+        self,
+        topics: dict[str, list[str]],
+        limit: int | None = None,
+        refresh: bool = False,
+    ) -> RunPlan:
+        """Choose the subtopics to generate this run.
+
+        Args:
+            topics: Subtopics per topic to choose from
+            limit: Most subtopics per topic (None = no limit)
+            refresh: Regenerate cards that are already published
+
+        Returns:
+            RunPlan with the subtopics in priority order
+        """
+        result = RunPlan()
+        result.remaining_requests, result.remaining_tokens = self.remaining()
+        request_tokens = self.request_tokens()
+
+        candidates = []
+        for topic, subtopics in topics.items():
+            topic_cards = self.published.topic_cards(topic)
+            for rank, subtopic in enumerate(subtopics):
+                if not refresh and self.published.is_published(topic, subtopic):
+                    result.skipped_existing += 1
+                    continue
+                existing = self.published.subtopic_cards(topic, subtopic)
+                candidates.append(((existing, topic_cards, rank), topic, subtopic))
+        candidates.sort(key=lambda c: c[0])
+
+        per_topic: dict[str, int] = {}
+        for _, topic, subtopic in candidates:
+            count = per_topic.get(topic, 0)
+            if limit is not None and count >= limit:
+                continue
+            opens_request = count % self.cards_per_request == 0
+            if opens_request and not self._affordable(result, request_tokens):
+                result.skipped_quota += 1
+                continue
+            if opens_request:
+                result.requests += 1
+                result.tokens += request_tokens
+            per_topic[topic] = count + 1
+            result.plan.append((topic, subtopic))
+
+        logger.info(
+            f"Planned {len(result.plan)} subtopics in {result.requests} requests "
+            f"(~{result.tokens} tokens); skipped {result.skipped_existing} published, "
+            f"{result.skipped_quota} over quota"
+        )
+        return result
+
+    @staticmethod
+    def _affordable(result: RunPlan, request_tokens: int) -> bool:
+        if result.remaining_requests is not None:
+            if result.requests + 1 > result.remaining_requests:
+                return False
+        if result.remaining_tokens is not None:
+            if result.tokens + request_tokens > result.remaining_tokens:
+                return False
+        return True
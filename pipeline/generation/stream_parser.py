@@ -0,0 +1,203 @@
+"""Incremental validation of a JSON object as an LLM streams it."""
+
+import json
+from typing import Annotated, Any
+
+from annotated_types import MaxLen
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+class MalformedOutput(ValueError):
+    """Raised when streamed output can no longer become a valid response."""
+
+
+class IncrementalParser:
+    """Scans a streamed JSON object and validates each field as it completes.
+
+    Feed the deltas in order with ``feed()``. It raises ``MalformedOutput``
+    as soon as the text can't turn into a valid ``model``: anything but a
+    JSON object (e.g. prose or a markdown fence), a string field running
+    past its ``max_length`` while it's still being written, a finished
+    field failing its own constraints, or the closed object failing the
+    model (missing required fields). Nested values are only checked once
+    complete.
+    """
+
+    def __init__(self, model: type[BaseModel]):
+        """Initialize parser.
+
+        Args:
+            model: Pydantic model the object must validate against
+        """
+        self.model = model
+        self.fields: dict[str, Any] = {}
+        self.done = False
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._state = "start"  # start, key, colon, value, scalar, nested, after_value, done
+        self._in_string = False
+        self._escape = False
+        self._hex_left = 0  # hex digits of a \uXXXX escape still to come
+        self._string_role = ""  # key, value (top-level string value) or nested
+        self._string_start = 0
+        self._value_start = 0
+        self._value_chars = 0
+        self._key: str | None = None
+        self._adapters = {
+            name: TypeAdapter(Annotated[info.annotation, info])
+            for name, info in model.model_fields.items()
+        }
+        self._max_lengths = {
+            name: meta.max_length
+            for name, info in model.model_fields.items()
+            for meta in info.metadata
+            if isinstance(meta, MaxLen)
+        }
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._buffer
+
+    def feed(self, delta: str) -> None:
+        """Scan the next chunk of streamed text.
+
+        Raises:
+            MalformedOutput: If the output can't become a valid object
+        """
+        self._buffer += delta
+        for i in range(self._pos, len(self._buffer)):
+            self._scan(self._buffer[i], i)
+        self._pos = len(self._buffer)
+
+    def finish(self) -> BaseModel:
+        """Validated object once the stream has ended.
+
+        Raises:
+            MalformedOutput: If the stream ended before the object closed
+        """
+        if not self.done:
+            raise MalformedOutput(
+                f"Output ended before the JSON object was complete ({len(self._buffer)} chars)"
+            )
+        return self.model.model_validate(self.fields)
+
+    def _scan(self, ch: str, i: int) -> None:
+        if self._in_string:
+            self._scan_string(ch, i)
+            return
+        if ch.isspace():
+            return
+
+        state = self._state
+        if state == "start":
+            if ch != "{":
+                raise MalformedOutput(f"Expected a JSON object, got {self._buffer[:40]!r}")
+            self._depth, self._state = 1, "key"
+        elif state == "done":
+            raise MalformedOutput("Unexpected text after the JSON object")
+        elif state == "key":
+            if ch == '"':
+                self._open_string("key", i)
+            elif ch == "}" and not self.fields:
+                self._close()
+            else:
+                raise MalformedOutput(f"Expected a field name at char {i}, got {ch!r}")
+        elif state == "colon":
+            if ch != ":":
+                raise MalformedOutput(f"Expected ':' at char {i}, got {ch!r}")
+            self._state = "value"
+        elif state == "value":
+            self._value_start = i
+            if ch == '"':
+                self._value_chars = 0
+                self._open_string("value", i)
+            elif ch in "{[":
+                self._depth, self._state = 2, "nested"
+            else:
+                self._state = "scalar"
+        elif state == "scalar":
+            if ch in ",}":
+                self._complete(self._buffer[self._value_start : i])
+                self._after_value(ch)
+        elif state == "nested":
+            if ch == '"':
+                self._open_string("nested", i)
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    self._complete(self._buffer[self._value_start : i + 1])
+                    self._state = "after_value"
+        elif state == "after_value":
+            if ch not in ",}":
+                raise MalformedOutput(f"Expected ',' or '}}' at char {i}, got {ch!r}")
+            self._after_value(ch)
+
+    def _scan_string(self, ch: str, i: int) -> None:
+        if self._hex_left:
+            self._hex_left -= 1
+            return
+        if self._escape:
+            self._escape = False
+            if ch == "u":
+                self._hex_left = 4
+        elif ch == "\\":
+            self._escape = True
+            return
+        elif ch == '"':
+            self._in_string = False
+            raw = self._buffer[self._string_start : i + 1]
+            if self._string_role == "key":
+                self._key = self._loads(raw)
+                self._state = "colon"
+            elif self._string_role == "value":
+                self._complete(raw)
+                self._state = "after_value"
+            return
+
+        if self._string_role == "value":
+            self._value_chars += 1
+            limit = self._max_lengths.get(self._key)
+            if limit is not None and self._value_chars > limit:
+                raise MalformedOutput(f"{self._key} is longer than {limit} characters")
+
+    def _open_string(self, role: str, i: int) -> None:
+        self._in_string = True
+        self._string_role = role
+        self._string_start = i
+
+    def _after_value(self, ch: str) -> None:
+        if ch == ",":
+            self._state = "key"
+        else:
+            self._close()
+
+    def _complete(self, raw: str) -> None:
+        """Validate a finished top-level field."""
+        value = self._loads(raw)
+        adapter = self._adapters.get(self._key)
+        if adapter is not None:
+            try:
+                value = adapter.validate_python(value)
+            except ValidationError as e:
+                raise MalformedOutput(f"{self._key}: {e.errors()[0]['msg']}") from e
+        self.fields[self._key] = value
+
+    def _close(self) -> None:
+        """Validate the whole object once its closing brace arrives."""
+        self._depth, self._state = 0, "done"
+        try:
+            self.model.model_validate(self.fields)
+        except ValidationError as e:
+            raise MalformedOutput(f"Invalid {self.model.__name__}: {e}") from e
+        self.done = True
+
+    @staticmethod
+    def _loads(raw: str) -> Any:
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise MalformedOutput(f"Invalid JSON value {raw[:40]!r}: {e}") from e
@@ -4,14 +4,29 @@
 import argparse
 import asyncio
 import json
-import random
 from datetime import datetime, timezone
 from pathlib import Path
 
 from rich.console import Console
-
+from rich.table import Table
+
+from .benchmarks import (
+    run_dimensionality_benchmark,
+    run_hnsw_benchmark,
+    run_quantization_benchmark,
+    run_store_benchmark,
+    run_throughput_benchmark,
+)
+from .config import get_settings
 from .embeddings import DocumentChunker, Embedder, Indexer
-from .generation import CodeVerifier, Flashcard, FlashcardGenerator
+from .generation import (
+    CodeVerifier,
+    ContextMap,
+    Flashcard,
+    FlashcardGenerator,
+    GenerationEngine,
+    QuotaScheduler,
+)
 from .generation.prompts import SENIOR_IOS_TOPICS
 from .scrapers import (
     AppleDocsScraper,
@@ -30,6 +45,9 @@ from .verification import (
 
 console = Console()
 
+# Index snapshot restored/exported by the restore and snapshot commands
+DEFAULT_SNAPSHOT = "data/snapshots/index.npz"
+
 
 async def run_scrape() -> None:
     """Scrape all documentation sources."""
@@ -60,9 +78,15 @@ async def run_scrape() -> None:
     console.print(f"[green]✓ Saved {len(all_docs)} documents[/]")
 
 
-async def run_embed() -> None:
-    """Embed documents into ChromaDB."""
+async def run_embed(full: bool = False) -> None:
+    """Embed documents into ChromaDB.
+
+    Only new or changed chunks are embedded and upserted, and chunks of
+    vanished documents are deleted. The index is rebuilt from scratch when
+    ``full`` is set or the embedding model/size changed.
+    """
     console.print("[bold blue]Step 2: Embedding documents...[/]")
+    settings = get_settings()
 
     # Load scraped docs
     with open("data/scraped/documents.json") as f:
@@ -72,9 +96,6 @@ async def run_embed() -> None:
     embedder = Embedder()
     indexer = Indexer()
 
-    # Reset for fresh index
-    indexer.reset()
-
     all_chunks = []
     for doc in docs_data:
         chunks = chunker.chunk(
@@ -88,17 +109,90 @@ async def run_embed() -> None:
 
     console.print(f"  Created {len(all_chunks)} chunks")
 
-    chunks_with_embeddings = await embedder.embed_chunks(all_chunks)
-    indexer.index(chunks_with_embeddings)
+    dimensions = settings.embedding_dimensions
+    rebuild = full or indexer.needs_rebuild(embedder.backend.model_id, dimensions)
+
+    previous_epoch = indexer.epoch
+    changed = True
+    deleted: list[str] = []
+    if rebuild:
+        # Reset for fresh index
+        indexer.reset()
+        to_embed = all_chunks
+    else:
+        plan = indexer.plan_sync(all_chunks)
+        indexer.delete(plan.to_delete)
+        deleted = plan.to_delete
+        to_embed = plan.to_embed
+        changed = not plan.is_empty
+        console.print(
+            f"  Incremental: {len(plan.to_embed)} new/changed, "
+            f"{len(plan.to_delete)} removed, {plan.unchanged} unchanged"
+        )
+
+    chunks_with_embeddings = await embedder.embed_chunks(to_embed)
+
+    # Reduce locally when the provider can't return smaller vectors itself
+    if rebuild and dimensions and not embedder.backend.supports_output_dimensionality:
+        indexer.fit_projection([e for _, e in chunks_with_embeddings], dimensions)
+        console.print(f"  Fitted PCA projection to {dimensions} dims")
+
+    indexer.index(chunks_with_embeddings, model_id=embedder.backend.model_id)
+
+    # Keyword index for hybrid retrieval (local, rebuilt over the full corpus)
+    if changed or indexer.lexical is None:
+        indexer.build_lexical_index(all_chunks)
+        console.print(f"  Built BM25 index ({len(indexer.lexical.vocab)} terms)")
+
+    # Precompute each subtopic's context so generate needs no retrieval
+    context_map = ContextMap.load(indexer.sidecar_dir / "context_map")
+    recomputed = await context_map.refresh(
+        indexer,
+        embedder,
+        changed=chunks_with_embeddings,
+        deleted_ids=deleted,
+        previous_epoch=previous_epoch,
+        full=rebuild,
+    )
+    console.print(
+        f"  Context map: recomputed {recomputed}/{len(context_map.entries)} subtopics"
+    )
+
+    partitions = indexer.get_stats().get("partitions")
+    if partitions:
+        console.print(
+            "  Partitions: " + ", ".join(f"{name}={n}" for name, n in partitions.items())
+        )
 
-    console.print(f"[green]✓ Indexed {len(all_chunks)} chunks[/]")
+    console.print(f"[green]✓ Indexed {len(to_embed)} chunks ({len(all_chunks)} total)[/]")
 
 
-async def run_generate(topic: str | None = None, limit: int = 10) -> None:
+async def run_snapshot_export(path: str = DEFAULT_SNAPSHOT) -> None:
+    """Export the index to a single compressed snapshot file."""
+    console.print("[bold blue]Exporting index snapshot...[/]")
+    count = Indexer().export_snapshot(path)
+    size_mb = Path(path).stat().st_size / 1024**2
+    console.print(f"[green]✓ Exported {count} chunks to {path} ({size_mb:.1f} MB)[/]")
+
+
+async def run_snapshot_import(path: str = DEFAULT_SNAPSHOT) -> None:
+    """Restore the index from a snapshot file without re-embedding."""
+    console.print("[bold blue]Restoring index snapshot...[/]")
+    count = Indexer().import_snapshot(path)
+    console.print(f"[green]✓ Restored {count} chunks from {path}[/]")
+
+
+async def run_generate(
+    topic: str | None = None, limit: int = 10, refresh: bool = False
+) -> None:
     """Generate flashcards using RAG."""
     console.print("[bold blue]Step 3: Generating flashcards...[/]")
 
+    if refresh:
+        # A cached response would hand back the card being refreshed unchanged
+        get_settings().llm_cache_refresh = True
     generator = FlashcardGenerator()
+    generator.force_refresh = refresh
     verifier = CodeVerifier()
 
     topics_to_process = (
@@ -106,24 +200,55 @@ async def run_generate(topic: str | None = None, limit: int = 10) -> None:
     )
     all_flashcards = []
 
-    for topic_name, subtopics in topics_to_process.items():
-        console.print(f"  Topic: {topic_name}")
-        # Randomize to avoid always generating same subtopics
-        shuffled = subtopics.copy()
-        random.shuffle(shuffled)
-        subtopics_to_process = shuffled[:limit]
-
-        for subtopic in subtopics_to_process:
-            try:
-                result = await generator.generate(topic_name, subtopic)
-                # Add code example (optional - can be slow)
-                # card = await verifier.add_code_to_flashcard(result.flashcard)
-                all_flashcards.append(result.flashcard)
-                console.print(f"    ✓ {subtopic[:50]}...")
-            except Exception as e:
-                console.print(f"    ✗ {subtopic[:50]}: {e}")
-
-            await asyncio.sleep(0.5)  # Rate limit
+    # Least covered subtopics first, within what is left of today's quota
+    run_plan = QuotaScheduler(published=generator.published).plan(
+        topics_to_process, limit, refresh
+    )
+    plan = run_plan.plan
+    quota = ", ".join(
+        f"{left} {unit} left today"
+        for left, unit in (
+            (run_plan.remaining_requests, "requests"),
+            (run_plan.remaining_tokens, "tokens"),
+        )
+        if left is not None
+    )
+    console.print(
+        f"  Plan: {len(plan)} subtopics in ~{run_plan.requests} requests "
+        f"(~{run_plan.tokens} tokens){f'; {quota}' if quota else ''}; skipped "
+        f"{run_plan.skipped_existing} already published, {run_plan.skipped_quota} over quota"
+    )
+
+    # Retrieve context for the whole run up front
+    contexts = await generator.retrieve(plan)
+    context_map = generator.context_map
+    if plan:
+        console.print(
+            f"  Context map: {context_map.hits}/{len(plan)} subtopics precomputed"
+        )
+    cache = generator.indexer.cache
+    if cache is not None and plan:
+        console.print(
+            f"  Retrieval cache: {cache.hits}/{cache.hits + cache.misses} hits "
+            f"({cache.hit_rate:.0%})"
+        )
+
+    # Cards are generated concurrently and reported as they finish
+    engine = GenerationEngine(generator)
+    async for outcome in engine.as_completed(plan, contexts):
+        label = f"{outcome.topic}/{outcome.subtopic[:50]}"
+        if outcome.ok and not refresh and generator.published.has_front(
+            outcome.result.flashcard.front
+        ):
+            # Same question as a published card under another ID
+            console.print(f"    = {label}: already published")
+        elif outcome.ok:
+            # Add code example (optional - can be slow)
+            # card = await verifier.add_code_to_flashcard(outcome.result.flashcard)
+            all_flashcards.append(outcome.result.flashcard)
+            console.print(f"    ✓ {label} ({outcome.latency_ms / 1000:.1f}s)")
+        else:
+            console.print(f"    ✗ {label}: {outcome.error}")
 
     # Save
     Path("data/generated").mkdir(parents=True, exist_ok=True)
@@ -131,6 +256,46 @@ async def run_generate(topic: str | None = None, limit: int = 10) -> None:
     with open("data/generated/flashcards.json", "w") as f:
         json.dump(output, f, indent=2, default=str)
 
+    io_stats = generator.vector_io.stats()
+    generator.vector_io.close()
+    generator.indexer.flush()
+    console.print(
+        f"  Vector store: {io_stats['store_calls']} calls, "
+        f"{io_stats['store_busy_ms']:.0f}ms off-loop; event loop blocked "
+        f"{io_stats['loop_blocked_ms']:.0f}ms (max lag {io_stats['loop_lag_max_ms']:.0f}ms)"
+    )
+    llm_cache = generator.gemini.cache
+    if llm_cache is not None:
+        mode = " (replay)" if llm_cache.replay else " (refresh)" if llm_cache.refresh else ""
+        console.print(
+            f"  LLM cache{mode}: {llm_cache.hits}/{llm_cache.hits + llm_cache.misses} hits"
+        )
+    await generator.gemini.close()
+    usage = generator.gemini.usage
+    if usage.requests:
+        console.print(
+            f"  LLM input tokens: {usage.input_tokens} billed, {usage.cached_tokens} "
+            f"from context cache ({usage.cached_share:.0%}); {usage.output_tokens} output"
+        )
+    for name, provider in generator.llm.stats().items():
+        if not provider["requests"]:
+            continue
+        p50 = (provider["p50_ms"] or 0) / 1000
+        p95 = (provider["p95_ms"] or 0) / 1000
+        console.print(
+            f"  {name}: {provider['requests']} requests, {provider['failures']} failed, "
+            f"{provider['hedges']} hedged, {provider['wins']} won; "
+            f"latency p50 {p50:.1f}s, p95 {p95:.1f}s"
+        )
+    if generator.stream_aborts:
+        console.print(f"  Card streams aborted early and retried: {generator.stream_aborts}")
+    stats = engine.stats
+    console.print(
+        f"  Throughput: {stats.cards_per_minute:.1f} cards/min, "
+        f"{stats.cards_per_request:.1f} cards/request with "
+        f"{engine.concurrency} in flight; latency p50 {stats.percentile(50) / 1000:.1f}s, "
+        f"p95 {stats.percentile(95) / 1000:.1f}s; rate limit wait {stats.rate_limit_wait_s:.0f}s"
+    )
     console.print(f"[green]✓ Generated {len(all_flashcards)} flashcards[/]")
 
 
@@ -219,13 +384,40 @@ async def run_export() -> None:
     console.print(f"[green]✓ Exported {len(cards)} total flashcards[/]")
 
 
-async def run_all(topic: str | None = None, limit: int = 10) -> None:
+async def run_bench(
+    suite: str = "throughput",
+    size: int = 10_000,
+    corpus: str | None = None,
+) -> None:
+    """Run an offline benchmark suite and print its results."""
+    console.print(f"[bold blue]Benchmark: {suite} ({size} docs)...[/]")
+
+    if suite == "throughput":
+        rows = await run_throughput_benchmark(n_docs=size)
+    elif suite == "quantization":
+        rows = run_quantization_benchmark(n_docs=size)
+    elif suite == "dimensionality":
+        rows = run_dimensionality_benchmark(n_docs=size)
+    elif suite == "stores":
+        rows = run_store_benchmark(n_docs=size)
+    elif suite == "hnsw":
+        rows = run_hnsw_benchmark(n_docs=size, corpus_path=corpus)
+
+    table = Table(title=f"{suite} benchmark")
+    for column in rows[0]:
+        table.add_column(column, justify="right")
+    for row in rows:
+        table.add_row(*(str(v) for v in row.values()))
+    console.print(table)
+
+
+async def run_all(topic: str | None = None, limit: int = 10, refresh: bool = False) -> None:
     """Run entire pipeline."""
     console.print("[bold magenta]Running full pipeline...[/]\n")
 
     await run_scrape()
     await run_embed()
-    await run_generate(topic, limit)
+    await run_generate(topic, limit, refresh)
     await run_verify()
     await run_export()
 
@@ -241,15 +433,36 @@ def main() -> None:
 Examples:
   python -m pipeline.main scrape
   python -m pipeline.main embed
+  python -m pipeline.main embed --full
+  python -m pipeline.main snapshot
+  python -m pipeline.main restore --snapshot data/snapshots/index.npz
   python -m pipeline.main generate --topic swift --limit 5
+  python -m pipeline.main generate --replay
+  python -m pipeline.main generate --topic swift --force-refresh
   python -m pipeline.main verify
   python -m pipeline.main export
   python -m pipeline.main all --limit 3
+  python -m pipeline.main bench --suite throughput --size 100000
+  python -m pipeline.main bench --suite quantization --size 20000
+  python -m pipeline.main bench --suite dimensionality --size 20000
+  python -m pipeline.main bench --suite stores --size 20000
+  python -m pipeline.main bench --suite hnsw --size 20000
+  python -m pipeline.main bench --suite hnsw --corpus data/scraped/documents.json
         """,
     )
     parser.add_argument(
         "command",
-        choices=["scrape", "embed", "generate", "verify", "export", "all"],
+        choices=[
+            "scrape",
+            "embed",
+            "snapshot",
+            "restore",
+            "generate",
+            "verify",
+            "export",
+            "all",
+            "bench",
+        ],
         help="Pipeline command to run",
     )
     parser.add_argument(
@@ -263,21 +476,70 @@ Examples:
         default=10,
         help="Max cards per topic (default: 10)",
     )
+    parser.add_argument(
+        "--force-refresh",
+        action="store_true",
+        dest="refresh",
+        help=(
+            "Regenerate cards already published in the app, bypassing the published "
+            "index and the LLM response cache (generate)"
+        ),
+    )
+
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild the index from scratch instead of syncing changes (embed)",
+    )
+    parser.add_argument(
+        "--snapshot",
+        default=DEFAULT_SNAPSHOT,
+        help=f"Index snapshot file for snapshot/restore (default: {DEFAULT_SNAPSHOT})",
+    )
+    parser.add_argument(
+        "--suite",
+        choices=["throughput", "quantization", "dimensionality", "stores", "hnsw"],
+        default="throughput",
+        help="Benchmark suite for the bench command (default: throughput)",
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=10_000,
+        help="Synthetic corpus size in documents for bench (default: 10000)",
+    )
+    parser.add_argument(
+        "--corpus",
+        help="Archived documents.json to benchmark instead of a synthetic corpus (hnsw)",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Serve LLM calls from the response cache only; misses fail (generate)",
+    )
 
     args = parser.parse_args()
+    if args.replay:
+        get_settings().llm_replay = True
 
     if args.command == "scrape":
         asyncio.run(run_scrape())
     elif args.command == "embed":
-        asyncio.run(run_embed())
+        asyncio.run(run_embed(args.full))
+    elif args.command == "snapshot":
+        asyncio.run(run_snapshot_export(args.snapshot))
+    elif args.command == "restore":
+        asyncio.run(run_snapshot_import(args.snapshot))
     elif args.command == "generate":
-        asyncio.run(run_generate(args.topic, args.limit))
+        asyncio.run(run_generate(args.topic, args.limit, args.refresh))
     elif args.command == "verify":
         asyncio.run(run_verify())
     elif args.command == "export":
         asyncio.run(run_export())
     elif args.command == "all":
-        asyncio.run(run_all(args.topic, args.limit))
+        asyncio.run(run_all(args.topic, args.limit, args.refresh))
+    elif args.command == "bench":
+        asyncio.run(run_bench(args.suite, args.size, args.corpus))
 
 
 if __name__ == "__main__":
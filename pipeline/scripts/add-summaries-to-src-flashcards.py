@@ -10,17 +10,23 @@ import sys
 import time
 from pathlib import Path
 
-# Add parent to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add repo root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+from pipeline.clients.response_cache import ReplayMiss, ResponseCache, response_key
+
 load_dotenv()
 
 # Configure Gemini
+MODEL_NAME = "gemini-2.0-flash"
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel("gemini-2.0-flash")
+model = genai.GenerativeModel(MODEL_NAME)
+
+# Reruns reuse summaries of unchanged cards (LLM_REPLAY=true: never call the API)
+cache = ResponseCache.from_settings()
 
 SUMMARY_PROMPT = """Given this iOS interview flashcard, create a concise summary (1-2 sentences, max 150 characters) that directly answers the question.
 
@@ -41,8 +47,15 @@ def generate_summary(front: str, back: str) -> str | None:
     """Generate a concise summary for a flashcard."""
     try:
         prompt = SUMMARY_PROMPT.format(front=front, back=back[:2000])
-        response = model.generate_content(prompt)
-        summary = response.text.strip()
+        key = response_key(MODEL_NAME, None, None, prompt)
+        text = cache.get(key) if cache else None
+        if text is None:
+            if cache and cache.replay:
+                raise ReplayMiss("no cached summary (replay mode)")
+            text = model.generate_content(prompt).text
+            if cache:
+                cache.put(key, text, model=MODEL_NAME)
+        summary = text.strip()
         if len(summary) > 200:
             summary = summary[:197] + "..."
         return summary
@@ -77,13 +90,15 @@ def process_file(file_path: Path):
 
         print(f"  [{i+1}/{len(cards)}] {card.get('front', '')[:50]}...")
 
+        misses_before = cache.misses if cache else 0
         summary = generate_summary(card["front"], card["back"])
         if summary:
             card["summary"] = summary
             updated += 1
             print(f"    → {summary}")
 
-        time.sleep(0.3)
+        if cache is None or cache.misses > misses_before:
+            time.sleep(0.3)
 
     # Save
     with open(file_path, "w") as f:
@@ -0,0 +1,61 @@
+"""Vector store backends behind the Indexer."""
+
+from ..config import get_settings
+from .async_store import AsyncVectorStore
+from .base_store import RESULT_KEYS, VectorStore
+from .chroma_store import ChromaVectorStore
+from .numpy_store import NumpyVectorStore
+from .partitioned_store import PartitionedVectorStore
+
+
+def get_vector_store(
+    collection_name: str | None = None,
+    persist_dir: str | None = None,
+    backend: str | None = None,
+    partitioned: bool | None = None,
+) -> VectorStore:
+    """Create the vector store selected by ``Settings.vector_store``.
+
+    Args:
+        collection_name: Optional custom collection name
+        persist_dir: Optional custom storage directory
+        backend: Override store backend ("chroma" or "numpy")
+        partitioned: Split into per-topic partitions plus a global one
+            (default: ``Settings.partition_by_topic``)
+
+    Returns:
+        Vector store instance
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    settings = get_settings()
+    backend = backend or settings.vector_store
+    if partitioned is None:
+        partitioned = settings.partition_by_topic
+
+    if partitioned:
+        if backend not in ("chroma", "numpy"):
+            raise ValueError(f"Unknown vector store: {backend}")
+        return PartitionedVectorStore(
+            collection_name or settings.chroma_collection,
+            persist_dir or settings.chroma_persist_dir,
+            lambda name: get_vector_store(name, persist_dir, backend, partitioned=False),
+        )
+
+    if backend == "chroma":
+        return ChromaVectorStore(collection_name, persist_dir)
+    if backend == "numpy":
+        return NumpyVectorStore(collection_name, persist_dir)
+    raise ValueError(f"Unknown vector store: {backend}")
+
+
+__all__ = [
+    "AsyncVectorStore",
+    "ChromaVectorStore",
+    "NumpyVectorStore",
+    "PartitionedVectorStore",
+    "RESULT_KEYS",
+    "VectorStore",
+    "get_vector_store",
+]
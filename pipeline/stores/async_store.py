@@ -0,0 +1,194 @@
+"""Async facade running blocking vector store work on a bounded thread pool."""
+
+import asyncio
+import time
+from collections.abc import Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from ..utils.logging import get_logger
+from ..utils.loop_monitor import LoopLagMonitor
+from .base_store import RESULT_KEYS, VectorStore
+
+logger = get_logger(__name__)
+
+
+class AsyncVectorStore:
+    """Non-blocking access to a vector store from coroutines.
+
+    Every store call runs on a dedicated, bounded thread pool, so disk and
+    index work never blocks the event loop and in-flight LLM calls keep
+    progressing. Requests that arrive within ``batch_window`` seconds of each
+    other are merged into one call (see ``batched()``), and a loop lag
+    monitor reports how long the loop was blocked meanwhile.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        max_workers: int = 2,
+        batch_window: float = 0.005,
+        max_batch: int = 64,
+    ):
+        """Initialize facade.
+
+        Args:
+            store: Store to wrap
+            max_workers: Threads running store calls
+            batch_window: Seconds to wait for more requests before a batch runs
+            max_batch: Requests per batch before it runs immediately
+        """
+        self.store = store
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="vector-store"
+        )
+        self.monitor = LoopLagMonitor()
+
+        self.calls = 0
+        self.batches = 0
+        self.batched_items = 0
+        self.busy_ms = 0.0
+        self._pending: dict[Hashable, list[tuple[Any, asyncio.Future]]] = {}
+        self._timers: dict[Hashable, asyncio.TimerHandle] = {}
+
+    def _timed(self, fn: Callable, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.busy_ms += (time.perf_counter() - start) * 1000
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run any blocking callable on the store's thread pool.
+
+        Args:
+            fn: Callable to run (e.g. an Indexer method)
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The callable's return value
+        """
+        self.monitor.start()
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, lambda: self._timed(fn, *args, **kwargs)
+        )
+
+    async def batched(
+        self,
+        key: Hashable,
+        items: list,
+        fn: Callable[[list], list],
+    ) -> list:
+        """Merge concurrent requests into one blocking call.
+
+        Items submitted under the same key within the batch window are
+        passed to ``fn`` together on the thread pool; each caller gets back
+        the results for its own items.
+
+        Args:
+            key: Requests with equal keys can share a call
+            items: This caller's items
+            fn: Blocking function mapping a list of items to a list of results
+
+        Returns:
+            Results for ``items``, in order
+        """
+        self.monitor.start()
+        loop = asyncio.get_running_loop()
+        futures = []
+        pending = self._pending.setdefault(key, [])
+        for item in items:
+            future = loop.create_future()
+            pending.append((item, future))
+            futures.append(future)
+
+        if len(pending) >= self.max_batch:
+            self._dispatch(key, fn)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.batch_window, self._dispatch, key, fn)
+
+        return list(await asyncio.gather(*futures))
+
+    def _dispatch(self, key: Hashable, fn: Callable[[list], list]) -> None:
+        """Send the pending items for a key to the thread pool."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(key, [])
+        if not pending:
+            return
+
+        self.batches += 1
+        self.batched_items += len(pending)
+        task = asyncio.ensure_future(self.run(fn, [item for item, _ in pending]))
+
+        def resolve(done: asyncio.Future) -> None:
+            # exception() raises on a cancelled task, so check for that first
+            cancelled = done.cancelled()
+            error = None if cancelled else done.exception()
+            for i, (_, future) in enumerate(pending):
+                if future.done():
+                    continue
+                if cancelled:
+                    future.cancel()
+                elif error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(done.result()[i])
+
+        task.add_done_callback(resolve)
+
+    async def query(
+        self,
+        embedding: list[float],
+        n_results: int = 10,
+        where: dict | None = None,
+    ) -> dict:
+        """Find nearest items for one embedding, batched with concurrent queries.
+
+        Returns:
+            Result dict for this query (RESULT_KEYS, flat lists)
+        """
+
+        def search(items: list[tuple[list[float], dict | None]]) -> list[dict]:
+            found = self.store.query_batch(
+                [e for e, _ in items], n_results=n_results, wheres=[w for _, w in items]
+            )
+            return [{key: found[key][i] for key in RESULT_KEYS} for i in range(len(items))]
+
+        return (await self.batched(("query", n_results), [(embedding, where)], search))[0]
+
+    async def get(self, **kwargs) -> dict:
+        return await self.run(self.store.get, **kwargs)
+
+    async def upsert(self, **kwargs) -> None:
+        await self.run(self.store.upsert, **kwargs)
+
+    async def delete(self, ids: list[str]) -> None:
+        await self.run(self.store.delete, ids)
+
+    async def count(self) -> int:
+        return await self.run(self.store.count)
+
+    async def flush(self) -> None:
+        await self.run(self.store.flush)
+
+    def stats(self) -> dict:
+        """Pool usage, batching and event loop lag."""
+        return {
+            "store_calls": self.calls,
+            "batches": self.batches,
+            "avg_batch": round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+            "store_busy_ms": round(self.busy_ms, 1),
+            **self.monitor.stats(),
+        }
+
+    def close(self) -> None:
+        """Stop the lag monitor and shut down the thread pool."""
+        self.monitor.stop()
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,87 @@
+"""Vector store interface used by the Indexer."""
+
+from abc import ABC, abstractmethod
+
+# Keys of a query result; each maps to one list per query
+RESULT_KEYS = ("ids", "documents", "metadatas", "distances")
+
+
+class VectorStore(ABC):
+    """Abstract base class for vector stores.
+
+    Results use ChromaDB's shapes so stores are interchangeable: ``get``
+    returns flat lists, ``query_batch`` returns one list per query. Distances
+    are cosine distances (1 - cosine similarity).
+    """
+
+    name: str
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: list[list[float]],
+        documents: list[str],
+        metadatas: list[dict],
+    ) -> None:
+        """Insert new items or overwrite existing ones with the same IDs."""
+        pass
+
+    @abstractmethod
+    def get(
+        self,
+        ids: list[str] | None = None,
+        where: dict | None = None,
+        include: list[str] | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        """Fetch stored items without a similarity search.
+
+        Args:
+            ids: Optional IDs to fetch (default: all)
+            where: Optional metadata filter
+            include: Fields to return (default: ["metadatas"])
+            limit: Optional maximum number of results
+
+        Returns:
+            Dict with ids plus the requested fields
+        """
+        pass
+
+    @abstractmethod
+    def query_batch(
+        self,
+        query_embeddings: list[list[float]],
+        n_results: int = 10,
+        wheres: list[dict | None] | None = None,
+    ) -> dict:
+        """Find nearest items for many query embeddings.
+
+        Args:
+            query_embeddings: Query embedding vectors
+            n_results: Number of results per query
+            wheres: Optional metadata filter per query
+
+        Returns:
+            Dict of RESULT_KEYS, each a list with one entry per query
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, ids: list[str]) -> None:
+        """Delete items by ID."""
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored items."""
+        pass
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Delete all items."""
+        pass
+
+    def flush(self) -> None:
+        """Persist buffered writes (no-op for stores that write through)."""
+        pass
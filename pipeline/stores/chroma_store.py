@@ -0,0 +1,64 @@
+"""ChromaDB-backed vector store."""
+
+from .base_store import VectorStore
+
+
+class ChromaVectorStore(VectorStore):
+    """Vector store backed by a persistent ChromaDB collection (HNSW)."""
+
+    def __init__(
+        self,
+        collection_name: str | None = None,
+        persist_dir: str | None = None,
+        hnsw: dict | None = None,
+    ):
+        """Initialize store.
+
+        Args:
+            collection_name: Optional custom collection name
+            persist_dir: Optional custom storage directory
+            hnsw: Optional HNSW parameter overrides (see ``ChromaClient``)
+        """
+        # Imported lazily so other stores don't pay chromadb's import time
+        from ..clients.chroma_client import ChromaClient
+
+        self.chroma = ChromaClient(collection_name, persist_dir, hnsw=hnsw)
+
+    @property
+    def name(self) -> str:
+        return self.chroma.collection.name
+
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: list[list[float]],
+        documents: list[str],
+        metadatas: list[dict],
+    ) -> None:
+        self.chroma.upsert(ids, embeddings, documents, metadatas)
+
+    def get(
+        self,
+        ids: list[str] | None = None,
+        where: dict | None = None,
+        include: list[str] | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        return self.chroma.get(ids=ids, where=where, include=include, limit=limit)
+
+    def query_batch(
+        self,
+        query_embeddings: list[list[float]],
+        n_results: int = 10,
+        wheres: list[dict | None] | None = None,
+    ) -> dict:
+        return self.chroma.query_batch(query_embeddings, n_results, wheres)
+
+    def delete(self, ids: list[str]) -> None:
+        self.chroma.delete(ids)
+
+    def count(self) -> int:
+        return self.chroma.count()
+
+    def reset(self) -> None:
+        self.chroma.reset()
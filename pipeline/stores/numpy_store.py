@@ -0,0 +1,434 @@
+"""Embedded NumPy vector store backed by memory-mapped files."""
+
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from ..config import get_settings
+from ..utils.logging import get_logger
+from .base_store import RESULT_KEYS, VectorStore
+
+logger = get_logger(__name__)
+
+FORMAT_VERSION = 1
+
+# Metadata keys stored as categorical codes for vectorized filtering
+FILTER_COLUMNS = ("topic", "source_id")
+
+# Rows scored per block in exact search and IVF assignment
+_BLOCK_ROWS = 16_384
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so dot products are cosine similarities."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+class _StringColumn:
+    """Variable-length UTF-8 strings stored as one blob plus row offsets."""
+
+    def __init__(self, directory: Path, name: str):
+        self.offsets = np.load(directory / f"{name}.off.npy", mmap_mode="r")
+        blob_path = directory / f"{name}.bin"
+        self.blob = (
+            np.memmap(blob_path, dtype=np.uint8, mode="r")
+            if blob_path.stat().st_size
+            else np.zeros(0, dtype=np.uint8)
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        return self.blob[self.offsets[row] : self.offsets[row + 1]].tobytes().decode()
+
+    def to_list(self) -> list[str]:
+        data = self.blob.tobytes()
+        offsets = self.offsets.tolist()
+        return [data[a:b].decode() for a, b in zip(offsets, offsets[1:])]
+
+    @staticmethod
+    def write(directory: Path, name: str, values: list[str]) -> None:
+        encoded = [v.encode() for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        np.save(directory / f"{name}.off.npy", offsets)
+        with open(directory / f"{name}.bin", "wb") as f:
+            f.write(b"".join(encoded))
+
+
+class NumpyVectorStore(VectorStore):
+    """Vector store kept as a float32 matrix in a memory-mapped file.
+
+    Layout under ``<persist_dir>/numpy/<collection>/``:
+        - ``vectors.npy``: normalized float32 matrix (memory-mapped)
+        - ``ids``, ``documents``, ``metadatas``: string columns (blob + offsets)
+        - ``<key>.codes.npy``: categorical codes for FILTER_COLUMNS
+        - ``ivf_*.npy``: optional inverted-file partitions
+
+    Opening reads a small JSON header and maps the files, so it costs
+    milliseconds regardless of corpus size. Search is exact (one matrix
+    product) or IVF (score only the ``ivf_probes`` closest partitions).
+    Writes are buffered in memory and written on ``flush()``.
+    """
+
+    def __init__(
+        self,
+        collection_name: str | None = None,
+        persist_dir: str | None = None,
+        ivf_lists: int | None = None,
+        ivf_probes: int | None = None,
+    ):
+        """Initialize store.
+
+        Args:
+            collection_name: Optional custom collection name
+            persist_dir: Optional custom storage directory
+            ivf_lists: IVF partitions to build on flush (0 = exact search only)
+            ivf_probes: Partitions scanned per query
+        """
+        settings = get_settings()
+        self.name = collection_name or settings.chroma_collection
+        self.path = Path(persist_dir or settings.chroma_persist_dir) / "numpy" / self.name
+        self.ivf_lists = settings.numpy_ivf_lists if ivf_lists is None else ivf_lists
+        self.ivf_probes = settings.numpy_ivf_probes if ivf_probes is None else ivf_probes
+
+        self._pending: dict | None = None
+        self._open()
+
+    def _open(self) -> None:
+        """Map the on-disk files (or start empty)."""
+        self._row_by_id: dict[str, int] | None = None
+        self._ivf: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
+
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            self._meta = {"version": FORMAT_VERSION, "count": 0, "categories": {}}
+            return
+
+        with open(meta_path) as f:
+            self._meta = json.load(f)
+        if self._meta.get("version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported numpy store format {self._meta.get('version')} "
+                f"in {self.path}; re-run embed --full"
+            )
+
+        self._vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
+        self._ids = _StringColumn(self.path, "ids")
+        self._documents = _StringColumn(self.path, "documents")
+        self._metadatas = _StringColumn(self.path, "metadatas")
+        self._codes = {
+            key: np.load(self.path / f"{key}.codes.npy", mmap_mode="r")
+            for key in self._meta["categories"]
+        }
+        if self._meta.get("ivf_lists"):
+            self._ivf = (
+                np.load(self.path / "ivf_centroids.npy"),
+                np.load(self.path / "ivf_order.npy", mmap_mode="r"),
+                np.load(self.path / "ivf_offsets.npy"),
+            )
+
+    # -- writes -------------------------------------------------------------
+
+    def _materialize(self) -> dict:
+        """Load the table into memory for modification."""
+        if self._pending is None:
+            if self._meta["count"]:
+                self._pending = {
+                    "ids": self._ids.to_list(),
+                    "documents": self._documents.to_list(),
+                    "metadatas": [json.loads(m) for m in self._metadatas.to_list()],
+                    "vectors": np.array(self._vectors),
+                }
+            else:
+                self._pending = {"ids": [], "documents": [], "metadatas": [], "vectors": None}
+        return self._pending
+
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: list[list[float]],
+        documents: list[str],
+        metadatas: list[dict],
+    ) -> None:
+        if not ids:
+            return
+
+        table = self._materialize()
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        row_by_id = {chunk_id: row for row, chunk_id in enumerate(table["ids"])}
+
+        new_rows = []
+        for i, chunk_id in enumerate(ids):
+            row = row_by_id.get(chunk_id)
+            if row is None:
+                new_rows.append(i)
+                continue
+            table["documents"][row] = documents[i]
+            table["metadatas"][row] = metadatas[i]
+            table["vectors"][row] = vectors[i]
+
+        if new_rows:
+            table["ids"].extend(ids[i] for i in new_rows)
+            table["documents"].extend(documents[i] for i in new_rows)
+            table["metadatas"].extend(metadatas[i] for i in new_rows)
+            added = vectors[new_rows]
+            table["vectors"] = (
+                added
+                if table["vectors"] is None
+                else np.concatenate([table["vectors"], added])
+            )
+
+    def delete(self, ids: list[str]) -> None:
+        if not ids:
+            return
+
+        table = self._materialize()
+        drop = set(ids)
+        keep = [row for row, chunk_id in enumerate(table["ids"]) if chunk_id not in drop]
+        if len(keep) == len(table["ids"]):
+            return
+
+        for key in ("ids", "documents", "metadatas"):
+            table[key] = [table[key][row] for row in keep]
+        table["vectors"] = table["vectors"][keep] if keep else None
+
+    def flush(self) -> None:
+        """Write buffered changes to a fresh directory and swap it in."""
+        if self._pending is None:
+            return
+
+        table = self._pending
+        self._pending = None
+
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        count = len(table["ids"])
+        meta = {"version": FORMAT_VERSION, "count": count, "categories": {}}
+
+        if count:
+            vectors = table["vectors"].astype(np.float32)
+            np.save(tmp / "vectors.npy", vectors)
+            meta["dim"] = int(vectors.shape[1])
+
+            _StringColumn.write(tmp, "ids", table["ids"])
+            _StringColumn.write(tmp, "documents", table["documents"])
+            _StringColumn.write(
+                tmp, "metadatas", [json.dumps(m) for m in table["metadatas"]]
+            )
+
+            for key in FILTER_COLUMNS:
+                values = [str(m.get(key, "")) for m in table["metadatas"]]
+                categories, codes = np.unique(values, return_inverse=True)
+                np.save(tmp / f"{key}.codes.npy", codes.astype(np.int32))
+                meta["categories"][key] = categories.tolist()
+
+            if self.ivf_lists and count >= self.ivf_lists * 4:
+                self._build_ivf(tmp, vectors)
+                meta["ivf_lists"] = self.ivf_lists
+
+        with open(tmp / "meta.json", "w") as f:
+            json.dump(meta, f)
+
+        old = self.path.with_name(self.path.name + ".old")
+        shutil.rmtree(old, ignore_errors=True)
+        if self.path.exists():
+            self.path.rename(old)
+        tmp.rename(self.path)
+        shutil.rmtree(old, ignore_errors=True)
+
+        self._open()
+        logger.debug(f"Flushed numpy store {self.name}: {count} vectors")
+
+    def _build_ivf(self, directory: Path, vectors: np.ndarray, iterations: int = 10) -> None:
+        """Cluster vectors with spherical k-means and write IVF partitions."""
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), 50_000), replace=False)]
+        centroids = sample[rng.choice(len(sample), self.ivf_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(self.ivf_lists):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = _normalize(centroids)
+
+        assign = np.concatenate(
+            [
+                np.argmax(vectors[i : i + _BLOCK_ROWS] @ centroids.T, axis=1)
+                for i in range(0, len(vectors), _BLOCK_ROWS)
+            ]
+        )
+        order = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.zeros(self.ivf_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=self.ivf_lists), out=offsets[1:])
+
+        np.save(directory / "ivf_centroids.npy", centroids.astype(np.float32))
+        np.save(directory / "ivf_order.npy", order)
+        np.save(directory / "ivf_offsets.npy", offsets)
+
+    def reset(self) -> None:
+        self._pending = None
+        shutil.rmtree(self.path, ignore_errors=True)
+        self._open()
+        logger.info(f"Reset numpy store: {self.name}")
+
+    # -- reads --------------------------------------------------------------
+
+    def count(self) -> int:
+        if self._pending is not None:
+            return len(self._pending["ids"])
+        return self._meta["count"]
+
+    def _row_index(self) -> dict[str, int]:
+        if self._row_by_id is None:
+            self._row_by_id = {chunk_id: row for row, chunk_id in enumerate(self._ids.to_list())}
+        return self._row_by_id
+
+    def _mask(self, where: dict | None) -> np.ndarray | None:
+        """Boolean row mask for an equality filter (None = all rows).
+
+        Supports ``{"key": value}``, several keys (AND) and ``{"$and": [...]}``.
+
+        Raises:
+            ValueError: If the filter uses other operators
+        """
+        if not where:
+            return None
+
+        conditions = []
+        for key, value in where.items():
+            if key == "$and":
+                for clause in value:
+                    conditions.extend(clause.items())
+            elif key.startswith("$") or isinstance(value, dict):
+                raise ValueError(f"Unsupported filter for numpy store: {where}")
+            else:
+                conditions.append((key, value))
+
+        mask = np.ones(self._meta["count"], dtype=bool)
+        decoded = None
+        for key, value in conditions:
+            categories = self._meta["categories"].get(key)
+            if categories is not None:
+                try:
+                    code = categories.index(str(value))
+                except ValueError:
+                    return np.zeros_like(mask)
+                mask &= np.asarray(self._codes[key]) == code
+            else:
+                # Slow path for keys without categorical codes
+                if decoded is None:
+                    decoded = [json.loads(m) for m in self._metadatas.to_list()]
+                mask &= np.array([m.get(key) == value for m in decoded], dtype=bool)
+        return mask
+
+    def _row_result(self, rows: list[int], include: list[str]) -> dict:
+        result: dict = {"ids": [self._ids[r] for r in rows]}
+        if "documents" in include:
+            result["documents"] = [self._documents[r] for r in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [json.loads(self._metadatas[r]) for r in rows]
+        if "embeddings" in include:
+            result["embeddings"] = [self._vectors[r].tolist() for r in rows]
+        return result
+
+    def get(
+        self,
+        ids: list[str] | None = None,
+        where: dict | None = None,
+        include: list[str] | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        self.flush()
+        include = include if include is not None else ["metadatas"]
+        if not self._meta["count"]:
+            return self._row_result([], include)
+
+        if ids is not None:
+            index = self._row_index()
+            rows = [index[i] for i in ids if i in index]
+        else:
+            rows = list(range(self._meta["count"]))
+
+        mask = self._mask(where)
+        if mask is not None:
+            rows = [r for r in rows if mask[r]]
+        if limit is not None:
+            rows = rows[:limit]
+        return self._row_result(rows, include)
+
+    def _candidates(self, query: np.ndarray, mask: np.ndarray | None) -> np.ndarray | None:
+        """Rows in the IVF partitions closest to the query (None = all rows)."""
+        if self._ivf is None:
+            return None if mask is None else np.flatnonzero(mask)
+
+        centroids, order, offsets = self._ivf
+        probes = np.argsort(-(centroids @ query))[: self.ivf_probes]
+        rows = np.sort(np.concatenate([order[offsets[p] : offsets[p + 1]] for p in probes]))
+        return rows if mask is None else rows[mask[rows]]
+
+    def _top_k(self, scores: np.ndarray, k: int) -> np.ndarray:
+        k = min(k, len(scores))
+        if k == 0:
+            return np.zeros(0, dtype=np.int64)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
+
+    def query_batch(
+        self,
+        query_embeddings: list[list[float]],
+        n_results: int = 10,
+        wheres: list[dict | None] | None = None,
+    ) -> dict:
+        self.flush()
+        merged: dict = {key: [[] for _ in query_embeddings] for key in RESULT_KEYS}
+        if not self._meta["count"] or not query_embeddings:
+            return merged
+
+        queries = _normalize(np.asarray(query_embeddings, dtype=np.float32))
+        wheres = wheres or [None] * len(queries)
+
+        groups: dict[str, list[int]] = {}
+        for i, where in enumerate(wheres):
+            groups.setdefault(json.dumps(where, sort_keys=True), []).append(i)
+
+        for positions in groups.values():
+            mask = self._mask(wheres[positions[0]])
+
+            if self._ivf is None:
+                # Exact search: one matrix product per block for the whole group
+                rows = None if mask is None else np.flatnonzero(mask)
+                group_queries = queries[positions]
+                n_rows = self._meta["count"] if rows is None else len(rows)
+                scores = np.empty((len(positions), n_rows), dtype=np.float32)
+                for start in range(0, n_rows, _BLOCK_ROWS):
+                    block = (
+                        self._vectors[start : start + _BLOCK_ROWS]
+                        if rows is None
+                        else self._vectors[rows[start : start + _BLOCK_ROWS]]
+                    )
+                    scores[:, start : start + _BLOCK_ROWS] = group_queries @ np.asarray(block).T
+                per_query = [(rows, scores[j]) for j in range(len(positions))]
+            else:
+                per_query = []
+                for i in positions:
+                    rows = self._candidates(queries[i], mask)
+                    per_query.append((rows, np.asarray(self._vectors[rows]) @ queries[i]))
+
+            for i, (rows, scores) in zip(positions, per_query):
+                top = self._top_k(scores, n_results)
+                hit_rows = top if rows is None else rows[top]
+                result = self._row_result(hit_rows.tolist(), ["documents", "metadatas"])
+                for key in ("ids", "documents", "metadatas"):
+                    merged[key][i] = result[key]
+                merged["distances"][i] = (1.0 - scores[top]).tolist()
+
+        return merged
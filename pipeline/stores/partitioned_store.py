@@ -0,0 +1,236 @@
+"""Topic-partitioned vector store built from per-partition stores."""
+
+import json
+import re
+from collections.abc import Callable
+from pathlib import Path
+
+from ..utils.logging import get_logger
+from .base_store import RESULT_KEYS, VectorStore
+
+logger = get_logger(__name__)
+
+# Suffix of the partition holding every item
+GLOBAL_PARTITION = "all"
+
+
+def _partition_suffix(topic: str) -> str:
+    """Topic as a collection-name-safe suffix."""
+    return re.sub(r"[^a-zA-Z0-9_-]+", "-", topic).strip("-_").lower() or "topic"
+
+
+def _topic_of(where: dict | None) -> str | None:
+    """Topic of a plain ``{"topic": ...}`` filter, else None."""
+    if where and set(where) == {"topic"} and isinstance(where["topic"], str):
+        return where["topic"]
+    return None
+
+
+class PartitionedVectorStore(VectorStore):
+    """One inner store per topic plus a global store with every item.
+
+    A query filtered to a topic searches only that topic's partition, without
+    a ``where`` clause. Queries whose partition is missing or holds fewer
+    items than requested are also sent to the global partition in the same
+    call, and the two result lists are fused (topic hits first), so there is
+    no empty result and no second round trip. Other queries use the global
+    partition.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        persist_dir: str | Path,
+        make_store: Callable[[str], VectorStore],
+    ):
+        """Initialize store.
+
+        Args:
+            collection_name: Base collection name
+            persist_dir: Storage directory (holds the partition manifest)
+            make_store: Creates the inner store for a partition name
+        """
+        self.name = collection_name
+        self.make_store = make_store
+        self.manifest_path = Path(persist_dir) / "partitions" / f"{collection_name}.json"
+
+        self.partitions: dict[str, str] = {}  # topic -> partition name
+        if self.manifest_path.exists():
+            with open(self.manifest_path) as f:
+                self.partitions = json.load(f)
+
+        self.global_store = make_store(f"{collection_name}--{GLOBAL_PARTITION}")
+        self._stores: dict[str, VectorStore] = {}
+
+    def _save_manifest(self) -> None:
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, "w") as f:
+            json.dump(self.partitions, f, indent=2, sort_keys=True)
+
+    def shard(self, topic: str, create: bool = False) -> VectorStore | None:
+        """Get the partition for a topic.
+
+        Args:
+            topic: Topic name
+            create: Create the partition if it doesn't exist
+
+        Returns:
+            Partition store, or None if it doesn't exist and create is False
+        """
+        if topic not in self.partitions:
+            if not create:
+                return None
+            self.partitions[topic] = f"{self.name}--{_partition_suffix(topic)}"
+            self._save_manifest()
+        if topic not in self._stores:
+            self._stores[topic] = self.make_store(self.partitions[topic])
+        return self._stores[topic]
+
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: list[list[float]],
+        documents: list[str],
+        metadatas: list[dict],
+    ) -> None:
+        groups: dict[str, list[int]] = {}
+        for i, meta in enumerate(metadatas):
+            topic = (meta or {}).get("topic")
+            if topic:
+                groups.setdefault(topic, []).append(i)
+
+        # Items whose topic changed must leave their old partition
+        new_topics = {item_id: (meta or {}).get("topic") for item_id, meta in zip(ids, metadatas)}
+        self._delete_from_shards(ids, keep=lambda item_id, topic: new_topics[item_id] == topic)
+        self.global_store.upsert(ids, embeddings, documents, metadatas)
+
+        for topic, rows in groups.items():
+            self.shard(topic, create=True).upsert(
+                [ids[i] for i in rows],
+                [embeddings[i] for i in rows],
+                [documents[i] for i in rows],
+                [metadatas[i] for i in rows],
+            )
+
+    def get(
+        self,
+        ids: list[str] | None = None,
+        where: dict | None = None,
+        include: list[str] | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        topic = _topic_of(where)
+        if topic is not None:
+            store = self.shard(topic)
+            if store is None:
+                return self.global_store.get(ids=[], include=include)
+            return store.get(ids=ids, include=include, limit=limit)
+        return self.global_store.get(ids=ids, where=where, include=include, limit=limit)
+
+    def query_batch(
+        self,
+        query_embeddings: list[list[float]],
+        n_results: int = 10,
+        wheres: list[dict | None] | None = None,
+    ) -> dict:
+        wheres = wheres or [None] * len(query_embeddings)
+
+        # Route each query to its topic partition and/or the global partition
+        by_topic: dict[str, list[int]] = {}
+        to_global: list[int] = []
+        global_wheres: list[dict | None] = []
+        sizes: dict[str, int] = {}
+
+        for i, where in enumerate(wheres):
+            topic = _topic_of(where)
+            if topic is None:
+                to_global.append(i)
+                global_wheres.append(where)
+                continue
+
+            store = self.shard(topic)
+            if store is not None:
+                by_topic.setdefault(topic, []).append(i)
+                if topic not in sizes:
+                    sizes[topic] = store.count()
+            if store is None or sizes[topic] < n_results:
+                # Fused fallback: top up from every topic in this same call
+                to_global.append(i)
+                global_wheres.append(None)
+
+        merged: dict = {key: [[] for _ in query_embeddings] for key in RESULT_KEYS}
+
+        for topic, rows in by_topic.items():
+            found = self._stores[topic].query_batch(
+                [query_embeddings[i] for i in rows], n_results=n_results
+            )
+            for j, i in enumerate(rows):
+                for key in RESULT_KEYS:
+                    merged[key][i] = list(found[key][j])
+
+        if to_global:
+            found = self.global_store.query_batch(
+                [query_embeddings[i] for i in to_global],
+                n_results=n_results,
+                wheres=global_wheres,
+            )
+            for j, i in enumerate(to_global):
+                seen = set(merged["ids"][i])
+                for row, item_id in enumerate(found["ids"][j]):
+                    if len(merged["ids"][i]) >= n_results:
+                        break
+                    if item_id in seen:
+                        continue
+                    for key in RESULT_KEYS:
+                        merged[key][i].append(found[key][j][row])
+
+        return merged
+
+    def _delete_from_shards(
+        self,
+        ids: list[str],
+        keep: Callable[[str, str], bool] = lambda item_id, topic: False,
+    ) -> None:
+        """Remove stored items from their topic partitions.
+
+        Args:
+            ids: Item IDs (unknown IDs are ignored)
+            keep: Called with (ID, stored topic); True leaves the item in place
+        """
+        found = self.global_store.get(ids=ids, include=["metadatas"])
+        groups: dict[str, list[str]] = {}
+        for item_id, meta in zip(found["ids"], found["metadatas"]):
+            topic = (meta or {}).get("topic")
+            if topic and not keep(item_id, topic):
+                groups.setdefault(topic, []).append(item_id)
+
+        for topic, topic_ids in groups.items():
+            store = self.shard(topic)
+            if store is not None:
+                store.delete(topic_ids)
+
+    def delete(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        self._delete_from_shards(ids)
+        self.global_store.delete(ids)
+
+    def count(self) -> int:
+        return self.global_store.count()
+
+    def partition_counts(self) -> dict[str, int]:
+        """Number of items in every partition, keyed by topic (plus "all")."""
+        counts = {topic: self.shard(topic).count() for topic in sorted(self.partitions)}
+        counts[GLOBAL_PARTITION] = self.global_store.count()
+        return counts
+
+    def reset(self) -> None:
+        for topic in list(self.partitions):
+            self.shard(topic).reset()
+        self.global_store.reset()
+        logger.info(f"Reset {len(self.partitions)} topic partitions of {self.name}")
+
+    def flush(self) -> None:
+        for store in self._stores.values():
+            store.flush()
+        self.global_store.flush()
@@ -1,5 +1,7 @@
 """Utility modules."""
 
 from .logging import setup_logging, get_logger
+from .loop_monitor import LoopLagMonitor
+from .rate_limiter import RateLimiter, estimate_tokens
 
-__all__ = ["setup_logging", "get_logger"]
+__all__ = ["LoopLagMonitor", "RateLimiter", "estimate_tokens", "setup_logging", "get_logger"]
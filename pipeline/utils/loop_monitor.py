@@ -0,0 +1,62 @@
+"""Event loop lag monitoring."""
+
+import asyncio
+import time
+
+import numpy as np
+
+
+class LoopLagMonitor:
+    """Measures how long the event loop is blocked.
+
+    A background task sleeps for ``interval`` seconds at a time; any extra
+    delay before it wakes up is time the loop spent running something else
+    without yielding.
+    """
+
+    def __init__(self, interval: float = 0.05, max_samples: int = 10_000):
+        """Initialize monitor.
+
+        Args:
+            interval: Seconds between probes
+            max_samples: Lag samples kept for percentiles
+        """
+        self.interval = interval
+        self.max_samples = max_samples
+        self.samples_ms: list[float] = []
+        self.blocked_ms = 0.0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start probing on the running event loop (no-op if already running)."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._probe())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _probe(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.perf_counter() - start - self.interval) * 1000)
+            self.blocked_ms += lag_ms
+            if len(self.samples_ms) < self.max_samples:
+                self.samples_ms.append(lag_ms)
+
+    def stats(self) -> dict:
+        """Lag summary in milliseconds."""
+        if not self.samples_ms:
+            return {"loop_lag_p99_ms": 0.0, "loop_lag_max_ms": 0.0, "loop_blocked_ms": 0.0}
+        arr = np.asarray(self.samples_ms)
+        return {
+            "loop_lag_p99_ms": round(float(np.percentile(arr, 99)), 2),
+            "loop_lag_max_ms": round(float(arr.max()), 2),
+            "loop_blocked_ms": round(self.blocked_ms, 1),
+        }
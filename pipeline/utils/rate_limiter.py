@@ -0,0 +1,104 @@
+"""Requests-per-minute and tokens-per-minute limiting for LLM calls."""
+
+import asyncio
+import time
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for pacing."""
+    return max(1, len(text) // 4)
+
+
+class RateLimiter:
+    """Sliding-window limiter for requests and tokens per minute.
+
+    ``acquire()`` waits until one more request of the given size fits in the
+    last ``window`` seconds, then reserves it. Callers reserve an upper bound
+    (prompt plus maximum output) and ``settle()`` the reservation with the
+    real size once the response is in, which frees the unused budget.
+    Waiters are served in arrival order.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, window: float = 60.0):
+        """Initialize limiter.
+
+        Args:
+            rpm: Requests per window (0 = unlimited)
+            tpm: Tokens per window (0 = unlimited)
+            window: Window length in seconds
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self.waited_s = 0.0
+        self._events: list[list[float]] = []  # [timestamp, tokens] per request
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rpm > 0 or self.tpm > 0
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._events and self._events[0][0] <= cutoff:
+            self._events.pop(0)
+
+    def _delay(self, tokens: int, now: float) -> float:
+        """Seconds until a request of this size fits (0 if it fits now)."""
+        if not self._events:
+            return 0.0
+
+        delay = 0.0
+        if self.rpm and len(self._events) >= self.rpm:
+            oldest = self._events[len(self._events) - self.rpm][0]
+            delay = max(delay, oldest + self.window - now)
+
+        if self.tpm:
+            excess = sum(t for _, t in self._events) + tokens - self.tpm
+            # Wait for the oldest requests holding the excess tokens to expire
+            for timestamp, used in self._events:
+                if excess <= 0:
+                    break
+                excess -= used
+                delay = max(delay, timestamp + self.window - now)
+        return delay
+
+    def wait_time(self, tokens: int = 0) -> float:
+        """Seconds a request of this size would wait right now (0 = within quota)."""
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        self._prune(now)
+        return max(0.0, self._delay(tokens, now))
+
+    async def acquire(self, tokens: int = 0) -> list[float]:
+        """Wait for capacity and reserve one request.
+
+        Args:
+            tokens: Tokens to reserve (a request larger than ``tpm`` runs
+                alone once the window is empty)
+
+        Returns:
+            Reservation handle for ``settle()``
+        """
+        reservation = [0.0, float(tokens)]
+        if not self.enabled:
+            return reservation
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._prune(now)
+                delay = self._delay(tokens, now)
+                if delay <= 0:
+                    break
+                self.waited_s += delay
+                await asyncio.sleep(delay)
+
+            reservation[0] = now
+            self._events.append(reservation)
+        return reservation
+
+    def settle(self, reservation: list[float], tokens: int) -> None:
+        """Replace a reservation's token count with the actual usage."""
+        reservation[1] = float(tokens)
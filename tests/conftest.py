@@ -0,0 +1,97 @@
+"""Shared fixtures: every test gets its own settings and on-disk state."""
+
+import pytest
+
+from pipeline import config
+from pipeline.embeddings.backends import HashingEmbeddingBackend
+from pipeline.embeddings.chunker import Chunk
+
+
+@pytest.fixture(autouse=True)
+def settings(tmp_path, monkeypatch):
+    """Fresh settings with API keys stubbed and state files under tmp_path.
+
+    The index is the embedded NumPy store with the offline hashing
+    embedder, so retrieval and generation run without network access.
+    """
+    monkeypatch.chdir(tmp_path)
+    env = {
+        "GOOGLE_API_KEY": "test",
+        "ANTHROPIC_API_KEY": "",
+        "LLM_CACHE": "false",
+        "LLM_CACHE_DIR": str(tmp_path / "llm_cache"),
+        "LLM_REPLAY": "false",
+        "CONTEXT_CACHE": "true",
+        "USAGE_LEDGER_PATH": str(tmp_path / "usage_ledger.json"),
+        "LLM_DAILY_REQUESTS": "0",
+        "LLM_DAILY_TOKENS": "0",
+        "CLAUDE_DAILY_REQUESTS": "0",
+        "CLAUDE_DAILY_TOKENS": "0",
+        "VECTOR_STORE": "numpy",
+        "EMBEDDING_MODEL": "local/hashing-384",
+        "CHROMA_PERSIST_DIR": str(tmp_path / "index"),
+        "FLASHCARDS_DIR": str(tmp_path / "flashcards"),
+        "PUBLISHED_INDEX_PATH": str(tmp_path / "published_index.json"),
+    }
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(config, "_settings", None)
+    yield config.get_settings()
+    monkeypatch.setattr(config, "_settings", None)
+
+
+@pytest.fixture
+def make_chunk():
+    """Chunk factory; a chunk is its own source unless given a position."""
+
+    def make(chunk_id: str, content: str, topic: str = "swift", position: int = 0) -> Chunk:
+        source_id = chunk_id.rsplit("_", 1)[0] if position else chunk_id
+        return Chunk(
+            id=chunk_id,
+            content=content,
+            token_count=len(content.split()),
+            source_id=source_id,
+            source_url=f"https://example.com/{source_id}",
+            topic=topic,
+            position=position,
+        )
+
+    return make
+
+
+@pytest.fixture
+def embed():
+    """Offline embeddings of texts (the configured hashing backend)."""
+    backend = HashingEmbeddingBackend("local/hashing-384")
+    return backend.embed
+
+
+@pytest.fixture
+def index_chunks(embed):
+    """Index chunks into the test index, keywords included; returns the Indexer."""
+    from pipeline.embeddings.indexer import Indexer
+
+    def index(chunks: list[Chunk], indexer: Indexer | None = None) -> Indexer:
+        indexer = indexer or Indexer()
+        indexer.index(list(zip(chunks, embed([c.content for c in chunks]))))
+        indexer.build_lexical_index(chunks)
+        return indexer
+
+    return index
+
+
+@pytest.fixture
+def make_generator():
+    """FlashcardGenerator over the test index, answering through stub providers."""
+    from pipeline.clients import LLMRouter
+    from pipeline.generation import FlashcardGenerator
+
+    def make(*providers, **attributes) -> FlashcardGenerator:
+        generator = FlashcardGenerator()
+        if providers:
+            generator.llm = LLMRouter(list(providers), hedge=False)
+        for name, value in attributes.items():
+            setattr(generator, name, value)
+        return generator
+
+    return make
@@ -0,0 +1,81 @@
+"""Async store facade: batching concurrent requests on the thread pool."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from pipeline.stores import AsyncVectorStore, NumpyVectorStore
+
+
+@pytest.fixture
+async def vector_io():
+    facade = AsyncVectorStore(NumpyVectorStore(), batch_window=0.01)
+    yield facade
+    facade.close()
+
+
+def fill(store, n=12):
+    vectors = np.random.default_rng(0).normal(size=(n, 8))
+    store.upsert(
+        [f"c{i}" for i in range(n)],
+        vectors.tolist(),
+        [f"doc {i}" for i in range(n)],
+        [{"topic": "swift" if i % 2 else "uikit"} for i in range(n)],
+    )
+    store.flush()
+    return vectors
+
+
+async def test_concurrent_queries_share_one_store_call(vector_io):
+    vectors = fill(vector_io.store)
+    wheres = [None, {"topic": "swift"}, None, {"topic": "uikit"}]
+
+    found = await asyncio.gather(
+        *(vector_io.query(v.tolist(), 3, where) for v, where in zip(vectors, wheres))
+    )
+
+    direct = vector_io.store.query_batch(vectors[:4].tolist(), 3, wheres)
+    assert [r["ids"] for r in found] == direct["ids"]
+    assert (vector_io.batches, vector_io.calls) == (1, 1)
+    assert vector_io.stats()["avg_batch"] == 4
+
+
+async def test_full_batches_run_without_waiting_for_the_window(vector_io):
+    vector_io.batch_window = 60.0
+    vector_io.max_batch = 3
+
+    found = await asyncio.wait_for(
+        vector_io.batched("key", [1, 2, 3], lambda items: [i * 10 for i in items]), 1
+    )
+
+    assert found == [10, 20, 30]
+
+
+async def test_store_errors_reach_every_waiter(vector_io):
+    def fail(items):
+        raise RuntimeError("disk full")
+
+    results = await asyncio.gather(
+        vector_io.batched("key", [1], fail),
+        vector_io.batched("key", [2], fail),
+        return_exceptions=True,
+    )
+
+    assert [str(r) for r in results] == ["disk full", "disk full"]
+    assert vector_io.batches == 1
+
+
+async def test_cancelled_batch_cancels_its_waiters(vector_io, monkeypatch):
+    async def cancelled(fn, *args):
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(vector_io, "run", cancelled)
+    waiters = [
+        asyncio.ensure_future(vector_io.batched("key", [i], lambda items: items))
+        for i in range(3)
+    ]
+
+    await asyncio.wait(waiters, timeout=1)
+
+    assert all(waiter.cancelled() for waiter in waiters)
@@ -0,0 +1,72 @@
+"""Several cards per request: keyed JSON arrays and individual retries."""
+
+import json
+import re
+
+from pipeline.generation.models import FlashcardDraft, card_id
+
+
+def card(front, **fields):
+    return {
+        "front": front,
+        "summary": "A short summary.",
+        "back": "The answer.",
+        "tags": [],
+        "swift_version": None,
+        "confidence": 0.9,
+        **fields,
+    }
+
+
+class BatchProvider:
+    """Answers a batch with one card per subtopic key, except for ``skip``."""
+
+    name = "stub"
+
+    def __init__(self, skip=(), invalid=()):
+        self.skip = set(skip)
+        self.invalid = set(invalid)
+        self.schemas = []
+
+    async def generate(self, prompt, max_tokens, schema, system, shared=""):
+        self.schemas.append(schema)
+        if schema is FlashcardDraft:
+            subtopic = re.search(r"swift: (.+)", prompt).group(1).strip()
+            return json.dumps(card(f"Retried {subtopic}?"))
+
+        items = []
+        for key, subtopic in re.findall(r"=== \[(c\d+)\] (.+?) ===", prompt):
+            if subtopic in self.skip:
+                continue
+            confidence = 2.0 if subtopic in self.invalid else 0.9
+            items.append(card(f"Batched {subtopic}?", key=key, confidence=confidence))
+        return json.dumps(items)
+
+
+async def test_one_request_covers_every_subtopic(make_generator):
+    provider = BatchProvider()
+    generator = make_generator(provider, stream=False, topic_packer=None)
+    subtopics = ["actors", "sendable", "macros"]
+
+    results = await generator.generate_many("swift", subtopics, retrieved=[{}] * 3)
+
+    assert len(provider.schemas) == 1
+    assert [r.flashcard.front for r in results] == [f"Batched {s}?" for s in subtopics]
+    assert [r.flashcard.id for r in results] == [card_id("swift", s) for s in subtopics]
+    assert [r.flashcard.tags for r in results] == [[s] for s in subtopics]
+
+
+async def test_missing_or_invalid_cards_are_retried_individually(make_generator):
+    provider = BatchProvider(skip={"sendable"}, invalid={"macros"})
+    generator = make_generator(provider, stream=False, topic_packer=None)
+
+    results = await generator.generate_many(
+        "swift", ["actors", "sendable", "macros"], retrieved=[{}] * 3
+    )
+
+    assert [r.flashcard.front for r in results] == [
+        "Batched actors?",
+        "Retried sendable?",
+        "Retried macros?",
+    ]
+    assert provider.schemas.count(FlashcardDraft) == 2
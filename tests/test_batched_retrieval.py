@@ -0,0 +1,45 @@
+"""Batched multi-query retrieval on the Indexer."""
+
+import pytest
+
+CHUNKS = [
+    ("actors", "Actors protect mutable state with isolation.", "swift"),
+    ("sendable", "Sendable types can cross concurrency domains.", "swift"),
+    ("tasks", "Task groups run child tasks concurrently.", "swift"),
+    ("layout", "Auto Layout resolves constraints into frames.", "uikit"),
+    ("stacks", "Stack views arrange subviews along an axis.", "uikit"),
+]
+
+
+@pytest.fixture
+def indexer(settings, make_chunk, index_chunks):
+    settings.retrieval_cache = False
+    return index_chunks([make_chunk(i, text, topic) for i, text, topic in CHUNKS])
+
+
+def test_batch_matches_one_query_at_a_time(indexer, embed):
+    queries = embed(["actor isolation", "layout constraints", "child tasks"])
+    topics = ["swift", None, "swift"]
+
+    batch = indexer.query_batch(queries, topics, n_results=2)
+
+    assert batch == [
+        indexer.query(query, topic=topic, n_results=2) for query, topic in zip(queries, topics)
+    ]
+    assert batch[0]["ids"][0][0] == "actors"
+    assert batch[1]["ids"][0][0] == "layout"
+    assert {m["topic"] for m in batch[2]["metadatas"][0]} == {"swift"}
+
+
+def test_unfiltered_fallback_only_for_topics_without_hits(indexer, embed):
+    queries = embed(["stack views", "stack views"])
+
+    plain = indexer.query_batch(queries, ["combine", "uikit"], n_results=2)
+    fallback = indexer.query_batch(
+        queries, ["combine", "uikit"], n_results=2, fallback_unfiltered=True
+    )
+
+    assert plain[0]["ids"] == [[]]
+    assert fallback[0]["ids"][0][0] == "stacks"
+    assert fallback[1] == plain[1]
+    assert indexer.query_batch([], n_results=2) == []
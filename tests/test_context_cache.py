@@ -0,0 +1,233 @@
+"""Provider context caching against the stub transports."""
+
+import asyncio
+import time
+
+import pytest
+
+from pipeline.clients import (
+    ClaudeClient,
+    GeminiClient,
+    GeminiContextCache,
+    StubAnthropicTransport,
+    StubGeminiTransport,
+)
+from pipeline.clients.context_cache import cache_control
+from pipeline.clients.router import GeminiProvider
+
+MODEL = "gemini-test"
+SYSTEM = "You write flashcards. " * 400  # ~2200 estimated tokens
+SHARED = "Topic context. " * 200
+
+
+@pytest.fixture
+def transport():
+    return StubGeminiTransport(lambda prompt: '{"ok": true}')
+
+
+async def test_creates_cache_once_and_reuses_it(transport):
+    cache = GeminiContextCache(transport, ttl=600, min_tokens=1024)
+
+    first = await cache.get(MODEL, SYSTEM, SHARED)
+    second = await cache.get(MODEL, SYSTEM, SHARED)
+
+    assert first is not None
+    assert first == second
+    assert cache.created == 1
+    assert list(transport.caches) == [first]
+
+
+async def test_distinct_prefixes_get_distinct_caches(transport):
+    cache = GeminiContextCache(transport, ttl=600, min_tokens=1024)
+
+    first = await cache.get(MODEL, SYSTEM, SHARED)
+    other = await cache.get(MODEL, SYSTEM, "Other topic. " * 200)
+
+    assert first != other
+    assert cache.created == 2
+
+
+async def test_prefix_below_min_tokens_is_not_cached(transport):
+    cache = GeminiContextCache(transport, ttl=600, min_tokens=4096)
+
+    assert await cache.get(MODEL, SYSTEM) is None
+    assert await cache.get(MODEL, SYSTEM) is None
+    assert cache.created == 0
+    assert transport.caches == {}
+
+
+async def test_refreshes_ttl_shortly_before_expiry(transport):
+    cache = GeminiContextCache(transport, ttl=600, min_tokens=1024)
+    name = await cache.get(MODEL, SYSTEM)
+    handle = next(iter(cache._handles.values()))
+    handle.expires_at = time.time() + 30  # inside the refresh margin
+
+    assert await cache.get(MODEL, SYSTEM) == name
+    assert cache.refreshed == 1
+    assert cache.created == 1
+    assert handle.expires_at > time.time() + 500
+    assert transport.caches[name][1] > time.time() + 500
+
+
+async def test_expired_cache_is_recreated(transport):
+    cache = GeminiContextCache(transport, ttl=600, min_tokens=1024)
+    name = await cache.get(MODEL, SYSTEM)
+    next(iter(cache._handles.values())).expires_at = time.time() - 1
+
+    renewed = await cache.get(MODEL, SYSTEM)
+
+    assert renewed != name
+    assert cache.created == 2
+
+
+async def test_close_deletes_live_caches(transport):
+    cache = GeminiContextCache(transport, ttl=600, min_tokens=1024)
+    await cache.get(MODEL, SYSTEM)
+
+    await cache.close()
+
+    assert transport.caches == {}
+
+
+async def test_gemini_reports_cached_tokens(settings, transport):
+    settings.context_cache_min_tokens = 1024
+    client = GeminiClient(transport=transport)
+
+    await client.generate("Card 1", system=SYSTEM, shared=SHARED)
+    await client.generate("Card 2", system=SYSTEM, shared=SHARED)
+
+    assert client.context_cache.created == 1
+    assert all("cached_content" in call["config"] for call in transport.calls)
+    assert client.usage.requests == 2
+    assert client.usage.cached_tokens > 0
+    assert client.usage.cached_tokens > client.usage.input_tokens
+
+
+async def test_gemini_retries_uncached_when_cache_is_gone(settings, transport):
+    settings.context_cache_min_tokens = 1024
+    client = GeminiClient(transport=transport)
+    name = await client.context_cache.get(client.model, SYSTEM)
+    transport.caches[name] = (transport.caches[name][0], time.time() - 1)
+
+    assert await client.generate("Card", system=SYSTEM) == '{"ok": true}'
+
+    assert transport.calls[-1]["config"]["system_instruction"] == SYSTEM
+    assert "cached_content" not in transport.calls[-1]["config"]
+    assert client.context_cache._handles == {}
+
+
+async def test_gemini_small_prefix_uses_implicit_caching(settings, transport):
+    client = GeminiClient(transport=transport)  # default minimum 4096 tokens
+
+    await client.generate("Card 1", system=SYSTEM)
+    await client.generate("Card 2", system=SYSTEM)
+
+    assert transport.caches == {}
+    assert client.usage.cached_tokens > 0  # second request repeats the prefix
+
+
+async def test_claude_writes_then_reads_prompt_cache():
+    transport = StubAnthropicTransport(lambda prompt: "answer")
+    client = ClaudeClient(transport=transport)
+
+    await client.generate("Card 1", system=SYSTEM, shared=SHARED)
+    first = client.usage.summary()
+    await client.generate("Card 2", system=SYSTEM, shared=SHARED)
+
+    assert first["cache_write_tokens"] > 0
+    assert first["cached_tokens"] == 0
+    assert client.usage.cached_tokens == first["cache_write_tokens"]
+    assert all(
+        block["cache_control"] == cache_control(client.cache_ttl)
+        for block in transport.calls[0]["system"]
+    )
+
+
+async def test_claude_without_prompt_caching_bills_full_input(settings):
+    settings.context_cache = False
+    transport = StubAnthropicTransport(lambda prompt: "answer")
+    client = ClaudeClient(transport=transport)
+
+    await client.generate("Card 1", system=SYSTEM)
+    await client.generate("Card 2", system=SYSTEM)
+
+    assert client.usage.cached_tokens == 0
+    assert client.usage.cache_write_tokens == 0
+    assert client.usage.input_tokens > 2 * 2000
+
+
+def test_cache_control_ttl():
+    assert cache_control(300) == {"type": "ephemeral"}
+    assert cache_control(3600) == {"type": "ephemeral", "ttl": "1h"}
+
+
+CARD = (
+    '{"front": "Why use an actor?", "summary": "Isolation.", "back": "Actors serialize '
+    'access to their state.", "tags": [], "swift_version": null, "confidence": 0.9}'
+)
+
+
+def background(topic, n=12, words=350):
+    return [
+        (f"{topic}_doc{i}", " ".join(f"{topic} background {i} line {w}." for w in range(words)))
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def topic_index(index_chunks, make_chunk):
+    chunks = [
+        make_chunk(chunk_id, text, topic)
+        for topic in ("swift", "uikit")
+        for chunk_id, text in background(topic)
+    ]
+    return index_chunks(chunks)
+
+
+async def test_generator_topic_background_engages_the_gemini_cache(
+    settings, topic_index, make_generator
+):
+    assert settings.context_cache_min_tokens == 4096  # the Pro models' floor
+    transport = StubGeminiTransport(lambda prompt: CARD)
+    client = GeminiClient(transport=transport)
+    generator = make_generator(GeminiProvider(client), stream=False)
+
+    for subtopic in ("actors", "sendable"):
+        await generator.generate("swift", subtopic)
+    await generator.generate("uikit", "collection views")
+
+    assert client.context_cache.created == 2  # one per topic
+    assert all("cached_content" in call["config"] for call in transport.calls)
+    assert client.usage.cached_tokens > client.usage.input_tokens
+
+
+async def test_system_prompt_alone_is_below_the_cache_floor(
+    settings, topic_index, make_generator
+):
+    settings.topic_context_tokens = 0
+    transport = StubGeminiTransport(lambda prompt: CARD)
+    client = GeminiClient(transport=transport)
+    generator = make_generator(GeminiProvider(client), stream=False)
+
+    await generator.generate("swift", "actors")
+
+    assert transport.caches == {}
+    assert "cached_content" not in transport.calls[0]["config"]
+
+
+async def test_topic_background_is_retrieved_once_per_topic(topic_index, make_generator):
+    generator = make_generator()
+    searches = []
+    retrieve = generator._retrieve
+
+    async def counting(requests, n_context):
+        searches.append(requests)
+        return await retrieve(requests, n_context)
+
+    generator._retrieve = counting
+    texts = await asyncio.gather(*(generator.topic_context("swift") for _ in range(3)))
+
+    assert len(set(texts)) == 1
+    assert "swift background" in texts[0]
+    assert searches == [[("swift", "swift")]]
+    assert await generator.topic_context("swift") == texts[0]
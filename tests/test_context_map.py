@@ -0,0 +1,73 @@
+"""Context map: subtopic contexts precomputed at embed time, refreshed selectively."""
+
+import pytest
+
+from pipeline.embeddings import Embedder
+from pipeline.generation import context_map as context_map_module
+from pipeline.generation.context_map import ContextMap, search_context
+
+TOPICS = {
+    "swift": ["actor isolation", "sendable closures"],
+    "uikit": ["auto layout constraints"],
+}
+
+TEXTS = [
+    ("actors", "Actor isolation protects mutable state in Swift.", "swift"),
+    ("sendable", "Sendable closures capture only sendable values.", "swift"),
+    ("generics", "Generic functions are specialized by the compiler.", "swift"),
+    ("layout", "Auto Layout constraints resolve into view frames.", "uikit"),
+    ("stacks", "Stack views arrange subviews along an axis.", "uikit"),
+]
+
+
+@pytest.fixture
+def indexer(monkeypatch, make_chunk, index_chunks):
+    monkeypatch.setattr(context_map_module, "SENIOR_IOS_TOPICS", TOPICS)
+    return index_chunks([make_chunk(i, text, topic) for i, text, topic in TEXTS])
+
+
+async def test_lookups_match_a_live_search(indexer, tmp_path, embed):
+    built = ContextMap(tmp_path / "context_map")
+    assert await built.refresh(indexer, Embedder(), n_context=2, full=True) == 3
+
+    context_map = ContextMap.load(tmp_path / "context_map")
+    requests = [("swift", "actor isolation"), ("uikit", "auto layout constraints")]
+    found = context_map.lookup(indexer, requests + [("swift", "unknown")], n_context=2)
+
+    queries = embed([context_map_module.query_text(*r) for r in requests])
+    live = search_context(indexer, list(zip(requests, queries)), 2)
+    assert found[:2] == [
+        {**result, "distances": [[pytest.approx(d, abs=1e-5) for d in result["distances"][0]]]}
+        for result in live
+    ]
+    assert found[2] is None
+    assert (context_map.hits, context_map.misses) == (2, 1)
+    assert context_map.lookup(indexer, requests, n_context=3) == [None, None]
+
+
+async def test_refresh_recomputes_only_affected_subtopics(indexer, tmp_path, make_chunk, embed):
+    context_map = ContextMap(tmp_path / "context_map")
+    await context_map.refresh(indexer, Embedder(), n_context=2, full=True)
+    previous = indexer.epoch
+
+    chunk = make_chunk("constraints", "Auto Layout constraints can be activated.", "uikit")
+    changed = [(chunk, embed([chunk.content])[0])]
+    indexer.index(changed)
+    indexer.build_lexical_index([make_chunk(i, t, topic) for i, t, topic in TEXTS] + [chunk])
+    assert context_map.lookup(indexer, [("uikit", "auto layout constraints")], 2) == [None]
+
+    recomputed = await context_map.refresh(
+        indexer, Embedder(), changed, previous_epoch=previous, n_context=2
+    )
+
+    entry = context_map.entries[ContextMap.key("uikit", "auto layout constraints")]
+    assert recomputed == 1
+    assert "constraints" in entry.candidates
+    assert context_map.is_current(indexer, 2)
+
+
+async def test_a_map_from_another_index_state_is_rebuilt(indexer, tmp_path):
+    context_map = ContextMap(tmp_path / "context_map")
+    await context_map.refresh(indexer, Embedder(), n_context=2, full=True)
+
+    assert await context_map.refresh(indexer, Embedder(), previous_epoch="other", n_context=2) == 3
@@ -0,0 +1,66 @@
+"""Token-budgeted context packing of retrieved chunks."""
+
+from pipeline.generation.context_packer import SEPARATOR, ContextPacker
+
+LONG = " ".join(f"Sentence {i} explains one more detail about actor reentrancy." for i in range(60))
+
+
+def retrieved(*chunks):
+    """Query result with (id, text, metadata) chunks, best first."""
+    return {
+        "ids": [[chunk_id for chunk_id, _, _ in chunks]],
+        "documents": [[text for _, text, _ in chunks]],
+        "metadatas": [[meta for _, _, meta in chunks]],
+    }
+
+
+def test_chunks_within_budget_are_packed_in_rank_order():
+    packer = ContextPacker(budget=2000)
+    chunks = [
+        ("a", "Actors serialize access.", {"source_url": "https://a"}),
+        ("b", "Tasks inherit priority.", {"source_url": "https://b"}),
+    ]
+
+    packed = packer.pack(retrieved(*chunks))
+
+    assert packed.text == SEPARATOR.join(text for _, text, _ in chunks)
+    assert packed.tokens == packer.count(packed.text)
+    assert packed.chunk_ids == ["a", "b"]
+    assert packed.source_urls == ["https://a", "https://b"]
+    assert packer.pack({}).text == ""
+
+
+def test_over_budget_chunks_are_cut_at_a_sentence_or_skipped():
+    packer = ContextPacker(budget=300, min_fragment=20)
+    short = "Sendable values cross actor boundaries safely."
+
+    packed = packer.pack(
+        retrieved(("huge", "word " * 400, {}), ("short", short, {}), ("long", LONG, {}))
+    )
+
+    assert packed.tokens <= 300
+    assert packed.tokens == packer.count(packed.text)
+    assert packed.chunks[1].endswith(".") and LONG.startswith(packed.chunks[1])
+    assert len(packed.chunks[1]) < len(LONG)
+    assert packed.chunk_ids == ["short", "long"]
+    assert packed.dropped_ids == ["huge"]
+
+
+def test_text_shared_with_a_packed_neighbour_is_not_repeated():
+    packer = ContextPacker(budget=2000)
+    shared = "Calls from outside the actor are awaited, because they may suspend."
+    first = f"Actors serialize access to their state. {shared}"
+    second = f"{shared} Isolation is checked at compile time."
+
+    packed = packer.pack(
+        retrieved(
+            ("doc_1", first, {"source_id": "doc", "merged_ids": ["doc_1", "doc_0"]}),
+            ("doc_2", second, {"source_id": "doc"}),
+            ("doc_3", shared, {"source_id": "doc"}),
+        )
+    )
+
+    assert packed.text.count(shared) == 1
+    assert packed.chunks[1] == "Isolation is checked at compile time."
+    assert packed.chunk_ids == ["doc_1", "doc_0", "doc_2", "doc_3"]
+    assert packed.trimmed_tokens > 0
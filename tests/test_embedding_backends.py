@@ -0,0 +1,48 @@
+"""Offline hashing embeddings and backend selection by model ID."""
+
+import numpy as np
+import pytest
+
+from pipeline.embeddings import Embedder
+from pipeline.embeddings.backends import HashingEmbeddingBackend, get_embedding_backend
+
+
+def test_hashing_vectors_are_deterministic_and_normalized():
+    texts = ["Actors isolate mutable state", "", "actors ISOLATE mutable state"]
+
+    first = np.array(HashingEmbeddingBackend("local/hashing").embed(texts))
+    second = np.array(HashingEmbeddingBackend("local/hashing").embed(texts))
+
+    np.testing.assert_array_equal(first, second)
+    assert first.shape == (3, 384)
+    assert np.linalg.norm(first[0]) == pytest.approx(1.0)
+    assert not first[1].any()  # no tokens, no features
+    np.testing.assert_array_equal(first[0], first[2])  # case-insensitive
+
+
+def test_shared_words_score_higher_than_unrelated_text():
+    backend = HashingEmbeddingBackend("local/hashing", dimensions=256)
+    query, related, unrelated = np.array(
+        backend.embed(
+            [
+                "actor isolation in swift concurrency",
+                "swift concurrency uses actor isolation for shared state",
+                "auto layout constraints resolve view frames",
+            ]
+        )
+    )
+
+    assert query @ related > query @ unrelated
+
+
+def test_model_id_selects_the_local_width():
+    assert get_embedding_backend("local/hashing-64").dimensions == 64
+    assert get_embedding_backend("local/hashing").dimensions == 384
+    with pytest.raises(ValueError, match="Unknown local embedding model"):
+        get_embedding_backend("local/word2vec")
+
+
+async def test_embedder_uses_the_configured_backend(embed):
+    embedder = Embedder()
+
+    assert await embedder.embed_query("sendable closures") == embed(["sendable closures"])[0]
@@ -0,0 +1,106 @@
+"""Concurrency bound of the generation engine, retries included."""
+
+import asyncio
+import json
+
+import pytest
+
+from pipeline.generation import GenerationEngine
+from pipeline.generation.models import FlashcardDraft
+
+CARD = json.dumps(
+    {
+        "front": "What does the question ask?",
+        "summary": "A short summary.",
+        "back": "The answer.",
+        "tags": [],
+        "swift_version": None,
+        "confidence": 0.9,
+    }
+)
+
+
+class TrackingProvider:
+    """Stub provider recording its peak concurrency; batch requests fail."""
+
+    name = "stub"
+
+    def __init__(self, latency_s=0.02):
+        self.latency_s = latency_s
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def generate(self, prompt, max_tokens, schema, system, shared=""):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency_s)
+        finally:
+            self.in_flight -= 1
+        if schema is not FlashcardDraft:
+            raise RuntimeError("batch output unusable")
+        return CARD
+
+
+async def test_individual_retries_stay_within_concurrency(make_generator):
+    provider = TrackingProvider()
+    generator = make_generator(provider, stream=False, topic_packer=None)
+    engine = GenerationEngine(generator, concurrency=2, cards_per_request=5)
+    plan = [(topic, f"subtopic {i}") for topic in ("swift", "uikit") for i in range(5)]
+
+    outcomes = [
+        outcome async for outcome in engine.as_completed(plan, [{}] * len(plan))
+    ]
+
+    assert all(outcome.ok for outcome in outcomes)
+    assert provider.calls == 2 + len(plan)  # two failed batches, then one call per card
+    assert provider.peak <= 2
+    assert engine.stats.requests == provider.calls
+
+
+async def test_single_group_retries_are_serialised_at_concurrency_one(make_generator):
+    provider = TrackingProvider()
+    generator = make_generator(provider, stream=False, topic_packer=None)
+    engine = GenerationEngine(generator, concurrency=1, cards_per_request=4)
+    plan = [("swift", f"subtopic {i}") for i in range(4)]
+
+    outcomes = [
+        outcome async for outcome in engine.as_completed(plan, [{}] * len(plan))
+    ]
+
+    assert len(outcomes) == 4
+    assert provider.peak == 1
+
+
+class CardProvider(TrackingProvider):
+    """Tracking provider whose every request returns one card."""
+
+    async def generate(self, prompt, max_tokens, schema, system, shared=""):
+        await super().generate(prompt, max_tokens, FlashcardDraft, system, shared)
+        return CARD
+
+
+async def test_generate_all_topics_runs_within_generation_concurrency(settings, make_generator):
+    settings.generation_concurrency = 3
+    provider = CardProvider()
+    generator = make_generator(provider, stream=False, topic_packer=None)
+    topics = {"swift": [f"s{i}" for i in range(6)], "uikit": [f"u{i}" for i in range(6)]}
+
+    results = await generator.generate_all_topics(topics)
+
+    assert {topic: len(cards) for topic, cards in results.items()} == {"swift": 6, "uikit": 6}
+    assert {r.flashcard.topic for r in results["uikit"]} == {"uikit"}
+    assert 1 < provider.peak <= 3
+
+
+async def test_delay_is_accepted_but_deprecated(make_generator):
+    generator = make_generator(CardProvider(), stream=False, topic_packer=None)
+
+    with pytest.warns(DeprecationWarning, match="delay is ignored"):
+        results = await generator.generate_batch("swift", ["actors"], delay=1.0)
+    with pytest.warns(DeprecationWarning):
+        await generator.generate_all_topics({"swift": ["sendable"]}, 0.5)
+
+    assert len(results) == 1
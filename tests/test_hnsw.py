@@ -0,0 +1,42 @@
+"""HNSW parameters of Chroma collections and the benchmark's recall metrics."""
+
+import logging
+
+import numpy as np
+
+from pipeline.benchmarks.metrics import exact_top_k, recall_at_k
+from pipeline.clients.chroma_client import ChromaClient
+
+
+def built_with(client):
+    hnsw = client.collection.configuration["hnsw"]
+    return hnsw["max_neighbors"], hnsw["ef_construction"], hnsw["ef_search"]
+
+
+def test_new_collections_use_the_configured_parameters(settings, tmp_path):
+    settings.hnsw_m, settings.hnsw_construction_ef, settings.hnsw_search_ef = 8, 40, 30
+
+    assert built_with(ChromaClient("defaults", str(tmp_path))) == (8, 40, 30)
+    assert built_with(ChromaClient("custom", str(tmp_path), hnsw={"search_ef": 12})) == (8, 40, 12)
+
+
+def test_reopening_applies_search_ef_but_only_warns_about_build_parameters(tmp_path, caplog):
+    client = ChromaClient("docs", str(tmp_path), hnsw={"m": 8, "construction_ef": 50})
+    client.add(["a"], [[0.1, 0.2]], ["doc"], [{"topic": "swift"}])
+
+    with caplog.at_level(logging.WARNING):
+        reopened = ChromaClient("docs", str(tmp_path), hnsw={"m": 16, "search_ef": 77})
+
+    assert built_with(reopened) == (8, 50, 77)
+    assert "run embed --full to apply M=16" in caplog.text
+
+
+def test_recall_against_exact_top_k():
+    matrix = np.eye(4, dtype=np.float32)
+    queries = np.array([[1.0, 0.5, 0, 0], [0, 0, 0.2, 1.0]], dtype=np.float32)
+
+    expected = exact_top_k(matrix, queries, k=2)
+
+    assert expected.tolist() == [[0, 1], [3, 2]]
+    assert recall_at_k([["0", "2"], ["3", "2"]], [["0", "1"], ["3", "2"]]) == 0.75
+    assert recall_at_k([[]], [[]]) == 0.0
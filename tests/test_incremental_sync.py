@@ -0,0 +1,59 @@
+"""Incremental embed: only new or changed chunks are embedded, vanished ones deleted."""
+
+from pipeline.embeddings import Indexer
+
+
+def corpus(make_chunk, **overrides):
+    texts = {
+        "actors_1": "Actors protect mutable state.",
+        "actors_2": "Actor methods are called with await.",
+        "layout_1": "Auto Layout resolves constraints.",
+        "layout_2": "Stack views arrange subviews.",
+    }
+    texts.update(overrides)
+    return [
+        make_chunk(chunk_id, text, position=int(chunk_id.rsplit("_", 1)[1]))
+        for chunk_id, text in texts.items()
+        if text is not None
+    ]
+
+
+def test_unchanged_corpus_plans_nothing(make_chunk, index_chunks):
+    chunks = corpus(make_chunk)
+    index_chunks(chunks)
+
+    plan = Indexer().plan_sync(chunks)
+
+    assert plan.is_empty
+    assert plan.unchanged == 4
+
+
+def test_plan_embeds_changes_and_deletes_vanished_chunks(make_chunk, index_chunks, embed):
+    index_chunks(corpus(make_chunk))
+    chunks = corpus(
+        make_chunk,
+        actors_2="Actor methods are awaited from outside the actor.",
+        layout_1=None,
+        layout_2=None,
+        tasks_1="Task groups run child tasks.",
+    )
+
+    indexer = Indexer()
+    plan = indexer.plan_sync(chunks)
+    indexer.delete(plan.to_delete)
+    indexer.index(list(zip(plan.to_embed, embed([c.content for c in plan.to_embed]))))
+
+    assert sorted(c.id for c in plan.to_embed) == ["actors_2", "tasks_1"]
+    assert sorted(plan.to_delete) == ["layout_1", "layout_2"]
+    assert plan.unchanged == 1
+    assert Indexer().stored_hashes() == {c.id: c.content_hash for c in chunks}
+    assert Indexer().plan_sync(chunks).is_empty
+
+
+def test_model_or_size_change_needs_a_rebuild(make_chunk, index_chunks):
+    index_chunks(corpus(make_chunk))
+    indexer = Indexer()
+
+    assert not indexer.needs_rebuild("local/hashing-384", None)
+    assert indexer.needs_rebuild("local/hashing-256", None)
+    assert indexer.needs_rebuild("local/hashing-384", 128)
@@ -0,0 +1,62 @@
+"""BM25 keyword index and its reciprocal rank fusion with vector hits."""
+
+import numpy as np
+import pytest
+
+from pipeline.embeddings import BM25Index, tokenize
+from pipeline.embeddings.lexical import reciprocal_rank_fusion
+
+
+def test_identifiers_keep_their_whole_form_and_parts():
+    terms = tokenize("Use NSPersistentContainer with @Observable and URLSession.shared")
+
+    assert {"nspersistentcontainer", "ns", "persistent", "container"} <= set(terms)
+    assert {"@observable", "observable"} <= set(terms)
+    assert {"urlsession.shared", "urlsession", "shared"} <= set(terms)
+    assert "with" not in terms and "use" not in terms
+
+
+def test_bm25_ranks_rare_terms_and_filters_by_topic(tmp_path):
+    index = BM25Index().build(
+        ["a", "b", "c"],
+        [
+            "Views update when @Observable state changes.",
+            "State lives in views; views redraw often.",
+            "UIView layout passes run after constraint changes.",
+        ],
+        ["swiftui", "swiftui", "uikit"],
+    )
+    index.save(tmp_path / "bm25")
+    reloaded = BM25Index.load(tmp_path / "bm25")
+
+    assert [i for i, _ in index.search("observable views")] == ["a", "b"]
+    assert index.search("changes", topic="uikit") == reloaded.search("changes", topic="uikit")
+    assert [i for i, _ in index.search("changes", topic="uikit")] == ["c"]
+    assert index.search("changes", topic="combine") == []
+    assert index.search("unrelated words") == []
+    assert BM25Index.load(tmp_path / "missing") is None
+
+
+def test_fusion_favours_items_ranked_by_both_lists():
+    fused = reciprocal_rank_fusion([["x", "both"], ["y", "both"]], k=60)
+
+    assert fused[0][0] == "both"
+    assert fused[0][1] == pytest.approx(2 / 62)
+
+
+def test_keyword_only_hits_join_vector_results(settings, make_chunk, index_chunks, embed):
+    settings.retrieval_cache = False
+    texts = [f"Actors isolate shared mutable state, part {i}." for i in range(5)]
+    chunks = [make_chunk(f"actors{i}", text) for i, text in enumerate(texts)]
+    chunks.append(make_chunk("coredata", "NSPersistentContainer loads the Core Data stack."))
+    indexer = index_chunks(chunks)
+    query = embed(["actor isolation of mutable state"])[0]
+
+    plain = indexer.query_batch([query], n_results=2)[0]
+    hybrid = indexer.query_batch([query], n_results=2, query_texts=["NSPersistentContainer"])[0]
+
+    assert "coredata" not in plain["ids"][0]
+    assert "coredata" in hybrid["ids"][0]
+    position = hybrid["ids"][0].index("coredata")
+    expected = 1 - float(np.dot(query, embed([chunks[-1].content])[0]))
+    assert hybrid["distances"][0][position] == pytest.approx(expected, abs=1e-5)
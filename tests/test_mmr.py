@@ -0,0 +1,58 @@
+"""MMR reranking of retrieved context and merging of overlapping neighbours."""
+
+import numpy as np
+
+from pipeline.embeddings.mmr import collapse_adjacent, mmr_select, overlap_length
+
+
+def test_mmr_trades_relevance_for_diversity():
+    query = np.array([1.0, 0.0])
+    candidates = np.array([[1.0, 0.1], [1.0, 0.12], [0.6, 0.8]])
+
+    assert mmr_select(query, candidates, 3, lambda_mult=1.0) == [0, 1, 2]
+    assert mmr_select(query, candidates, 2, lambda_mult=0.3) == [0, 2]
+    assert mmr_select(query, candidates[:0], 2) == []
+
+
+def test_overlapping_neighbours_are_merged_once():
+    shared = "Calls from outside the actor are awaited, because they may suspend. "
+    first = "Actors serialize access to their state. " + shared
+    second = shared + "Isolation is checked at compile time."
+    meta = [
+        {"source_id": "actors", "position": 2},
+        {"source_id": "actors", "position": 1},
+        {"source_id": "layout", "position": 1},
+        {"source_id": "actors", "position": 4},
+    ]
+
+    collapsed = collapse_adjacent(
+        ["actors_2", "actors_1", "layout_1", "actors_4"],
+        [second, first, "Constraints resolve to frames.", "Unrelated later text."],
+        meta,
+        [0.2, 0.3, 0.4, 0.5],
+    )
+
+    assert overlap_length(first, second) == len(shared)
+    assert collapsed["ids"] == ["actors_2", "layout_1", "actors_4"]
+    assert collapsed["documents"][0] == first + second[len(shared) :]
+    assert collapsed["metadatas"][0]["merged_ids"] == ["actors_1", "actors_2"]
+    assert collapsed["distances"] == [0.2, 0.4, 0.5]
+    assert "merged_ids" not in collapsed["metadatas"][2]
+
+
+def test_diversify_drops_near_duplicates(settings, make_chunk, index_chunks, embed):
+    settings.retrieval_cache = False
+    texts = [
+        "Actors isolate mutable state from concurrent access.",
+        "Actors isolate mutable state from concurrent access!",
+        "Sendable checking keeps state safe across actors.",
+    ]
+    indexer = index_chunks([make_chunk(f"c{i}", text) for i, text in enumerate(texts)])
+    query = embed(["actors isolate mutable state"])
+    candidates = indexer.query_batch(query, n_results=3)
+
+    relevant = indexer.diversify(query, candidates, 2, lambda_mult=1.0)
+    diverse = indexer.diversify(query, candidates, 2, lambda_mult=0.3)
+
+    assert sorted(relevant[0]["ids"][0]) == ["c0", "c1"]
+    assert diverse[0]["ids"][0][1] == "c2"
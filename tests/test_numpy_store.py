@@ -0,0 +1,88 @@
+"""Embedded NumPy store: persistence, filters, and exact and IVF search."""
+
+import numpy as np
+import pytest
+
+from pipeline.stores import NumpyVectorStore
+
+
+def vectors(n, dims=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dims)).astype(np.float32)
+
+
+def fill(store, matrix, topics=("swift", "uikit")):
+    ids = [f"c{i}" for i in range(len(matrix))]
+    store.upsert(
+        ids=ids,
+        embeddings=matrix.tolist(),
+        documents=[f"doc {i}" for i in ids],
+        metadatas=[{"topic": topics[i % len(topics)], "position": i} for i in range(len(ids))],
+    )
+    store.flush()
+    return ids
+
+
+def test_writes_persist_and_reopen(settings):
+    store = NumpyVectorStore()
+    matrix = vectors(6)
+    fill(store, matrix)
+    store.upsert(["c1"], [matrix[5].tolist()], ["replaced"], [{"topic": "combine"}])
+    store.delete(["c0", "missing"])
+    store.flush()
+
+    reopened = NumpyVectorStore()
+    found = reopened.get(ids=["c1", "c0"], include=["documents", "metadatas", "embeddings"])
+
+    assert reopened.count() == 5
+    assert found["ids"] == ["c1"]
+    assert found["documents"] == ["replaced"]
+    assert found["metadatas"] == [{"topic": "combine"}]
+    np.testing.assert_allclose(
+        found["embeddings"][0], matrix[5] / np.linalg.norm(matrix[5]), rtol=1e-6
+    )
+
+
+def test_exact_search_ranks_by_cosine_within_filters(settings):
+    store = NumpyVectorStore()
+    matrix = vectors(40)
+    ids = fill(store, matrix)
+    queries = vectors(3, seed=1)
+
+    wheres = [None, {"topic": "uikit"}, None]
+    result = store.query_batch(queries.tolist(), n_results=5, wheres=wheres)
+
+    unit = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    q = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    expected = np.argsort(-(unit @ q[0]))[:5]
+    assert result["ids"][0] == [ids[i] for i in expected]
+    np.testing.assert_allclose(result["distances"][0], 1 - (unit @ q[0])[expected], atol=1e-5)
+    assert {m["topic"] for m in result["metadatas"][1]} == {"uikit"}
+    assert store.query_batch([q[0].tolist()], wheres=[{"topic": "combine"}])["ids"] == [[]]
+    with pytest.raises(ValueError, match="Unsupported filter"):
+        store.get(where={"position": {"$gt": 3}})
+
+
+def test_ivf_search_matches_exact_search_when_every_list_is_probed(settings):
+    matrix = vectors(200, seed=2)
+    queries = vectors(10, seed=3).tolist()
+    exact = NumpyVectorStore("exact", ivf_lists=0)
+    fill(exact, matrix)
+    full_probe = NumpyVectorStore("ivf", ivf_lists=8, ivf_probes=8)
+    fill(full_probe, matrix)
+
+    assert sorted(p.name for p in full_probe.path.glob("ivf_*.npy")) == [
+        "ivf_centroids.npy",
+        "ivf_offsets.npy",
+        "ivf_order.npy",
+    ]
+    assert full_probe.query_batch(queries, 5)["ids"] == exact.query_batch(queries, 5)["ids"]
+
+
+def test_ivf_probes_find_stored_vectors(settings):
+    matrix = vectors(200, seed=4)
+    store = NumpyVectorStore("ivf", ivf_lists=8, ivf_probes=2)
+    ids = fill(store, matrix)
+
+    found = store.query_batch(matrix[:50].tolist(), n_results=1)["ids"]
+
+    assert sum(hit == [doc_id] for hit, doc_id in zip(found, ids)) >= 45
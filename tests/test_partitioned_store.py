@@ -0,0 +1,71 @@
+"""Topic-partitioned store: routing, topic moves and the fused global fallback."""
+
+import numpy as np
+
+from pipeline.stores import PartitionedVectorStore, get_vector_store
+
+
+def open_store():
+    store = get_vector_store(backend="numpy", partitioned=True)
+    assert isinstance(store, PartitionedVectorStore)
+    return store
+
+
+def fill(store, topics):
+    vectors = np.random.default_rng(0).normal(size=(len(topics), 8))
+    ids = [f"c{i}" for i in range(len(topics))]
+    store.upsert(
+        ids, vectors.tolist(), [f"doc {i}" for i in ids], [{"topic": t} for t in topics]
+    )
+    store.flush()
+    return ids, vectors
+
+
+def test_items_are_routed_to_their_topic_partition():
+    store = open_store()
+    fill(store, ["swift"] * 4 + ["uikit"] * 2)
+
+    assert store.partition_counts() == {"swift": 4, "uikit": 2, "all": 6}
+    assert open_store().partition_counts() == {"swift": 4, "uikit": 2, "all": 6}
+
+
+def test_topic_queries_search_only_their_partition():
+    store = open_store()
+    _, vectors = fill(store, ["swift"] * 4 + ["uikit"] * 4)
+    query = vectors[5].tolist()
+
+    found = store.query_batch([query, query], n_results=3, wheres=[{"topic": "uikit"}, None])
+    exact = store.global_store.query_batch([query], n_results=3, wheres=[{"topic": "uikit"}])
+
+    assert found["ids"][0] == exact["ids"][0]
+    assert found["ids"][0][0] == "c5"
+    assert {m["topic"] for m in found["metadatas"][0]} == {"uikit"}
+    assert found["ids"][1] == store.global_store.query_batch([query], n_results=3)["ids"][0]
+
+
+def test_small_or_missing_partitions_are_topped_up_from_all_topics():
+    store = open_store()
+    _, vectors = fill(store, ["swift"] * 5 + ["uikit"])
+    query = vectors[0].tolist()
+
+    found = store.query_batch(
+        [query, query], n_results=3, wheres=[{"topic": "uikit"}, {"topic": "combine"}]
+    )
+
+    assert found["ids"][0][0] == "c5"  # topic hits first
+    assert len(found["ids"][0]) == len(set(found["ids"][0])) == 3
+    assert found["ids"][1] == store.global_store.query_batch([query], n_results=3)["ids"][0]
+    assert all(len(found[key][0]) == 3 for key in found)
+
+
+def test_topic_change_moves_the_item():
+    store = open_store()
+    _, vectors = fill(store, ["swift", "swift", "uikit"])
+
+    store.upsert(["c0"], [vectors[0].tolist()], ["moved"], [{"topic": "uikit"}])
+    store.delete(["c2"])
+    store.flush()
+
+    assert store.get(where={"topic": "uikit"})["ids"] == ["c0"]
+    assert store.get(where={"topic": "swift"})["ids"] == ["c1"]
+    assert store.partition_counts() == {"swift": 1, "uikit": 1, "all": 2}
@@ -0,0 +1,60 @@
+"""Reduced-dimensionality indexes: PCA for local backends, native truncation."""
+
+import numpy as np
+import pytest
+
+from pipeline.embeddings import Indexer, PCAProjection
+from pipeline.embeddings.backends import get_embedding_backend
+
+TEXTS = [
+    "Actors protect mutable state with isolation.",
+    "Sendable types can cross concurrency domains.",
+    "Task groups run child tasks concurrently.",
+    "Auto Layout resolves constraints into frames.",
+    "Diffable data sources animate collection view updates.",
+    "Combine publishers emit values over time.",
+    "SwiftUI views are value types describing the interface.",
+    "Core Data contexts are confined to their queue.",
+]
+
+
+def test_pca_keeps_the_strongest_directions():
+    rng = np.random.default_rng(0)
+    signal = rng.normal(size=(200, 2)) @ rng.normal(size=(2, 16)) * 10
+    vectors = signal + rng.normal(size=(200, 16)) * 0.1
+
+    projection = PCAProjection().fit(vectors, 2)
+    reduced = projection.transform(vectors)
+
+    assert reduced.shape == (200, 2)
+    assert projection.explained_variance > 0.99
+    np.testing.assert_allclose(np.linalg.norm(reduced, axis=1), 1.0, rtol=1e-5)
+    with pytest.raises(ValueError, match="down to 32 dims"):
+        PCAProjection().fit(vectors, 32)
+
+
+def test_projected_index_answers_full_width_queries(make_chunk, embed):
+    chunks = [make_chunk(f"doc{i}", text) for i, text in enumerate(TEXTS)]
+    vectors = embed(TEXTS)
+    indexer = Indexer()
+    indexer.fit_projection(vectors, 6)
+    indexer.index(list(zip(chunks, vectors)))
+
+    reloaded = Indexer()
+    result = reloaded.query(embed([TEXTS[3]])[0], n_results=1)
+
+    assert result["ids"][0] == ["doc3"]
+    assert (reloaded.metadata.dimensions, reloaded.metadata.reduction) == (6, "pca")
+    assert reloaded.needs_rebuild("local/hashing-384", None)
+    assert not reloaded.needs_rebuild("local/hashing-384", 6)
+    with pytest.raises(ValueError, match="projection expects 384"):
+        reloaded.query([0.1] * 6)
+
+
+def test_providers_that_truncate_get_the_configured_size(settings):
+    settings.embedding_dimensions = 256
+
+    backend = get_embedding_backend("gemini-embedding-001")
+
+    assert backend.dimensions == 256
+    assert backend.supports_output_dimensionality
@@ -0,0 +1,116 @@
+"""Quantized index: calibration across incremental adds and store rescoring."""
+
+import numpy as np
+import pytest
+
+from pipeline.embeddings.quantization import QuantizedIndex
+
+
+def batches(seed=0, dims=32):
+    rng = np.random.default_rng(seed)
+    first = rng.normal(size=(50, dims)).astype(np.float32)
+    # Later chunks sit elsewhere in the space: peaks and centre both move
+    second = (rng.normal(size=(50, dims)) + 3.0 * np.eye(dims)[0]).astype(np.float32)
+    second[:, 1] *= 10.0
+    return first, second
+
+
+class Store:
+    """Full-precision vectors by ID, standing in for the vector store."""
+
+    def __init__(self):
+        self.vectors = {}
+        self.fetched = 0
+
+    def put(self, ids, vectors):
+        self.vectors.update(zip(ids, vectors))
+
+    def fetch(self, ids):
+        self.fetched += len(ids)
+        return np.array([self.vectors[i] for i in ids])
+
+
+def add(index, store, prefix, vectors, topic="t"):
+    ids = [f"{prefix}{i}" for i in range(len(vectors))]
+    store.put(ids, vectors)
+    index.add(ids, vectors, [topic] * len(ids))
+    return ids
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_incremental_adds_match_a_full_build(tmp_path, mode):
+    first, second = batches()
+    store = Store()
+    incremental = QuantizedIndex(tmp_path / "incremental", mode=mode, fetch=store.fetch)
+    add(incremental, store, "a", first)
+    add(incremental, store, "b", second)
+
+    full = QuantizedIndex(tmp_path / "full", mode=mode)
+    full.add(
+        [f"a{i}" for i in range(50)] + [f"b{i}" for i in range(50)],
+        np.concatenate([first, second]),
+        ["t"] * 100,
+    )
+
+    assert incremental.recalibrations == 1
+    assert incremental.ids == full.ids
+    np.testing.assert_array_equal(incremental.codes, full.codes)
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_adds_within_the_calibration_encode_only_new_vectors(tmp_path, mode):
+    first, _ = batches()
+    store = Store()
+    index = QuantizedIndex(tmp_path, mode=mode, fetch=store.fetch)
+    add(index, store, "a", first[:40])
+    before = index.codes.copy()
+
+    # Copies of indexed vectors: inside the int8 range, barely moving the mean
+    add(index, store, "b", first[:2])
+
+    assert index.recalibrations == 0
+    assert store.fetched == 0
+    np.testing.assert_array_equal(index.codes[:40], before)
+
+
+def test_int8_recalibrates_from_codes_without_a_store(tmp_path):
+    first, second = batches()
+    index = QuantizedIndex(tmp_path, mode="int8")
+    index.add([f"a{i}" for i in range(50)], first, ["t"] * 50)
+    index.add([f"b{i}" for i in range(50)], second, ["t"] * 50)
+
+    vectors = np.concatenate([first, second])
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    decoded = index.codes.astype(np.float32) * index.quantizer.scale
+    assert index.recalibrations == 1
+    np.testing.assert_allclose(decoded, vectors, atol=0.02)
+
+
+def test_rescoring_reads_candidates_from_the_store(tmp_path):
+    first, _ = batches()
+    store = Store()
+    index = QuantizedIndex(tmp_path, mode="binary", rescore_factor=2, fetch=store.fetch)
+    ids = add(index, store, "a", first)
+
+    found, distances = index.search(first[7], n_results=3)
+
+    assert found[0] == ids[7]
+    assert distances[0] == pytest.approx(0.0, abs=1e-5)
+    assert store.fetched == 6  # rescore_factor * n_results candidates
+
+
+def test_upsert_replaces_and_persists_codes_only(tmp_path):
+    first, second = batches()
+    store = Store()
+    index = QuantizedIndex(tmp_path, mode="int8", fetch=store.fetch)
+    store.put(["x", "y"], first[:2])
+    index.add(["x", "y"], first[:2], ["t", "t"])
+    store.put(["y"], second[:1])
+    index.add(["y"], second[:1], ["u"])
+    index.save()
+
+    reloaded = QuantizedIndex(tmp_path, mode="int8", fetch=store.fetch)
+    assert reloaded.ids == ["x", "y"]
+    assert list(reloaded.topics) == ["t", "u"]
+    assert reloaded.search(second[0], n_results=1, topic="u")[0] == ["y"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["codes.npy", "meta.json"]
@@ -0,0 +1,122 @@
+"""LLM response cache modes."""
+
+import pytest
+
+from pipeline.clients import (
+    ClaudeClient,
+    GeminiClient,
+    ReplayMiss,
+    ResponseCache,
+    StubAnthropicTransport,
+    StubGeminiTransport,
+)
+from pipeline.generation.models import FlashcardDraft
+
+
+def counting_transport():
+    calls = []
+
+    def respond(prompt):
+        calls.append(prompt)
+        return f"answer {len(calls)}"
+
+    return StubGeminiTransport(respond), calls
+
+
+@pytest.fixture
+def llm_cache(settings, tmp_path):
+    settings.llm_cache = True
+    settings.llm_cache_dir = str(tmp_path / "llm_cache")
+    return settings
+
+
+async def test_identical_calls_are_served_from_cache(llm_cache):
+    transport, calls = counting_transport()
+    client = GeminiClient(transport=transport)
+
+    assert await client.generate("q") == "answer 1"
+    assert await client.generate("q") == "answer 1"
+    assert len(calls) == 1
+
+
+async def test_refresh_asks_again_and_overwrites(llm_cache):
+    transport, calls = counting_transport()
+    await GeminiClient(transport=transport).generate("q")
+
+    llm_cache.llm_cache_refresh = True
+    refreshing = GeminiClient(transport=transport)
+    assert await refreshing.generate("q") == "answer 2"
+    assert refreshing.cache.stats()["hits"] == 0
+
+    llm_cache.llm_cache_refresh = False
+    assert await GeminiClient(transport=transport).generate("q") == "answer 2"
+    assert len(calls) == 2
+
+
+async def test_refresh_applies_to_streams(llm_cache):
+    transport, calls = counting_transport()
+    await GeminiClient(transport=transport).generate("q")
+
+    llm_cache.llm_cache_refresh = True
+    client = GeminiClient(transport=transport)
+    text = "".join([delta async for delta in client.generate_stream("q")])
+
+    assert text == "answer 2"
+    assert len(calls) == 2
+
+
+async def read(stream):
+    return "".join([delta async for delta in stream])
+
+
+@pytest.mark.parametrize(
+    "make_client",
+    [
+        lambda respond: ClaudeClient(transport=StubAnthropicTransport(respond)),
+        lambda respond: GeminiClient(transport=StubGeminiTransport(respond)),
+    ],
+    ids=["claude", "gemini"],
+)
+async def test_completed_stream_failing_the_schema_is_not_replayed(llm_cache, make_client):
+    calls = []
+
+    def respond(prompt):
+        calls.append(prompt)
+        return '{"front": "Only a front?"}'  # valid JSON, not a valid card
+
+    client = make_client(respond)
+    for _ in range(2):
+        await read(client.generate_stream("card", schema=FlashcardDraft))
+
+    assert len(calls) == 2
+    assert client.cache.stats()["hits"] == 0
+
+
+async def test_completed_valid_claude_stream_is_cached(llm_cache):
+    card = FlashcardDraft(
+        front="What is an actor?", summary="Isolated state.", back="A reference type."
+    ).model_dump_json()
+    transport = StubAnthropicTransport(lambda prompt: card)
+    client = ClaudeClient(transport=transport)
+
+    first = await read(client.generate_stream("card", schema=FlashcardDraft))
+    second = await read(client.generate_stream("card", schema=FlashcardDraft))
+
+    assert first == second
+    assert len(transport.calls) == 1
+
+
+async def test_replay_miss_raises(llm_cache):
+    llm_cache.llm_replay = True
+    transport, calls = counting_transport()
+
+    with pytest.raises(ReplayMiss):
+        await GeminiClient(transport=transport).generate("q")
+    assert calls == []
+
+
+def test_replay_wins_over_refresh(tmp_path):
+    cache = ResponseCache(tmp_path, replay=True, refresh=True)
+    cache.put("k", "cached")
+
+    assert cache.get("k") == "cached"
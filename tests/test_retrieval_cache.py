@@ -0,0 +1,42 @@
+"""Retrieval cache: written once per run, reused until the index changes."""
+
+from pipeline.embeddings.indexer import Indexer
+
+CHUNKS = [
+    ("actors", "Actors protect mutable state with isolation.", "swift"),
+    ("sendable", "Sendable types can cross concurrency domains.", "swift"),
+    ("layout", "Auto Layout resolves constraints into frames.", "uikit"),
+]
+
+
+def build(make_chunk, index_chunks):
+    return index_chunks([make_chunk(i, text, topic) for i, text, topic in CHUNKS])
+
+
+def test_query_batches_persist_only_on_flush(make_chunk, index_chunks, embed):
+    indexer = build(make_chunk, index_chunks)
+    path = indexer.sidecar_dir / "retrieval_cache.json"
+
+    for text in ("actor isolation", "constraints", "sendable closures"):
+        indexer.query_batch(embed([text]), ["swift"], n_results=2)
+    assert not path.exists()
+
+    indexer.flush()
+    reloaded = Indexer()
+    result = reloaded.query_batch(embed(["constraints"]), ["swift"], n_results=2)
+
+    assert len(reloaded.cache) == 3
+    assert reloaded.cache.hits == 1
+    assert result == indexer.query_batch(embed(["constraints"]), ["swift"], n_results=2)
+
+
+def test_index_changes_drop_cached_results(make_chunk, index_chunks, embed):
+    indexer = build(make_chunk, index_chunks)
+    indexer.query_batch(embed(["actor isolation"]), n_results=2)
+    indexer.flush()
+
+    index_chunks([make_chunk("tasks", "Tasks run async work.", "swift")], indexer)
+    reloaded = Indexer()
+    reloaded.query_batch(embed(["actor isolation"]), n_results=2)
+
+    assert (reloaded.cache.hits, reloaded.cache.misses) == (0, 1)
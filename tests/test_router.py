@@ -0,0 +1,240 @@
+"""LLM routing, hedging and failover with local stub providers."""
+
+import asyncio
+import time
+
+import pytest
+
+from pipeline.clients import LLMRouter, StubProvider, UsageLedger
+from pipeline.clients.router import ProviderStats
+
+
+def answer(name):
+    return lambda prompt: f"{name}:{prompt}"
+
+
+def latencies(*values):
+    """Latency callable returning values in turn, then repeating the last."""
+    remaining = list(values)
+    return lambda: remaining.pop(0) if len(remaining) > 1 else remaining[0]
+
+
+class RateLimitedProvider(StubProvider):
+    """Stub provider whose calls fail with HTTP 429."""
+
+    async def generate(self, prompt, max_tokens, schema, system, shared=""):
+        self.calls += 1
+        error = RuntimeError(f"{self.name}: 429 Too Many Requests")
+        error.code = 429
+        raise error
+
+
+async def warm_up(router, calls=5):
+    for i in range(calls):
+        await router.generate(f"warm {i}")
+
+
+async def test_cold_providers_go_in_preference_order():
+    router = LLMRouter([StubProvider("a", answer("a")), StubProvider("b", answer("b"))])
+
+    assert await router.generate("q") == "a:q"
+    assert router.stats()["a"]["requests"] == 1
+    assert router.stats()["b"]["requests"] == 0
+
+
+async def test_faster_provider_ranks_first():
+    slow = StubProvider("slow", answer("slow"), latency_s=0.05)
+    fast = StubProvider("fast", answer("fast"), latency_s=0.001)
+    router = LLMRouter([slow, fast], hedge=False)
+    router.routes[0].stats.record(50)
+    router.routes[1].stats.record(1)
+
+    assert await router.generate("q") == "fast:q"
+    assert [route.provider.name for route in router.rank()] == ["fast", "slow"]
+
+
+async def test_errors_push_a_provider_down_the_ranking():
+    router = LLMRouter([StubProvider("a"), StubProvider("b")], hedge=False)
+    for _ in range(4):
+        router.routes[0].stats.record(10)
+        router.routes[1].stats.record(20)
+    for _ in range(4):
+        router.routes[0].stats.record(None)
+
+    assert router.rank()[0].provider.name == "b"
+
+
+async def test_hedge_fires_after_p95_and_cancels_the_loser():
+    primary = StubProvider("a", answer("a"), latency_s=latencies(*[0.01] * 5, 1.0))
+    backup = StubProvider("b", answer("b"), latency_s=0.01)
+    router = LLMRouter([primary, backup])
+    await warm_up(router)
+
+    start = time.perf_counter()
+    result = await router.generate("q")
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0)  # let the cancelled call unwind
+
+    stats = router.stats()
+    assert result == "b:q"
+    assert elapsed < 0.5
+    assert stats["b"]["hedges"] == 1
+    assert stats["b"]["wins"] == 1
+    assert stats["a"]["cancelled"] == 1
+    assert stats["a"]["requests"] == 6
+    assert stats["a"]["failures"] == 0
+
+
+async def test_primary_answering_first_wins_the_hedge():
+    primary = StubProvider("a", answer("a"), latency_s=latencies(*[0.01] * 5, 0.05))
+    backup = StubProvider("b", answer("b"), latency_s=0.5)
+    router = LLMRouter([primary, backup])
+    await warm_up(router)
+
+    assert await router.generate("q") == "a:q"
+    await asyncio.sleep(0)
+
+    stats = router.stats()
+    assert stats["b"]["hedges"] == 1
+    assert stats["b"]["cancelled"] == 1
+    assert stats["a"]["wins"] == 1
+
+
+async def test_no_hedge_without_enough_samples():
+    primary = StubProvider("a", answer("a"), latency_s=0.05)
+    backup = StubProvider("b", answer("b"))
+    router = LLMRouter([primary, backup])
+
+    assert await router.generate("q") == "a:q"
+    assert backup.calls == 0
+
+
+async def test_no_hedge_when_disabled():
+    primary = StubProvider("a", answer("a"), latency_s=latencies(*[0.01] * 5, 0.1))
+    backup = StubProvider("b", answer("b"))
+    router = LLMRouter([primary, backup], hedge=False)
+    await warm_up(router)
+
+    assert await router.generate("q") == "a:q"
+    assert backup.calls == 0
+
+
+async def test_fails_over_when_the_primary_errors():
+    primary = StubProvider("a", answer("a"), fail=lambda: True)
+    backup = StubProvider("b", answer("b"))
+    router = LLMRouter([primary, backup])
+
+    assert await router.generate("q") == "b:q"
+
+    stats = router.stats()
+    assert stats["a"]["failures"] == 1
+    assert stats["a"]["error_rate"] == 1.0
+    assert stats["b"]["requests"] == 1
+    assert stats["b"]["failures"] == 0
+
+
+async def test_raises_the_last_error_when_every_provider_fails():
+    router = LLMRouter(
+        [StubProvider("a", fail=lambda: True), StubProvider("b", fail=lambda: True)]
+    )
+
+    with pytest.raises(RuntimeError, match="b stub failure"):
+        await router.generate("q")
+    assert router.stats()["a"]["failures"] == router.stats()["b"]["failures"] == 1
+
+
+async def test_rate_limited_provider_cools_down():
+    limited = RateLimitedProvider("a")
+    backup = StubProvider("b", answer("b"))
+    router = LLMRouter([limited, backup], cooldown_s=60)
+
+    assert await router.generate("q1") == "b:q1"
+    assert router.routes[0].stats.cooldown_until > time.monotonic() + 50
+
+    assert await router.generate("q2") == "b:q2"
+    assert limited.calls == 1
+
+
+async def test_provider_out_of_daily_requests_is_passed_over(tmp_path):
+    ledger = UsageLedger(tmp_path / "ledger.json")
+    primary = StubProvider("a", answer("a"), ledger=ledger, daily_requests=2)
+    backup = StubProvider("b", answer("b"), ledger=ledger)
+    router = LLMRouter([primary, backup], hedge=False)
+
+    results = [await router.generate(f"q{i}") for i in range(4)]
+
+    assert results == ["a:q0", "a:q1", "b:q2", "b:q3"]
+    assert primary.calls == 2
+    assert router.stats()["a"]["failures"] == 0
+
+
+async def test_provider_whose_token_quota_cannot_cover_the_request_goes_last(tmp_path):
+    ledger = UsageLedger(tmp_path / "ledger.json")
+    primary = StubProvider("a", answer("a"), ledger=ledger, daily_tokens=1000)
+    backup = StubProvider("b", answer("b"), ledger=ledger)
+    router = LLMRouter([primary, backup], hedge=False)
+    for _ in range(4):
+        router.routes[0].stats.record(10)
+        router.routes[1].stats.record(500)
+
+    assert router.rank(tokens=500)[0].provider.name == "a"
+    assert await router.generate("q", max_tokens=2000) == "b:q"
+    assert await router.generate("q", max_tokens=100) == "a:q"
+
+
+async def test_stream_fails_over_before_the_first_delta():
+    router = LLMRouter(
+        [StubProvider("a", fail=lambda: True), StubProvider("b", lambda p: "x" * 40)]
+    )
+
+    deltas = [delta async for delta in router.stream("q")]
+
+    assert "".join(deltas) == "x" * 40
+    assert len(deltas) == 3
+    assert router.stats()["a"]["failures"] == 1
+
+
+async def test_abandoned_stream_counts_as_cancelled():
+    router = LLMRouter([StubProvider("a", lambda p: "x" * 64)])
+
+    stream = router.stream("q")
+    assert await anext(stream) == "x" * 16
+    await stream.aclose()
+
+    stats = router.stats()
+    assert stats["a"]["cancelled"] == 1
+    assert stats["a"]["failures"] == 0
+
+
+async def test_abandoned_stream_closes_the_provider_stream():
+    class ClosingProvider(StubProvider):
+        closed = False
+
+        async def stream(self, prompt, max_tokens, schema, system, shared=""):
+            try:
+                async for delta in super().stream(prompt, max_tokens, schema, system, shared):
+                    yield delta
+            finally:
+                self.closed = True
+
+    provider = ClosingProvider("a", lambda p: "x" * 64)
+    stream = LLMRouter([provider]).stream("q")
+    await anext(stream)
+
+    await stream.aclose()
+
+    assert provider.closed
+
+
+def test_provider_stats_window_and_histogram():
+    stats = ProviderStats(window=3)
+    for latency in (100, 300, 600, 5000):
+        stats.record(latency)
+    stats.record(None)
+
+    summary = stats.summary()
+    assert list(stats.latencies_ms) == [300, 600, 5000]
+    assert summary["failures"] == 1
+    assert stats.error_rate == pytest.approx(1 / 3)
+    assert summary["histogram"]["<=250ms"] == 1
+    assert summary["histogram"]["<=8000ms"] == 1
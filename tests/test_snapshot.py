@@ -0,0 +1,49 @@
+"""Index snapshots: export, restore elsewhere, and compatibility checks."""
+
+import pytest
+
+from pipeline.embeddings import Indexer
+
+TEXTS = {
+    "actors_1": "Actors protect mutable state with isolation.",
+    "actors_2": "Call actor methods with await from outside.",
+    "layout_1": "Auto Layout resolves constraints into frames.",
+}
+
+
+@pytest.fixture
+def snapshot(tmp_path, make_chunk, index_chunks):
+    chunks = [
+        make_chunk(chunk_id, text, chunk_id.split("_")[0], position=int(chunk_id[-1]))
+        for chunk_id, text in TEXTS.items()
+    ]
+    indexer = index_chunks(chunks)
+    assert indexer.export_snapshot(tmp_path / "index.npz") == 3
+    return tmp_path / "index.npz", indexer, chunks
+
+
+def test_restored_index_answers_like_the_original(snapshot, tmp_path, embed):
+    path, original, chunks = snapshot
+    restored = Indexer(persist_dir=str(tmp_path / "restored"))
+
+    assert restored.import_snapshot(path) == 3
+
+    query = embed(["actor isolation"])
+    texts = ["actor isolation"]
+    assert restored.query_batch(query, query_texts=texts) == original.query_batch(
+        query, query_texts=texts
+    )
+    assert restored.metadata == original.metadata
+    assert len(restored.lexical) == 3
+    assert restored.plan_sync(chunks).is_empty
+    assert restored.epoch != original.epoch
+
+
+def test_snapshots_from_another_model_are_rejected(snapshot, tmp_path):
+    path, _, _ = snapshot
+    restored = Indexer(persist_dir=str(tmp_path / "restored"))
+
+    with pytest.raises(ValueError, match="Snapshot holds 384-dim vectors"):
+        restored.import_snapshot(path, model_id="local/hashing-256")
+    with pytest.raises(ValueError, match="Index is empty"):
+        restored.export_snapshot(tmp_path / "empty.npz")
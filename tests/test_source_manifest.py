@@ -0,0 +1,51 @@
+"""Source manifest: per-document chunk hashes answered without store scans."""
+
+import pytest
+
+from pipeline.embeddings import Indexer, SourceManifest
+from pipeline.embeddings.source_manifest import source_hash
+
+
+def test_manifest_tracks_chunks_per_source(tmp_path):
+    manifest = SourceManifest(tmp_path / "sources.json")
+    manifest.add([("actors", "a1", "h1"), ("actors", "a2", "h2"), ("layout", "l1", "h3")])
+    before = manifest.sources["actors"].content_hash
+
+    manifest.add([("layout", "a2", "h2")])  # chunk moved to another source
+    manifest.remove(["l1", "unknown"])
+    manifest.save()
+    reloaded = SourceManifest(tmp_path / "sources.json")
+
+    assert reloaded.sources["actors"].chunks == {"a1": "h1"}
+    assert reloaded.sources["actors"].content_hash == source_hash({"a1": "h1"}) != before
+    assert reloaded.sources["layout"].chunk_count == 1
+    assert reloaded.chunk_hashes() == {"a1": "h1", "a2": "h2"}
+
+
+def test_lookups_use_the_manifest_not_the_store(make_chunk, index_chunks, monkeypatch):
+    index_chunks(
+        [
+            make_chunk("actors_1", "Actors protect state.", position=1),
+            make_chunk("actors_2", "Await actor calls.", position=2),
+        ]
+    )
+    indexer = Indexer()
+
+    def scan(*args, **kwargs):
+        pytest.fail("store scanned")
+
+    monkeypatch.setattr(indexer.store, "get", scan)
+
+    assert indexer.has_document("actors")
+    assert not indexer.has_document("layout")
+    assert indexer.indexed_sources()["actors"].chunk_count == 2
+
+
+def test_missing_manifest_is_rebuilt_from_one_store_scan(make_chunk, index_chunks):
+    indexer = index_chunks([make_chunk("actors_1", "Actors protect state.", position=1)])
+    (indexer.sidecar_dir / "sources.json").unlink()
+
+    rebuilt = Indexer()
+
+    assert rebuilt.stored_hashes() == indexer.stored_hashes()
+    assert (indexer.sidecar_dir / "sources.json").exists()
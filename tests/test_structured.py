@@ -0,0 +1,63 @@
+"""Schema-constrained output: provider requests and strict parsing of responses."""
+
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from pipeline.clients import (
+    ClaudeClient,
+    GeminiClient,
+    StubAnthropicTransport,
+    StubGeminiTransport,
+)
+from pipeline.clients.structured import conforms, json_schema, parse_structured
+from pipeline.generation.models import FlashcardDraft, KeyedFlashcardDraft
+
+CARD = {
+    "front": "Why are actors reentrant?",
+    "summary": "Awaits inside actor methods let other calls run.",
+    "back": "The answer.",
+    "tags": ["actors"],
+    "swift_version": "5.9",
+    "confidence": 0.9,
+}
+
+
+def test_parsing_is_strict_json_against_the_schema():
+    assert parse_structured(FlashcardDraft, json.dumps(CARD)).front == CARD["front"]
+    cards = parse_structured(list[KeyedFlashcardDraft], json.dumps([{**CARD, "key": "c1"}]))
+    assert [card.key for card in cards] == ["c1"]
+
+    fenced = f"```json\n{json.dumps(CARD)}\n```"
+    with pytest.raises(ValidationError):
+        parse_structured(FlashcardDraft, fenced)
+    assert not conforms(FlashcardDraft, json.dumps({**CARD, "confidence": 3}))
+    assert not conforms(FlashcardDraft, json.dumps({"front": "only"}))
+    assert json_schema(list[FlashcardDraft])["type"] == "array"
+
+
+async def test_gemini_sends_the_schema_as_its_response_schema():
+    transport = StubGeminiTransport(lambda prompt: json.dumps(CARD))
+    client = GeminiClient(transport=transport)
+
+    text = await client.generate("card please", schema=FlashcardDraft)
+
+    config = transport.calls[0]["config"]
+    assert config["response_mime_type"] == "application/json"
+    assert config["response_schema"] is FlashcardDraft
+    assert parse_structured(FlashcardDraft, text).tags == ["actors"]
+
+
+async def test_claude_answers_through_a_forced_tool_call():
+    transport = StubAnthropicTransport(lambda prompt: json.dumps({"result": [CARD]}))
+    client = ClaudeClient(transport=transport)
+
+    text = await client.generate_json("cards please", schema=list[FlashcardDraft])
+
+    request = transport.calls[0]
+    tool = request["tools"][0]
+    assert request["tool_choice"] == {"type": "tool", "name": tool["name"]}
+    # Tool inputs must be objects, so the array is wrapped and unwrapped again
+    assert tool["input_schema"]["properties"]["result"]["type"] == "array"
+    assert parse_structured(list[FlashcardDraft], text)[0].front == CARD["front"]
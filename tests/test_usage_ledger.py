@@ -0,0 +1,125 @@
+"""Daily usage ledger: aborted calls are counted and the quota is enforced."""
+
+import asyncio
+
+import pytest
+
+from pipeline.clients import (
+    ClaudeClient,
+    GeminiClient,
+    LLMRouter,
+    QuotaExhausted,
+    StubAnthropicTransport,
+    StubGeminiTransport,
+    TokenUsage,
+    UsageLedger,
+)
+from pipeline.clients.router import ClaudeProvider, GeminiProvider
+
+
+async def abandon_after_first_delta(stream):
+    assert await anext(stream)
+    await stream.aclose()
+
+
+async def test_abandoned_gemini_streams_are_recorded():
+    transport = StubGeminiTransport(lambda prompt: "Sure! " * 50)
+    client = GeminiClient(transport=transport)
+
+    for _ in range(3):
+        await abandon_after_first_delta(client.generate_stream("prompt " * 40))
+
+    used = client.ledger.used(client.model)
+    assert len(transport.calls) == 3
+    assert used["requests"] == 3
+    assert used["tokens"] > 3 * 40
+    assert client.ledger.in_flight[client.model] == 0
+
+
+async def test_abandoned_claude_stream_is_recorded():
+    client = ClaudeClient(transport=StubAnthropicTransport(lambda prompt: "x" * 200))
+
+    await abandon_after_first_delta(client.generate_stream("prompt", system="sys"))
+
+    assert client.ledger.used(client.model)["requests"] == 1
+
+
+async def test_cancelled_call_is_recorded():
+    class SlowTransport(StubGeminiTransport):
+        async def generate(self, model, contents, config):
+            await asyncio.sleep(1)
+            return await super().generate(model, contents, config)
+
+    client = GeminiClient(transport=SlowTransport())
+    task = asyncio.ensure_future(client.generate("prompt " * 40))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert client.ledger.used(client.model)["requests"] == 1
+
+
+async def test_requests_past_the_daily_quota_are_refused(settings):
+    settings.llm_daily_requests = 2
+    transport = StubGeminiTransport(lambda prompt: "ok")
+    client = GeminiClient(transport=transport)
+
+    await client.generate("a")
+    await client.generate("b")
+    with pytest.raises(QuotaExhausted):
+        await client.generate("c")
+    assert len(transport.calls) == 2
+
+
+async def test_claude_requests_past_the_daily_quota_are_refused(settings):
+    settings.claude_daily_requests = 2
+    transport = StubAnthropicTransport(lambda prompt: "ok")
+    client = ClaudeClient(transport=transport)
+
+    await client.generate("a")
+    await abandon_after_first_delta(client.generate_stream("b " * 40))
+    with pytest.raises(QuotaExhausted):
+        await client.generate("c")
+    with pytest.raises(QuotaExhausted):
+        await anext(client.generate_stream("d"))
+
+    assert len(transport.calls) == 2
+    assert client.ledger.used(client.model)["requests"] == 2
+    assert client.ledger.in_flight[client.model] == 0
+
+
+async def test_claude_token_quota_is_enforced(settings):
+    settings.claude_daily_tokens = 50
+    client = ClaudeClient(transport=StubAnthropicTransport(lambda prompt: "x" * 400))
+
+    await client.generate("a")
+    with pytest.raises(QuotaExhausted):
+        await client.generate("b")
+
+
+async def test_failover_stops_when_every_provider_is_out_of_quota(settings):
+    settings.llm_daily_requests = 1
+    settings.claude_daily_requests = 1
+    gemini = GeminiClient(transport=StubGeminiTransport(lambda prompt: "gemini"))
+    claude = ClaudeClient(transport=StubAnthropicTransport(lambda prompt: "claude"))
+    router = LLMRouter([GeminiProvider(gemini), ClaudeProvider(claude)], hedge=False)
+
+    assert await router.generate("a") == "gemini"
+    assert await router.generate("b") == "claude"
+    with pytest.raises(QuotaExhausted):
+        await router.generate("c")
+    assert len(claude.transport.calls) == 1
+
+
+def test_in_flight_requests_count_against_the_quota(tmp_path):
+    ledger = UsageLedger(tmp_path / "ledger.json")
+    with ledger.reserve("m", daily_requests=2):
+        with ledger.reserve("m", daily_requests=2):
+            with pytest.raises(QuotaExhausted):
+                with ledger.reserve("m", daily_requests=2):
+                    pass
+    ledger.record("m", TokenUsage(input_tokens=10, output_tokens=5, requests=1))
+
+    reloaded = UsageLedger(tmp_path / "ledger.json")
+    assert reloaded.used("m") == {"requests": 1, "tokens": 15}